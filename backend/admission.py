@@ -0,0 +1,206 @@
+"""Admission control for expensive endpoints.
+
+Slow endpoints (terminal commands, file search, JSONL reads, archive exports,
+the health probe) share the worker's threadpool with everything else. Each of
+them belongs to a route class with a concurrency limit and a bounded wait
+queue:
+
+- a request runs at once while the class has a free slot,
+- otherwise it waits in the class queue (at most ``DASHBOARD_ADMISSION_WAIT``
+  seconds),
+- and when the queue is full it is shed at once with 503 and ``Retry-After``.
+
+Paths outside every class (cheap reads such as ``/api/dashboard/config``,
+SSE/WebSocket streams) bypass admission entirely. A slot is held until the
+response body has been sent.
+
+Limits are per worker process. Override them with
+``DASHBOARD_ADMISSION="terminal=2:4,search=2:8"`` (class=limit:queue), or turn
+admission off with ``DASHBOARD_ADMISSION=0``.
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+from collections import deque
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger("admin-dashboard")
+
+# class -> (limit, queue, path patterns); "/x/*" matches /x and anything below it
+DEFAULT_CLASSES = {
+    "terminal": (2, 4, ["/api/terminal/exec"]),
+    "search": (2, 8, ["/api/files/search"]),
+    "jsonl": (4, 16, ["/api/files/jsonl/*"]),
+    "archive": (2, 4, ["/api/files/archive"]),
+    "health": (2, 8, ["/api/health", "/api/health/gateway"]),
+}
+MAX_RETRY_AFTER = 30
+
+
+class AdmissionClass:
+    """Concurrency limit plus a bounded FIFO of waiting requests."""
+
+    def __init__(self, name: str, limit: int, queue: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue = max(0, queue)
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        # Exponentially weighted mean service time, for Retry-After
+        self.service_time = 0.0
+        self.stats = {"admitted": 0, "queued": 0, "shed": 0, "timedOut": 0}
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until the backlog ahead of a new request should have drained."""
+        backlog = (self.active + self.waiting) / self.limit
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(backlog * (self.service_time or 1.0))))
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting up to ``timeout``; False if the request must be shed."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.stats["admitted"] += 1
+            return True
+        if len(self._waiters) >= self.queue:
+            self.stats["shed"] += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.stats["timedOut"] += 1
+            return False
+        except asyncio.CancelledError:  # client went away while queued
+            self._abandon(waiter)
+            raise
+        self.stats["admitted"] += 1
+        return True
+
+    def _abandon(self, waiter: asyncio.Future):
+        if waiter.done() and not waiter.cancelled():
+            # The slot was handed over just as we gave up; pass it on
+            self.release()
+        elif waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+    def release(self, elapsed: float | None = None):
+        """Free a slot (handing it straight to the next waiter, if any)."""
+        if elapsed is not None:
+            self.service_time = elapsed if not self.service_time else \
+                0.8 * self.service_time + 0.2 * elapsed
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # slot ownership moves to the waiter
+                return
+        self.active -= 1
+
+    def info(self) -> dict:
+        return {
+            "limit": self.limit,
+            "queue": self.queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "avgServiceMs": round(self.service_time * 1000, 1),
+            **self.stats,
+        }
+
+
+class AdmissionController:
+    """Maps request paths to admission classes."""
+
+    def __init__(self, classes: dict, wait: float = 10.0):
+        self.wait = wait
+        self.classes: dict[str, AdmissionClass] = {}
+        self._exact: dict[str, AdmissionClass] = {}
+        self._prefixes: list[tuple[str, AdmissionClass]] = []
+        for name, (limit, queue, patterns) in classes.items():
+            cls = self.classes[name] = AdmissionClass(name, limit, queue)
+            for pattern in patterns:
+                if pattern.endswith("/*"):
+                    self._exact[pattern[:-2]] = cls
+                    self._prefixes.append((pattern[:-1], cls))
+                else:
+                    self._exact[pattern] = cls
+
+    def class_for(self, path: str) -> AdmissionClass | None:
+        cls = self._exact.get(path)
+        if cls is None:
+            for prefix, candidate in self._prefixes:
+                if path.startswith(prefix):
+                    return candidate
+        return cls
+
+    def info(self) -> dict:
+        return {"waitSeconds": self.wait,
+                "classes": {name: cls.info() for name, cls in self.classes.items()}}
+
+
+def parse_classes(spec: str | None) -> dict:
+    """Default classes with ``name=limit:queue`` overrides applied."""
+    classes = dict(DEFAULT_CLASSES)
+    for item in (spec or "").split(","):
+        name, _, value = item.strip().partition("=")
+        if not value:
+            continue
+        if name not in classes:
+            logger.warning(f"Unknown admission class: {name}")
+            continue
+        try:
+            limit, _, queue = value.partition(":")
+            classes[name] = (int(limit), int(queue) if queue else classes[name][1], classes[name][2])
+        except ValueError:
+            logger.warning(f"Invalid admission setting: {item}")
+    return classes
+
+
+class AdmissionMiddleware:
+    """Applies admission control to HTTP requests in a limited class."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        cls = self.controller.class_for(scope["path"]) if scope["type"] == "http" else None
+        if cls is None:
+            await self.app(scope, receive, send)
+            return
+        if not await cls.acquire(self.controller.wait):
+            response = JSONResponse(
+                {"detail": f"Server busy ({cls.name}), retry later"}, status_code=503,
+                headers={"Retry-After": str(cls.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            cls.release(time.perf_counter() - start)
+
+
+_controller: AdmissionController | None = None
+
+
+def get_admission() -> AdmissionController | None:
+    """The app's controller, or None when ``DASHBOARD_ADMISSION=0``."""
+    global _controller
+    spec = os.environ.get("DASHBOARD_ADMISSION", "")
+    if spec == "0":
+        return None
+    if _controller is None:
+        _controller = AdmissionController(
+            parse_classes(spec), wait=float(os.environ.get("DASHBOARD_ADMISSION_WAIT", "10")))
+    return _controller
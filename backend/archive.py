@@ -0,0 +1,150 @@
+"""Streaming tar.gz / zip archives of a directory tree.
+
+Archives are generated while the tree is walked and yielded in pieces, so
+nothing is staged in temp files and memory stays flat whatever the size:
+
+- tar.gz: headers come from ``TarInfo.tobuf`` and file data is copied in
+  ``CHUNK_SIZE`` pieces through one ``zlib`` gzip stream.
+- zip: ``zipfile`` writes to an unseekable sink (entries use data
+  descriptors); each chunk written is drained to the client right away.
+
+Symlinks are never followed, so the walk cannot leave the requested tree.
+"""
+
+import os
+import time
+import zlib
+import stat
+import tarfile
+import zipfile
+from fnmatch import fnmatch
+
+CHUNK_SIZE = 256 * 1024
+FORMATS = {"tar.gz": "application/gzip", "zip": "application/zip"}
+
+
+def walk(base: str, include: list[str] | None = None, exclude: list[str] | None = None,
+         since: float | None = None, name: str | None = None):
+    """Yield (path, archive name, stat) for regular files under ``base``.
+
+    Archive names start with ``name`` (default: ``base``'s own name).
+    ``include``/``exclude`` are glob patterns matched against the archive name
+    and against the file name. ``since`` keeps files modified at or after that
+    epoch time.
+    """
+    base = os.path.abspath(base)
+    top = name or os.path.basename(base)
+
+    def wanted(name: str) -> bool:
+        def hit(patterns):
+            return any(fnmatch(name, p) or fnmatch(os.path.basename(name), p) for p in patterns)
+        return (not include or hit(include)) and not (exclude and hit(exclude))
+
+    def entry(path: str):
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode) or (since is not None and st.st_mtime < since):
+            return None
+        rel = os.path.relpath(path, base).replace(os.sep, "/")
+        arcname = top if rel == "." else f"{top}/{rel}"
+        return (path, arcname, st) if wanted(arcname) else None
+
+    if not os.path.isdir(base):
+        item = entry(base)
+        if item:
+            yield item
+        return
+    for dirpath, dirnames, filenames in os.walk(base, followlinks=False):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            item = entry(os.path.join(dirpath, filename))
+            if item:
+                yield item
+
+
+def _read_chunks(path: str, size: int):
+    """Exactly ``size`` bytes of a file in chunks (zero-padded if it shrank meanwhile)."""
+    remaining = size
+    try:
+        with open(path, "rb") as f:
+            while remaining:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    except OSError:
+        pass
+    while remaining:
+        pad = min(CHUNK_SIZE, remaining)
+        remaining -= pad
+        yield bytes(pad)
+
+
+def tar_gz(entries, stats: dict | None = None):
+    """Yield a gzip-compressed tar stream of ``entries``."""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for path, name, st in entries:
+        info = tarfile.TarInfo(name)
+        info.size = st.st_size
+        info.mtime = int(st.st_mtime)
+        info.mode = stat.S_IMODE(st.st_mode)
+        out = gz.compress(info.tobuf(format=tarfile.PAX_FORMAT))
+        if out:
+            yield out
+        for chunk in _read_chunks(path, st.st_size):
+            out = gz.compress(chunk)
+            if out:
+                yield out
+        padding = -st.st_size % tarfile.BLOCKSIZE
+        if padding:
+            yield gz.compress(bytes(padding))
+        if stats is not None:
+            stats["files"] += 1
+            stats["bytes"] += st.st_size
+    # End-of-archive marker: two zero blocks, padded to a full record
+    yield gz.compress(bytes(tarfile.RECORDSIZE))
+    yield gz.flush()
+
+
+class _Sink:
+    """Write-only file object whose contents are drained by the generator."""
+
+    def __init__(self):
+        self.parts: list[bytes] = []
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def zip_stream(entries, stats: dict | None = None):
+    """Yield a zip stream of ``entries`` (deflated, zip64 where needed)."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        for path, name, st in entries:
+            info = zipfile.ZipInfo(name, time.localtime(max(st.st_mtime, 315532800))[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (stat.S_IMODE(st.st_mode) | stat.S_IFREG) << 16
+            with zf.open(info, "w", force_zip64=st.st_size >= zipfile.ZIP64_LIMIT) as dest:
+                for chunk in _read_chunks(path, st.st_size):
+                    dest.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+            if stats is not None:
+                stats["files"] += 1
+                stats["bytes"] += st.st_size
+    yield sink.drain()
@@ -0,0 +1,372 @@
+"""Incremental auth-log ingestion for the security panel.
+
+Tails ``auth.log``-style files (also ``/var/log/secure``, ``journalctl``
+short/JSON/export output) from saved byte offsets and folds sshd login
+events into per-source-IP counters with hourly buckets, kept in memory.
+
+One failed attempt is logged several times (PAM's ``authentication
+failure``, sshd's ``Invalid user`` and ``Failed password``), so failures
+are counted from sshd's ``Failed ...`` line only; ``Invalid user`` only
+raises a source's ``invalidUser`` count.
+
+- Offsets and aggregates are saved to ``data/authlog.json`` so a restart
+  resumes where it stopped instead of re-reading the logs.
+- Rotation: if the inode changes, the rest of the old file (now
+  ``<name>.1``) is read before starting the new one. Truncation
+  (copytruncate) restarts at 0.
+- A file seen for the first time is read from at most ``BACKFILL_BYTES``
+  before its end. Each ingest reads at most ``MAX_READ_BYTES``; a line
+  longer than that is skipped.
+
+Configure with ``DASHBOARD_AUTH_LOGS`` (comma-separated paths).
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+from config import DASHBOARD_DATA_DIR
+
+logger = logging.getLogger("admin-dashboard")
+
+DEFAULT_LOGS = ["/var/log/auth.log", "/var/log/secure"]
+BACKFILL_BYTES = 5 * 1024 * 1024
+MAX_READ_BYTES = 8 * 1024 * 1024
+BUCKET_SECONDS = 3600
+RETENTION_SECONDS = 7 * 86400
+MAX_SOURCES = 5000
+MAX_USERS_PER_SOURCE = 20
+RECENT_EVENTS = 100
+# Don't re-check files more often than this (seconds)
+MIN_INTERVAL = 2.0
+SAVE_INTERVAL = 30.0
+
+_SYSLOG_TS = re.compile(r"^([A-Z][a-z]{2}\s+\d{1,2}\s+\d\d:\d\d:\d\d)\s")
+_ISO_TS = re.compile(r"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[+-]\d\d:?\d\d)?)\s")
+_REPEATED = re.compile(r"message repeated (\d+) times: \[\s*(.*)\]$")
+_PATTERNS = [
+    ("success", re.compile(r"Accepted \S+ for (?P<user>\S+) from (?P<ip>\S+) port \d+")),
+    ("failure", re.compile(r"Failed \S+ for (?:invalid user )?(?P<user>\S+) from (?P<ip>\S+) port \d+")),
+    ("invalid", re.compile(r"Invalid user (?P<user>\S*) from (?P<ip>\S+)")),
+]
+
+
+def parse_event(message: str) -> tuple[str, str | None, str, int] | None:
+    """(kind, user, ip, count) for an sshd login message, else None."""
+    count = 1
+    m = _REPEATED.search(message)
+    if m:
+        count, message = int(m.group(1)), m.group(2)
+    for kind, pattern in _PATTERNS:
+        m = pattern.search(message)
+        if m:
+            return kind, m.group("user") or None, m.group("ip"), count
+    return None
+
+
+def _syslog_time(stamp: str, now: float) -> float:
+    """Syslog timestamps have no year; pick the one that isn't in the future."""
+    year = datetime.fromtimestamp(now).year
+    dt = datetime.strptime(f"{year} {stamp}", "%Y %b %d %H:%M:%S")
+    if dt.timestamp() > now + 86400:
+        dt = dt.replace(year=year - 1)
+    return dt.timestamp()
+
+
+class AuthLog:
+    """Offsets per log file plus in-memory login aggregates."""
+
+    def __init__(self, paths: list[str], state_file):
+        self.paths = paths
+        self.state_file = str(state_file)
+        self.lock = threading.Lock()
+        self.files: dict[str, dict] = {}
+        self.sources: dict[str, dict] = {}
+        self.buckets: dict[int, list[int]] = {}  # hour -> [success, failure]
+        self.recent: deque = deque(maxlen=RECENT_EVENTS)
+        # Successful logins on their own, so a flood of failures can't evict them
+        self.logins: deque = deque(maxlen=RECENT_EVENTS)
+        self.stats = {"bytesRead": 0, "lines": 0, "events": 0, "rotations": 0, "oversizeLines": 0}
+        self._checked = 0.0
+        self._saved = 0.0
+        self._dirty = False
+        self._export: dict = {}
+        self._load()
+
+    # ── Persistence ────────────────────────────────────────────────────
+
+    def _load(self):
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.files = data.get("files", {})
+        self.buckets = {int(k): v for k, v in data.get("buckets", {}).items()}
+        for ip, src in data.get("sources", {}).items():
+            src["buckets"] = {int(k): v for k, v in src.get("buckets", {}).items()}
+            self.sources[ip] = src
+        self.recent.extend(data.get("recent", []))
+        self.logins.extend(data.get("logins", [e for e in self.recent if e["kind"] == "success"]))
+
+    def _save(self):
+        data = {
+            "files": self.files,
+            "buckets": self.buckets,
+            "sources": self.sources,
+            "recent": list(self.recent),
+            "logins": list(self.logins),
+        }
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        tmp = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.state_file)
+        self._saved = time.monotonic()
+        self._dirty = False
+
+    # ── Ingestion ──────────────────────────────────────────────────────
+
+    def ingest(self, force: bool = False):
+        """Read whatever was appended to the logs since the last call."""
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self._checked < MIN_INTERVAL:
+                return
+            self._checked = now
+            for path in self.paths:
+                try:
+                    self._ingest_file(path)
+                except OSError as e:
+                    logger.debug(f"Auth log {path} unreadable: {e}")
+            self._prune(time.time())
+            if self._dirty and (force or now - self._saved >= SAVE_INTERVAL):
+                try:
+                    self._save()
+                except OSError as e:
+                    logger.warning(f"Could not save auth log state: {e}")
+
+    def _ingest_file(self, path: str):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return
+        ident = [st.st_dev, st.st_ino]
+        saved = self.files.get(path)
+        if saved is None:
+            # First sight: only the recent tail
+            start = max(0, st.st_size - BACKFILL_BYTES)
+            saved = self.files[path] = {"ident": ident, "offset": start, "align": start > 0}
+            self._dirty = True
+        elif saved["ident"] != ident:
+            self.stats["rotations"] += 1
+            self._finish_rotated(path, saved)
+            saved = self.files[path] = {"ident": ident, "offset": 0, "align": False}
+            self._dirty = True
+        elif st.st_size < saved["offset"]:
+            self.stats["rotations"] += 1
+            saved.update(offset=0, align=False)
+            self._dirty = True
+        self._read(path, saved, st.st_size)
+
+    def _finish_rotated(self, path: str, saved: dict):
+        """Read the tail of the previous file, which logrotate renamed to ``.1``."""
+        old = f"{path}.1"
+        try:
+            st = os.stat(old)
+        except FileNotFoundError:
+            return
+        if [st.st_dev, st.st_ino] != saved["ident"]:
+            return
+        while st.st_size > saved["offset"]:
+            before = saved["offset"]
+            self._read(old, saved, st.st_size)
+            if saved["offset"] == before:
+                break
+
+    def _read(self, path: str, saved: dict, size: int):
+        if size <= saved["offset"]:
+            return
+        end = min(size, saved["offset"] + MAX_READ_BYTES)
+        with open(path, "rb") as f:
+            f.seek(saved["offset"])
+            data = f.read(end - saved["offset"])
+        # Only consume complete lines; a partial last line is re-read next time
+        cut = data.rfind(b"\n") + 1
+        if not cut:
+            if len(data) == MAX_READ_BYTES:
+                # One line longer than a whole read: skip it, dropping up to the next newline
+                if not saved.get("align"):
+                    self.stats["oversizeLines"] += 1
+                saved["offset"] += len(data)
+                saved["align"] = True
+                self._dirty = True
+            return
+        data = data[:cut]
+        if saved.get("align"):
+            # Started mid-file: drop the partial first line
+            first = data.find(b"\n") + 1
+            data = data[first:]
+            saved["offset"] += first
+            saved["align"] = False
+        saved["offset"] += len(data)
+        self.stats["bytesRead"] += len(data)
+        self._dirty = True
+        now = time.time()
+        for line in data.decode("utf-8", "replace").splitlines():
+            self.stats["lines"] += 1
+            self._line(line, now)
+
+    def _line(self, line: str, now: float):
+        if line.startswith("{"):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                return
+            ts = int(entry.get("__REALTIME_TIMESTAMP", 0)) / 1e6 or now
+            self._message(str(entry.get("MESSAGE", "")), ts)
+            return
+        if not line:
+            # End of a journal export record
+            if self._export:
+                ts = int(self._export.get("__REALTIME_TIMESTAMP", 0)) / 1e6 or now
+                self._message(self._export.get("MESSAGE", ""), ts)
+                self._export = {}
+            return
+        m = _SYSLOG_TS.match(line)
+        if m:
+            try:
+                ts = _syslog_time(m.group(1), now)
+            except ValueError:
+                ts = now
+            self._message(line[m.end():], ts)
+            return
+        m = _ISO_TS.match(line)
+        if m:
+            try:
+                ts = datetime.fromisoformat(m.group(1).replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                ts = now
+            self._message(line[m.end():], ts)
+            return
+        key, sep, value = line.partition("=")
+        if sep and key.isupper():
+            self._export[key] = value
+
+    def _message(self, message: str, ts: float):
+        event = parse_event(message)
+        if event is None:
+            return
+        kind, user, ip, count = event
+        self.stats["events"] += count
+        hour = int(ts // BUCKET_SECONDS * BUCKET_SECONDS)
+        slot = 0 if kind == "success" else 1
+        if kind != "invalid":
+            self.buckets.setdefault(hour, [0, 0])[slot] += count
+        src = self.sources.get(ip)
+        if src is None:
+            if len(self.sources) >= MAX_SOURCES:
+                # Forget the quietest source
+                del self.sources[min(self.sources, key=lambda k: self.sources[k]["lastSeen"])]
+            src = self.sources[ip] = {"success": 0, "failure": 0, "invalidUser": 0,
+                                      "users": [], "firstSeen": ts, "lastSeen": ts, "buckets": {}}
+        if kind == "invalid":
+            # The attempt's failure is counted from its "Failed ..." line
+            src["invalidUser"] += count
+        else:
+            src[kind] += count
+        if user and user not in src["users"] and len(src["users"]) < MAX_USERS_PER_SOURCE:
+            src["users"].append(user)
+        src["firstSeen"] = min(src["firstSeen"], ts)
+        src["lastSeen"] = max(src["lastSeen"], ts)
+        if kind != "invalid":
+            src["buckets"].setdefault(hour, [0, 0])[slot] += count
+        self.recent.append({"time": ts, "kind": kind, "user": user, "ip": ip, "count": count})
+        if kind == "success":
+            self.logins.append(self.recent[-1])
+
+    def _prune(self, now: float):
+        cutoff = now - RETENTION_SECONDS
+        for hour in [h for h in self.buckets if h < cutoff]:
+            del self.buckets[hour]
+        for ip in list(self.sources):
+            src = self.sources[ip]
+            for hour in [h for h in src["buckets"] if h < cutoff]:
+                del src["buckets"][hour]
+            if src["lastSeen"] < cutoff:
+                del self.sources[ip]
+
+    # ── Aggregates ─────────────────────────────────────────────────────
+
+    def summary(self, hours: int = 24, top: int = 20) -> dict:
+        """Totals, hourly series, top sources and threat level over the last ``hours``."""
+        self.ingest()
+        now = time.time()
+        since = now - hours * 3600
+        with self.lock:
+            series = sorted((h, v) for h, v in self.buckets.items() if h + BUCKET_SECONDS > since)
+            sources = []
+            for ip, src in self.sources.items():
+                success = sum(v[0] for h, v in src["buckets"].items() if h + BUCKET_SECONDS > since)
+                failure = sum(v[1] for h, v in src["buckets"].items() if h + BUCKET_SECONDS > since)
+                if success or failure:
+                    sources.append({"ip": ip, "success": success, "failure": failure,
+                                    "invalidUser": src["invalidUser"], "users": src["users"],
+                                    "firstSeen": src["firstSeen"], "lastSeen": src["lastSeen"]})
+            logins = [e for e in self.logins if e["time"] >= since]
+            files = {p: {"offset": f["offset"]} for p, f in self.files.items()}
+            stats = dict(self.stats)
+        failures_1h = _failures_since(series, now - 3600)
+        sources.sort(key=lambda s: (-s["failure"], -s["success"]))
+        return {
+            "threatLevel": threat_level(failures_1h, sources),
+            "success": sum(v[0] for _, v in series),
+            "failure": sum(v[1] for _, v in series),
+            "failuresLastHour": failures_1h,
+            "series": [{"hour": h, "success": v[0], "failure": v[1]} for h, v in series],
+            "sources": sources[:top],
+            "sourceCount": len(sources),
+            "recentLogins": logins[-20:],
+            "files": files,
+            **stats,
+        }
+
+
+def _failures_since(series: list, since: float) -> int:
+    """Failures in hourly buckets after ``since``; the bucket it falls in counts pro rata."""
+    total = 0.0
+    for hour, (_, failure) in series:
+        overlap = min(1.0, (hour + BUCKET_SECONDS - since) / BUCKET_SECONDS)
+        if overlap > 0:
+            total += failure * overlap
+    return round(total)
+
+
+def threat_level(failures_last_hour: int, sources: list[dict]) -> str:
+    """low / medium / high from recent failures and the noisiest source."""
+    worst = max((s["failure"] for s in sources), default=0)
+    if failures_last_hour >= 100 or worst >= 500:
+        return "high"
+    if failures_last_hour >= 10 or worst >= 50:
+        return "medium"
+    return "low"
+
+
+_auth_log: AuthLog | None = None
+_auth_log_lock = threading.Lock()
+
+
+def get_auth_log() -> AuthLog:
+    """Shared auth log reader configured from ``DASHBOARD_AUTH_LOGS``."""
+    global _auth_log
+    with _auth_log_lock:
+        if _auth_log is None:
+            env = os.environ.get("DASHBOARD_AUTH_LOGS")
+            paths = [p.strip() for p in env.split(",") if p.strip()] if env else DEFAULT_LOGS
+            _auth_log = AuthLog(paths, DASHBOARD_DATA_DIR / "authlog.json")
+        return _auth_log
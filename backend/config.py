@@ -6,7 +6,6 @@ import json
 import shutil
 import logging
 from pathlib import Path
-from collections import deque
 
 logger = logging.getLogger("admin-dashboard")
 
@@ -17,10 +16,13 @@ KANBAN_FILE = Path(__file__).parent.parent / "kanban.json"
 DASHBOARD_DATA_DIR = Path(__file__).parent.parent / "data"
 DASHBOARD_CONFIG_FILE = DASHBOARD_DATA_DIR / "dashboard-config.json"
 
-# ── State (in-memory) ─────────────────────────────────────────────────
-network_log = deque(maxlen=500)
-network_paused = False
-network_id_counter = 0
+# Cross-origin clients allowed by CORS and the live WebSocket
+ALLOWED_ORIGINS = os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:8787").split(",")
+
+# ── State ─────────────────────────────────────────────────────────────
+# Shared mutable state (counters, flags, rate limits, secrets) lives in
+# state.py so it stays consistent across uvicorn workers; network events are
+# persisted by netstore.py.
 
 
 # ── Helpers ───────────────────────────────────────────────────────────
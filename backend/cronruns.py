@@ -0,0 +1,222 @@
+"""Cron run history built from ``cron:<job>:run:<run>`` sessions.
+
+Each agent's sessions.json is re-parsed only when its mtime/size changes, and
+a run's transcript is read only when its session entry changes (new run or
+``updatedAt`` moved). Reading a run takes the transcript's first line (start
+time) and its tail (end time, final status), never the whole file.
+
+Per-job stats (p50/p95 duration, failure rate over the last ``RUN_WINDOW``
+runs) are cached and recomputed only for jobs whose runs changed.
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+
+from config import OPENCLAW_DIR
+from jsonl_query import as_time
+from transcripts import message_of
+from sessionstore import load_sessions
+
+# Runs per job that the rolling stats cover
+RUN_WINDOW = 50
+# Bytes read from the end of a transcript to find its last entries
+TAIL_BYTES = 64 * 1024
+FAILED = ("error", "aborted")
+
+
+def parse_run_key(key: str) -> tuple[str, str, str] | None:
+    """(agent id, job id, run id) for a cron run session key, else None."""
+    parts = key.split(":")
+    try:
+        cron, run = parts.index("cron"), parts.index("run")
+    except ValueError:
+        return None
+    if run != cron + 2 or run + 1 >= len(parts):
+        return None
+    agent = parts[1] if len(parts) > 1 else "unknown"
+    return agent, parts[cron + 1], ":".join(parts[run + 1:])
+
+
+def _entry_time(entry: dict) -> float | None:
+    msg = message_of(entry) or {}
+    return as_time(entry.get("timestamp") or msg.get("timestamp"))
+
+
+def _read_transcript(path: Path) -> tuple[float | None, float | None, str | None]:
+    """(start, end, status) from the first line and the tail of a transcript."""
+    try:
+        with open(path, "rb") as f:
+            try:
+                start = _entry_time(json.loads(f.readline(TAIL_BYTES)))
+            except ValueError:
+                start = None
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - TAIL_BYTES))
+            tail = f.read().split(b"\n")
+    except OSError:
+        return None, None, None
+    if size > TAIL_BYTES:
+        tail = tail[1:]  # first piece is a partial line
+    end = status = None
+    for raw in reversed(tail):
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            continue
+        if end is None:
+            end = _entry_time(entry)
+        msg = message_of(entry)
+        if msg and msg.get("role") == "assistant":
+            stop = msg.get("stopReason")
+            status = "error" if msg.get("errorMessage") or stop == "error" else \
+                "aborted" if stop == "aborted" else "ok"
+            break
+    return start, end, status
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+class CronRunIndex:
+    """Cron runs per job, refreshed from changed session files only."""
+
+    def __init__(self, root=OPENCLAW_DIR):
+        self.root = Path(root)
+        self.lock = threading.Lock()
+        # sessions.json path -> (mtime_ns, size, run keys it listed)
+        self._files: dict[str, tuple[int, int, set]] = {}
+        # run session key -> (signature, run record)
+        self._runs: dict[str, tuple[tuple, dict]] = {}
+        self._jobs: dict[str, list[str]] = {}
+        self._stats: dict[str, dict] = {}
+        self.stats = {"refreshes": 0, "filesParsed": 0, "runsRead": 0}
+
+    def refresh(self):
+        """Pick up changed sessions.json files and re-read only changed runs."""
+        self.stats["refreshes"] += 1
+        seen = set()
+        dirty_jobs = set()
+        agents_dir = self.root / "agents"
+        try:
+            agent_dirs = [e.path for e in os.scandir(agents_dir) if e.is_dir()]
+        except OSError:
+            agent_dirs = []
+        for agent_dir in agent_dirs:
+            path = os.path.join(agent_dir, "sessions", "sessions.json")
+            seen.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            cached = self._files.get(path)
+            if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+                continue
+            try:
+                records = load_sessions(path, os.path.basename(agent_dir))
+            except (OSError, ValueError):
+                continue
+            self.stats["filesParsed"] += 1
+            keys = set()
+            for sess in records:
+                key = sess.key
+                parsed = parse_run_key(key)
+                if parsed is None:
+                    continue
+                keys.add(key)
+                sig = (sess.get("updatedAt"), sess.get("sessionFile"), sess.get("totalTokens"))
+                old = self._runs.get(key)
+                if old is None or old[0] != sig:
+                    self._runs[key] = (sig, self._read_run(key, parsed, sess))
+                    dirty_jobs.add(parsed[1])
+            for gone in (cached[2] if cached else set()) - keys:
+                dirty_jobs.add(self._runs.pop(gone)[1]["jobId"])
+            self._files[path] = (st.st_mtime_ns, st.st_size, keys)
+        for path in set(self._files) - seen:
+            for gone in self._files.pop(path)[2]:
+                dirty_jobs.add(self._runs.pop(gone)[1]["jobId"])
+        if dirty_jobs:
+            self._reindex(dirty_jobs)
+
+    def _read_run(self, key: str, parsed: tuple, sess) -> dict:
+        self.stats["runsRead"] += 1
+        agent, job_id, run_id = parsed
+        start = end = status = None
+        if sess.get("sessionFile"):
+            start, end, status = _read_transcript(Path(sess["sessionFile"]))
+        if end is None and sess.get("updatedAt"):
+            end = sess["updatedAt"] / 1000
+        if sess.get("abortedLastRun"):
+            status = "aborted"
+        status = sess.get("status") or status or "unknown"
+        duration = round(end - start, 3) if start is not None and end is not None else None
+        return {
+            "id": key,
+            "runId": run_id,
+            "jobId": job_id,
+            "agentId": agent,
+            "startedAt": int(start * 1000) if start is not None else None,
+            "endedAt": int(end * 1000) if end is not None else None,
+            "durationSeconds": duration,
+            "status": status,
+            "totalTokens": sess.get("totalTokens", 0),
+            "inputTokens": sess.get("inputTokens"),
+            "outputTokens": sess.get("outputTokens"),
+        }
+
+    def _reindex(self, jobs: set):
+        for job_id in jobs:
+            self._jobs.pop(job_id, None)
+            self._stats.pop(job_id, None)
+        for key, (_, run) in self._runs.items():
+            if run["jobId"] in jobs:
+                self._jobs.setdefault(run["jobId"], []).append(key)
+        for job_id in jobs & set(self._jobs):
+            self._jobs[job_id].sort(key=lambda k: self._runs[k][1]["startedAt"] or 0, reverse=True)
+
+    def runs(self, job_id: str, limit: int = 50) -> list[dict]:
+        """Newest runs of a job."""
+        return [self._runs[k][1] for k in self._jobs.get(job_id, [])[:limit]]
+
+    def job_stats(self, job_id: str) -> dict:
+        """Rolling duration percentiles and failure rate over the last ``RUN_WINDOW`` runs."""
+        cached = self._stats.get(job_id)
+        if cached is not None:
+            return cached
+        window = self.runs(job_id, RUN_WINDOW)
+        durations = sorted(r["durationSeconds"] for r in window if r["durationSeconds"] is not None)
+        finished = [r for r in window if r["status"] != "unknown"]
+        failures = sum(1 for r in finished if r["status"] in FAILED)
+        stats = {
+            "runs": len(self._jobs.get(job_id, [])),
+            "window": len(window),
+            "p50Seconds": _percentile(durations, 50),
+            "p95Seconds": _percentile(durations, 95),
+            "failureRate": round(failures / len(finished), 3) if finished else None,
+            "lastStatus": window[0]["status"] if window else None,
+            "lastRunAt": window[0]["startedAt"] if window else None,
+        }
+        self._stats[job_id] = stats
+        return stats
+
+
+_index: CronRunIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_cron_runs() -> CronRunIndex:
+    """Shared run index, refreshed (cheaply) on each call."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CronRunIndex()
+        index = _index
+    with index.lock:
+        index.refresh()
+    return index
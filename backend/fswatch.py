@@ -0,0 +1,399 @@
+"""Filesystem change notifications for OPENCLAW_DIR.
+
+One background thread watches the files the dashboard reads from disk
+(openclaw.json, agents/*/sessions, cron/jobs.json, workspace-atlas and
+kanban.json) so caches and clients can react to changes instead of polling.
+
+- Uses inotify (via ctypes, no extra dependency) where available and falls
+  back to a scandir/stat-diff poller elsewhere.
+- Bursts of events are coalesced: subscribers get one batch per quiet period
+  with at most one event per path.
+- ``subscribe(callback, prefixes)`` is the hook for server-side caches; the
+  callback runs on the watcher thread and must be quick.
+
+Set ``DASHBOARD_FS_WATCH`` to ``inotify``, ``poll`` or ``off`` (default ``auto``).
+"""
+
+import os
+import time
+import errno
+import ctypes
+import ctypes.util
+import select
+import struct
+import logging
+import threading
+from pathlib import Path
+
+from config import OPENCLAW_DIR, KANBAN_FILE
+
+logger = logging.getLogger("admin-dashboard")
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Directory names never descended into
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv"}
+
+
+def _under(path: str, prefixes: list[str]) -> bool:
+    return any(path == p or path.startswith(p + os.sep) for p in prefixes)
+
+
+class WatchRoot:
+    """A directory to watch; ``names`` limits a non-recursive root to some files."""
+
+    def __init__(self, path: Path, recursive: bool = True, names: set | None = None):
+        self.path = Path(path)
+        self.recursive = recursive
+        self.names = names
+
+    def wants(self, path: str) -> bool:
+        return self.names is None or os.path.basename(path) in self.names
+
+
+def default_roots() -> list[WatchRoot]:
+    """The OpenClaw files the dashboard reads from disk."""
+    return [
+        WatchRoot(OPENCLAW_DIR, recursive=False, names={"openclaw.json"}),
+        WatchRoot(OPENCLAW_DIR / "agents"),
+        WatchRoot(OPENCLAW_DIR / "cron"),
+        WatchRoot(OPENCLAW_DIR / "workspace-atlas"),
+        WatchRoot(KANBAN_FILE.parent, recursive=False, names={KANBAN_FILE.name}),
+    ]
+
+
+class _InotifyBackend:
+    """Raw inotify through libc; one watch descriptor per directory."""
+
+    name = "inotify"
+
+    def __init__(self, roots: list[WatchRoot]):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.roots = roots
+        self.wds: dict[int, tuple[str, WatchRoot]] = {}
+        self.paths: dict[str, int] = {}
+        self._limit_warned = False
+        for root in roots:
+            self._watch_root(root)
+
+    def _add(self, path: str, root: WatchRoot) -> bool:
+        if path in self.paths:
+            return True
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK | IN_ONLYDIR)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC and not self._limit_warned:
+                self._limit_warned = True
+                logger.warning("inotify watch limit reached; some directories are not watched")
+            return False
+        self.wds[wd] = (path, root)
+        self.paths[path] = wd
+        return True
+
+    def _watch_tree(self, path: str, root: WatchRoot, events: list | None = None):
+        """Watch ``path`` and (for recursive roots) every directory below it.
+
+        When ``events`` is given, files found in a freshly created directory are
+        reported as created — they may have appeared before the watch existed.
+        """
+        if not self._add(path, root) or not root.recursive:
+            return
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS and not entry.name.startswith("."):
+                            self._watch_tree(entry.path, root, events)
+                    elif events is not None:
+                        events.append((entry.path, "created"))
+        except OSError:
+            pass
+
+    def _watch_root(self, root: WatchRoot, events: list | None = None):
+        if root.path.is_dir():
+            self._watch_tree(str(root.path), root, events)
+        else:
+            # Watch the nearest existing parent so we notice the root being created
+            parent = root.path.parent
+            if parent.is_dir():
+                self._add(str(parent), WatchRoot(parent, recursive=False, names={root.path.name}))
+
+    def read(self, timeout: float) -> list[tuple[str, str]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buf = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+            offset += _EVENT_HEADER.size
+            name = buf[offset:offset + length].split(b"\0", 1)[0].decode("utf-8", "surrogateescape")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                events.append(("", "overflow"))
+                continue
+            if mask & IN_IGNORED:
+                path = self.wds.pop(wd, (None, None))[0]
+                if path:
+                    self.paths.pop(path, None)
+                continue
+            if wd not in self.wds:
+                continue
+            dir_path, root = self.wds[wd]
+            path = os.path.join(dir_path, name) if name else dir_path
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._on_new_dir(path, root, events)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    events.append((path, "deleted"))
+                continue
+            if name and not root.wants(path):
+                continue
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                events.append((path, "created"))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append((path, "deleted"))
+            elif mask & (IN_MODIFY | IN_CLOSE_WRITE):
+                events.append((path, "modified"))
+        return events
+
+    def _on_new_dir(self, path: str, parent_root: WatchRoot, events: list):
+        # A configured root that didn't exist yet (e.g. cron/ on a fresh install)
+        for root in self.roots:
+            if str(root.path) == path:
+                self._watch_root(root, events)
+                events.append((path, "created"))
+                return
+        if parent_root.recursive:
+            name = os.path.basename(path)
+            if name not in SKIP_DIRS and not name.startswith("."):
+                self._watch_tree(path, parent_root, events)
+                events.append((path, "created"))
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class _PollBackend:
+    """Portable fallback: diff (mtime, size) snapshots taken with os.scandir."""
+
+    name = "poll"
+
+    def __init__(self, roots: list[WatchRoot], interval: float = 1.0):
+        self.roots = roots
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan_dir(self, path: str, root: WatchRoot, out: dict):
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if root.recursive and entry.name not in SKIP_DIRS and not entry.name.startswith("."):
+                                self._scan_dir(entry.path, root, out)
+                        elif root.wants(entry.path):
+                            st = entry.stat(follow_symlinks=False)
+                            out[entry.path] = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+
+    def _scan(self) -> dict:
+        out = {}
+        for root in self.roots:
+            self._scan_dir(str(root.path), root, out)
+        return out
+
+    def read(self, timeout: float) -> list[tuple[str, str]]:
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        previous = self.snapshot
+        self.snapshot = current
+        events = []
+        for path, sig in current.items():
+            old = previous.get(path)
+            if old is None:
+                events.append((path, "created"))
+            elif old != sig:
+                events.append((path, "modified"))
+        for path in previous.keys() - current.keys():
+            events.append((path, "deleted"))
+        return events
+
+    def close(self):
+        pass
+
+
+class FileWatcher:
+    """Single background watcher that coalesces events and fans them out to subscribers."""
+
+    def __init__(self, roots: list[WatchRoot] | None = None, mode: str = "auto",
+                 coalesce: float = 0.2, max_delay: float = 1.0, poll_interval: float = 1.0):
+        self.roots = roots if roots is not None else default_roots()
+        self.mode = mode
+        self.coalesce = coalesce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.backend = None
+        self._subscribers: dict[int, tuple] = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.stats = {"batches": 0, "events": 0, "raw": 0}
+
+    def _make_backend(self):
+        if self.mode in ("auto", "inotify") and hasattr(select, "select") and os.name == "posix":
+            try:
+                return _InotifyBackend(self.roots)
+            except (OSError, AttributeError) as e:
+                if self.mode == "inotify":
+                    raise
+                logger.info(f"inotify unavailable ({e}); polling for file changes")
+        return _PollBackend(self.roots, self.poll_interval)
+
+    def start(self):
+        """Start the watcher thread (idempotent)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self.backend = self._make_backend()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="fswatch", daemon=True)
+            self._thread.start()
+            logger.info(f"File watcher started ({self.backend.name})")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self.backend:
+            self.backend.close()
+
+    def subscribe(self, callback, prefixes: list | None = None) -> int:
+        """Call ``callback(events)`` for each batch touching one of ``prefixes``.
+
+        A prefix matches that exact path or anything below it (``agents/main``
+        does not match ``agents/main2``).
+
+        Events are ``{"path": absolute path, "kind": created|modified|deleted|overflow}``.
+        An ``overflow`` event (path "") means changes were lost and caches should
+        be rebuilt; it is delivered to every subscriber.
+        """
+        with self._lock:
+            self._next_token += 1
+            token = self._next_token
+            prefixes = [str(p) for p in prefixes] if prefixes else None
+            self._subscribers[token] = (callback, prefixes)
+        self.start()
+        return token
+
+    def unsubscribe(self, token: int):
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def info(self) -> dict:
+        return {
+            "backend": self.backend.name if self.backend else None,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "subscribers": len(self._subscribers),
+            "watches": len(getattr(self.backend, "wds", {})) or None,
+            **self.stats,
+        }
+
+    def _dispatch(self, pending: dict):
+        events = [{"path": path, "kind": kind} for path, kind in pending.items()]
+        self.stats["batches"] += 1
+        self.stats["events"] += len(events)
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for callback, prefixes in subscribers:
+            if prefixes is None:
+                batch = events
+            else:
+                batch = [e for e in events if e["kind"] == "overflow" or _under(e["path"], prefixes)]
+            if not batch:
+                continue
+            try:
+                callback(batch)
+            except Exception as e:
+                logger.warning(f"File watch subscriber failed: {e}")
+
+    def _run(self):
+        pending: dict[str, str] = {}
+        first_at = last_at = 0.0
+        while not self._stop.is_set():
+            timeout = self.coalesce if pending else 1.0
+            try:
+                raw = self.backend.read(timeout)
+            except Exception as e:
+                logger.warning(f"File watcher read failed: {e}")
+                time.sleep(1.0)
+                continue
+            now = time.monotonic()
+            if raw:
+                self.stats["raw"] += len(raw)
+                if not pending:
+                    first_at = now
+                last_at = now
+                for path, kind in raw:
+                    # A file created within the batch stays "created" however often it is written
+                    if pending.get(path) == "created" and kind == "modified":
+                        continue
+                    pending[path] = kind
+            if pending and (now - last_at >= self.coalesce or now - first_at >= self.max_delay):
+                batch, pending = pending, {}
+                self._dispatch(batch)
+
+
+_watcher: FileWatcher | None = None
+_watcher_lock = threading.Lock()
+
+
+def get_watcher() -> FileWatcher | None:
+    """Shared watcher for OPENCLAW_DIR, or None when ``DASHBOARD_FS_WATCH=off``."""
+    global _watcher
+    mode = os.environ.get("DASHBOARD_FS_WATCH", "auto")
+    if mode == "off":
+        return None
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = FileWatcher(mode=mode)
+        return _watcher
+
+
+def subscribe(callback, prefixes: list | None = None) -> int | None:
+    """Subscribe to the shared watcher; returns a token, or None if watching is off."""
+    watcher = get_watcher()
+    return watcher.subscribe(callback, prefixes) if watcher else None
@@ -0,0 +1,170 @@
+"""Streaming filter/projection queries over JSONL files.
+
+Predicates are ``path op value`` strings, e.g. ``type=message``,
+``message.content.*.name=exec``, ``message.content.*.text~error`` or
+``timestamp>=2026-01-01``. Paths are dot-separated; a numeric segment
+indexes a list and ``*`` matches any element.
+
+Ops: ``=`` ``!=`` ``~`` (case-insensitive contains) ``>`` ``>=`` ``<`` ``<=``.
+Range ops compare timestamps when both sides look like one (ISO strings or
+epoch seconds/milliseconds), numbers numerically and anything else as text.
+
+Files are read line by line from a byte offset. Before decoding a line, the
+scanner checks that the raw bytes contain every string the predicates
+require, so most non-matching lines are never parsed.
+"""
+
+import re
+import json
+from datetime import datetime, timezone
+
+_PREDICATE = re.compile(r"^\s*([^=!~<>\s]+)\s*(!=|>=|<=|=|~|>|<)\s*(.*?)\s*$")
+_MISSING = object()
+
+
+class Predicate:
+    __slots__ = ("path", "op", "value", "text", "time")
+
+    def __init__(self, expr: str):
+        m = _PREDICATE.match(expr)
+        if not m:
+            raise ValueError(f"Invalid predicate: {expr!r}")
+        path, self.op, raw = m.groups()
+        self.path = [int(p) if p.isdigit() else p for p in path.split(".")]
+        try:
+            self.value = json.loads(raw)
+        except json.JSONDecodeError:
+            self.value = raw
+        self.text = str(self.value).lower() if self.op == "~" else None
+        self.time = as_time(self.value) if self.op in (">", ">=", "<", "<=") else None
+
+    def needle(self) -> bytes | None:
+        """Lowercased bytes any matching raw line must contain, if one can be derived."""
+        if self.op not in ("=", "~") or not isinstance(self.value, str) or not self.value:
+            return None
+        # Escaped characters are spelled differently in the file, so skip those
+        if not self.value.isascii() or any(c in self.value for c in '"\\') \
+                or any(ord(c) < 0x20 for c in self.value):
+            return None
+        return self.value.lower().encode()
+
+    def matches(self, obj) -> bool:
+        values = list(_resolve(obj, self.path))
+        if self.op == "!=":
+            return all(v != self.value for v in values)
+        return any(self._test(v) for v in values)
+
+    def _test(self, v) -> bool:
+        if self.op == "=":
+            return v == self.value
+        if self.op == "~":
+            if not isinstance(v, str):
+                v = json.dumps(v)
+            return self.text in v.lower()
+        a, b = as_time(v), self.time
+        if a is None or b is None:
+            if isinstance(v, (int, float)) and isinstance(self.value, (int, float)):
+                a, b = v, self.value
+            else:
+                a, b = str(v), str(self.value)
+        if self.op == ">":
+            return a > b
+        if self.op == ">=":
+            return a >= b
+        if self.op == "<":
+            return a < b
+        return a <= b
+
+
+def as_time(value) -> float | None:
+    """Epoch seconds for ISO strings and epoch s/ms numbers, else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    if isinstance(value, str) and len(value) >= 10 and value[4:5] == "-":
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    return None
+
+
+def _resolve(obj, path):
+    """Yield every value at ``path`` (``*`` fans out over lists and dicts)."""
+    if not path:
+        yield obj
+        return
+    head, rest = path[0], path[1:]
+    if head == "*":
+        children = obj if isinstance(obj, list) else obj.values() if isinstance(obj, dict) else ()
+        for child in children:
+            yield from _resolve(child, rest)
+    elif isinstance(obj, dict):
+        key = str(head)
+        if key in obj:
+            yield from _resolve(obj[key], rest)
+    elif isinstance(obj, list) and isinstance(head, int) and head < len(obj):
+        yield from _resolve(obj[head], rest)
+
+
+def project(obj, fields: list[str]) -> dict:
+    """Pick ``fields`` (paths) from ``obj``; wildcard paths give a list."""
+    out = {}
+    for field in fields:
+        path = [int(p) if p.isdigit() else p for p in field.split(".")]
+        values = list(_resolve(obj, path))
+        if "*" in path:
+            out[field] = values
+        elif values:
+            out[field] = values[0]
+    return out
+
+
+def scan(path, predicates: list[Predicate], fields: list[str] | None = None,
+         q: str = "", offset: int = 0, index: int = 0, limit: int = 50,
+         max_bytes: int = 64 * 1024 * 1024) -> dict:
+    """Scan ``path`` from byte ``offset`` (line ``index``) for matching lines.
+
+    Stops after ``limit`` matches or ``max_bytes`` read. ``next`` is the
+    ``(offset, index)`` to resume from, or None at end of file.
+    """
+    needles = [n for n in (p.needle() for p in predicates) if n]
+    if q:
+        needles.append(q.lower().encode())
+    matches = []
+    scanned = decoded = 0
+    start = offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            line_index = index
+            offset += len(raw)
+            index += 1
+            scanned += 1
+            line = raw.strip()
+            if line and needles:
+                lowered = line.lower()
+                if not all(n in lowered for n in needles):
+                    line = b""
+            if line:
+                try:
+                    data = json.loads(line)
+                    decoded += 1
+                except ValueError:
+                    data = _MISSING
+                if data is not _MISSING and all(p.matches(data) for p in predicates):
+                    matches.append({
+                        "index": line_index,
+                        "data": project(data, fields) if fields else data,
+                    })
+                elif data is _MISSING and not predicates:
+                    matches.append({"index": line_index, "data": None, "raw": line.decode("utf-8", "replace")})
+            if len(matches) >= limit or offset - start >= max_bytes:
+                more = f.read(1) != b""
+                return {"lines": matches, "next": (offset, index) if more else None,
+                        "scanned": scanned, "decoded": decoded}
+    return {"lines": matches, "next": None, "scanned": scanned, "decoded": decoded}
@@ -0,0 +1,179 @@
+"""Group-commit appender for JSONL files.
+
+Concurrent appenders to the same file are serialized through one queue per
+file. Whoever arrives while no write is running becomes the leader: it takes
+every line queued so far, writes them with a single ``write`` (and at most one
+``fsync``), then wakes the followers whose lines went out with it. Lines are
+never interleaved, and a burst of N appends costs one syscall round instead of
+N open/write/close cycles.
+
+The file descriptor stays open between batches (reopened if the file is
+rotated) and writes take an ``flock`` so other processes appending with the
+same protocol don't interleave either.
+
+``DASHBOARD_JSONL_FSYNC=1`` fsyncs each batch; ``DASHBOARD_JSONL_TICK_MS``
+lets the leader wait briefly to gather more lines per batch.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Open appenders kept around (least recently used idle ones are closed)
+MAX_OPEN_FILES = 64
+
+
+class _GroupCommitFile:
+    """Append queue for one file."""
+
+    def __init__(self, path: str, fsync: bool, tick: float):
+        self.path = path
+        self.fsync = fsync
+        self.tick = tick
+        self.cond = threading.Condition()
+        self.pending: list[bytes] = []
+        self.enqueued = 0
+        self.flushed = 0
+        self.failed: dict[int, Exception] = {}
+        self.writing = False
+        # Appenders currently holding this object (guarded by _files_lock)
+        self.users = 0
+        self.fd: int | None = None
+        self.ino = None
+        self.stats = {"lines": 0, "batches": 0}
+
+    def _open(self):
+        """Open (or reopen after rotation/deletion) the append descriptor."""
+        try:
+            st = os.stat(self.path)
+            current = (st.st_dev, st.st_ino)
+        except FileNotFoundError:
+            current = None
+        if self.fd is not None and current == self.ino:
+            return
+        self.close()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        st = os.fstat(self.fd)
+        self.ino = (st.st_dev, st.st_ino)
+
+    def _write(self, batch: list[bytes]):
+        self._open()
+        data = b"".join(batch)
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(self.fd, view)
+                view = view[written:]
+            if self.fsync:
+                os.fsync(self.fd)
+        finally:
+            if fcntl:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def append(self, lines: list[bytes]):
+        """Queue ``lines`` (each ending in newline) and return once they are written."""
+        with self.cond:
+            self.pending.extend(lines)
+            self.enqueued += 1
+            ticket = self.enqueued
+            while self.flushed < ticket:
+                if self.writing:
+                    self.cond.wait()
+                    continue
+                # Become the leader for everything queued so far
+                self.writing = True
+                if self.tick:
+                    self.cond.release()
+                    time.sleep(self.tick)
+                    self.cond.acquire()
+                batch, self.pending = self.pending, []
+                upto = self.enqueued
+                self.cond.release()
+                error = None
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    error = e
+                finally:
+                    self.cond.acquire()
+                    self.writing = False
+                if error is not None:
+                    for t in range(self.flushed + 1, upto + 1):
+                        self.failed[t] = error
+                else:
+                    self.stats["lines"] += len(batch)
+                    self.stats["batches"] += 1
+                self.flushed = upto
+                self.cond.notify_all()
+            error = self.failed.pop(ticket, None)
+        if error is not None:
+            raise error
+
+    def close(self):
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            except OSError:
+                pass
+            self.fd = None
+            self.ino = None
+
+
+_files: OrderedDict[str, _GroupCommitFile] = OrderedDict()
+_files_lock = threading.Lock()
+
+
+def _evict():
+    """Close least recently used appenders nobody holds, down to ``MAX_OPEN_FILES``."""
+    excess = len(_files) - MAX_OPEN_FILES
+    for path in [p for p, f in _files.items() if not f.users][:max(0, excess)]:
+        _files.pop(path).close()
+
+
+def _acquire(path: str) -> _GroupCommitFile:
+    """The one appender for ``path``; it is not evicted until released."""
+    with _files_lock:
+        f = _files.get(path)
+        if f is None:
+            f = _GroupCommitFile(
+                path,
+                fsync=os.environ.get("DASHBOARD_JSONL_FSYNC", "0") == "1",
+                tick=float(os.environ.get("DASHBOARD_JSONL_TICK_MS", "0")) / 1000,
+            )
+            _files[path] = f
+        else:
+            _files.move_to_end(path)
+        f.users += 1
+        _evict()
+        return f
+
+
+def _release(f: _GroupCommitFile):
+    with _files_lock:
+        f.users -= 1
+        _evict()
+
+
+def append_lines(path, lines: list[str]):
+    """Append JSON lines (without trailing newlines) to ``path`` as one group-committed batch."""
+    encoded = [line.encode("utf-8") + b"\n" for line in lines]
+    if encoded:
+        f = _acquire(str(path))
+        try:
+            f.append(encoded)
+        finally:
+            _release(f)
+
+
+def stats() -> dict:
+    with _files_lock:
+        return {path: dict(f.stats) for path, f in _files.items()}
@@ -3,7 +3,24 @@
 Modular structure:
 - config.py     : Paths, constants, helpers
 - models.py     : Pydantic models
-- routes/       : API route modules
+- fswatch.py    : Shared OPENCLAW_DIR file watcher
+- state.py      : Shared state backend (memory / SQLite) for multi-worker runs
+- netstore.py   : Persistent network event store (SQLite)
+- jsonl_writer.py : Group-commit JSONL appender
+- jsonl_query.py  : Streaming JSONL filter/projection queries
+- storage.py    : Cached disk usage accounting for OPENCLAW_DIR
+- transcripts.py : Incremental turn index for session transcripts
+- authlog.py    : Incremental auth log parser (login/failure aggregates)
+- procsampler.py : Background process sampler (CPU deltas, top-N)
+- cronruns.py   : Incremental cron run index (durations, failure rate)
+- throughput.py : Live agent rates from transcript growth
+- admission.py  : Per-class concurrency limits and load shedding
+- singleflight.py : Coalescing of concurrent identical computations
+- sessionstore.py : Streaming sessions.json parser, compact session records
+- archive.py    : Streaming tar.gz/zip export of a directory tree
+- palette.py    : Trigram index for the command palette
+- profile_startup.py : Cold-start profile / budget check
+- routes/       : API route modules (loaded on first use, see routes/__init__.py)
     - files.py    : File operations
     - kanban.py   : Kanban board
     - agents.py   : Agent info
@@ -12,19 +29,30 @@ Modular structure:
     - calendar.py : Cron jobs
     - health.py   : Health & security
     - config.py   : Dashboard config
+    - live.py     : Multiplexed WebSocket live updates
+    - fsevents.py : Filesystem change events (SSE)
+    - storage.py  : Disk usage per agent/workspace
+    - gateway.py  : Streaming reverse proxy to the gateway
+    - security.py : Auth log summary and threat level
+    - palette.py  : Command palette search
 """
 
 import os
 import time
+_import_start = time.perf_counter()
 import logging
-from collections import defaultdict
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 import secrets
 
-from routes import register_all_routes
+from routes import register_all_routes, start_warmup, stop_routes
+from admission import AdmissionMiddleware, get_admission
+from state import get_state
+from config import ALLOWED_ORIGINS
 
 # ── Logging ─────────────────────────────────────────────────────────────
 logging.basicConfig(
@@ -44,8 +72,8 @@ class SecurityHeadersMiddleware:
             return
         async def send_wrapper(message):
             if message["type"] == "http.response.start":
-                headers = dict(message.get("headers", []))
                 # Set security headers
+                headers = {}
                 headers[b"x-content-type-options"] = b"nosniff"
                 headers[b"x-frame-options"] = b"DENY"
                 headers[b"referrer-policy"] = b"strict-origin-when-cross-origin"
@@ -58,18 +86,19 @@ class SecurityHeadersMiddleware:
                     "font-src 'self' data:;"
                 )
                 headers[b"content-security-policy"] = csp.encode()
-                message["headers"] = list(headers.items())
+                # A list, not a dict: repeated headers (Set-Cookie) must survive
+                message["headers"] = [(k, v) for k, v in message.get("headers", [])
+                                      if k.lower() not in headers] + list(headers.items())
             await send(message)
         await self.app(scope, receive, send_wrapper)
 
 # ── Rate Limiting ──────────────────────────────────────────────────────
 class SimpleRateLimiter:
-    """Simple in-memory sliding window rate limiter."""
+    """Simple sliding window rate limiter (windows kept in the shared state backend)."""
     def __init__(self, app, calls: int = 60, period: int = 60):
         self.app = app
         self.calls = calls
         self.period = period
-        self.clocks = defaultdict(list)  # ip -> list of timestamps
 
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
@@ -78,31 +107,45 @@ class SimpleRateLimiter:
         # Build a Request to access client info
         request = Request(scope, receive)
         ip = request.client.host if request.client else "unknown"
-        now = time.time()
-        # Clean old entries
-        self.clocks[ip] = [t for t in self.clocks[ip] if now - t < self.period]
-        if len(self.clocks[ip]) >= self.calls:
+        state = get_state()
+        bucket = f"ratelimit:{ip}"
+        if state.blocking:
+            # SQLite takes a write lock (busy timeout up to seconds); keep it off the event loop
+            allowed = await run_in_threadpool(state.rate_limit_hit, bucket, self.calls, self.period)
+        else:
+            allowed = state.rate_limit_hit(bucket, self.calls, self.period)
+        if not allowed:
             raise HTTPException(status_code=429, detail="Rate limit exceeded")
-        self.clocks[ip].append(now)
         await self.app(scope, receive, send)
 
-app = FastAPI(title="OpenClaw Admin Dashboard", version="0.3.0")
+@asynccontextmanager
+async def lifespan(app):
+    warmup = start_warmup(app)
+    yield
+    if warmup:
+        warmup.cancel()
+    await stop_routes(app)
+
+app = FastAPI(title="OpenClaw Admin Dashboard", version="0.3.0", lifespan=lifespan)
 
 # ── Middleware Stack ───────────────────────────────────────────────────
 # Add rate limiting (60 req/min per IP)
 app.add_middleware(SimpleRateLimiter, calls=60, period=60)
+# Concurrency limits + bounded queues for expensive route classes
+if get_admission() is not None:
+    app.add_middleware(AdmissionMiddleware, controller=get_admission())
 # Add security headers
 app.add_middleware(SecurityHeadersMiddleware)
 
 # ── CORS ──────────────────────────────────────────────────────────────
 # Fixed: Environment-based origins, removed allow_credentials, restrictive methods/headers
-allowed_origins = os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:8787").split(",")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=allowed_origins,
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=False,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
     allow_headers=["Content-Type", "Authorization", "X-CSRF-Token"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],
 )
 
 # ── CSRF Protection ───────────────────────────────────────────────────
@@ -111,13 +154,19 @@ class CSRFMiddleware:
     
     def __init__(self, app):
         self.app = app
-        self.csrf_secret = os.environ.get("CSRF_SECRET", secrets.token_hex(32))
+        # Shared so every worker agrees on the secret
+        self.csrf_secret = os.environ.get("CSRF_SECRET") or get_state().secret("csrf")
     
     async def __call__(self, scope, receive, send):
         """ASGI callable for middleware."""
         from starlette.requests import Request
         from starlette.responses import Response
         
+        # WebSocket/lifespan scopes carry no HTTP method to check
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         request = Request(scope, receive, send)
         
         # Skip CSRF check for localhost (development mode)
@@ -164,3 +213,6 @@ async def generic_exception_handler(request: Request, exc: Exception):
 frontend_path = Path(__file__).parent.parent / "frontend"
 if frontend_path.exists():
     app.mount("/", StaticFiles(html=True, directory=str(frontend_path)), name="frontend")
+
+if os.environ.get("DASHBOARD_STARTUP_PROFILE", "0") == "1":
+    logger.info(f"App built in {(time.perf_counter() - _import_start) * 1000:.1f}ms")
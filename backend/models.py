@@ -14,6 +14,17 @@ class FileContent(BaseModel):
     content: str
 
 
+class FileEdit(BaseModel):
+    start: int
+    end: int  # exclusive; start == end inserts
+    text: str = ""
+
+
+class FilePatch(BaseModel):
+    unit: str = "line"  # line | byte
+    edits: list[FileEdit]
+
+
 class FileInfo(BaseModel):
     name: str
     path: str
@@ -32,11 +43,25 @@ class KanbanTask(BaseModel):
     agent: str = "main"
     createdAt: str | None = None
     updatedAt: str | None = None
+    version: int = 0
+
+
+class KanbanBatchOp(BaseModel):
+    op: str  # create | update | move | delete
+    id: str | None = None
+    task: KanbanTask | None = None
+    status: str | None = None
+    ifMatch: str | None = None
+
+
+class KanbanBatch(BaseModel):
+    ops: list[KanbanBatchOp] = []
 
 
 class KanbanBoard(BaseModel):
     tasks: list[KanbanTask] = []
     columns: list[str] = ["backlog", "in-progress", "review", "done"]
+    version: int = 0
 
 
 class JsonlLine(BaseModel):
@@ -0,0 +1,214 @@
+"""Persistent network event store.
+
+Network monitor events are appended to a WAL-mode SQLite database indexed on
+timestamp and type, so they survive restarts and can be filtered server-side.
+
+- ``append`` only enqueues; a background writer inserts in batches, so
+  logging never blocks a request handler.
+- Retention trims by age and by row count on a timer.
+
+Configure with ``DASHBOARD_NETWORK_DB``, ``DASHBOARD_NETWORK_RETENTION_DAYS``
+and ``DASHBOARD_NETWORK_MAX_EVENTS``.
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+from config import DASHBOARD_DATA_DIR
+
+logger = logging.getLogger("admin-dashboard")
+
+
+class NetworkEventStore:
+    """Append-only event table with a batching background writer."""
+
+    def __init__(self, path, max_age_days: float = 7, max_rows: int = 100_000,
+                 batch_size: int = 500, flush_interval: float = 0.25,
+                 retention_interval: float = 60, queue_size: int = 100_000):
+        self.path = str(path)
+        self.max_age = max_age_days * 86400
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_interval = retention_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        self._writer: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self.stats = {"queued": 0, "written": 0, "dropped": 0, "batches": 0}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL,
+                type TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+            CREATE INDEX IF NOT EXISTS events_type_ts ON events (type, ts);
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            for _ in range(50):
+                try:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    break
+                except sqlite3.OperationalError:
+                    time.sleep(0.1)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ── Writing ────────────────────────────────────────────────────────
+
+    def append(self, event_type: str, data: dict, ts: float | None = None):
+        """Queue an event for the writer; drops (and counts) it if the queue is full."""
+        try:
+            self._queue.put_nowait((ts or time.time(), event_type, json.dumps(data)))
+            self.stats["queued"] += 1
+        except queue.Full:
+            self.stats["dropped"] += 1
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._start_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name="netstore-writer", daemon=True)
+                self._writer.start()
+
+    def _write_batch(self, batch: list):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT INTO events (ts, type, data) VALUES (?, ?, ?)", batch)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+
+    def _run(self):
+        last_retention = 0.0
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                first = None
+            batch = [] if first is None else [first]
+            while first is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    self._write_batch(batch)
+                if time.monotonic() - last_retention >= self.retention_interval:
+                    last_retention = time.monotonic()
+                    self.apply_retention()
+            except sqlite3.Error as e:
+                logger.warning(f"Network event store write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0):
+        """Block until everything queued so far has been written (best effort)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def apply_retention(self):
+        """Delete events older than the max age and beyond the max row count."""
+        conn = self._conn()
+        if self.max_age:
+            conn.execute("DELETE FROM events WHERE ts < ?", (time.time() - self.max_age,))
+        if self.max_rows:
+            conn.execute(
+                "DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?", (self.max_rows,)
+            )
+
+    def clear(self):
+        self.flush()
+        self._conn().execute("DELETE FROM events")
+
+    # ── Reading ────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _row(row) -> dict:
+        event_id, ts, event_type, data = row
+        return {
+            "id": event_id,
+            "timestamp": datetime.fromtimestamp(ts).isoformat(),
+            "type": event_type,
+            **json.loads(data),
+        }
+
+    def query(self, event_type: str | None = None, since: float | None = None,
+              until: float | None = None, cursor: int | None = None,
+              limit: int = 50) -> tuple[list[dict], int | None]:
+        """Newest ``limit`` matching events (returned oldest first) and a cursor to older ones."""
+        where, params = [], []
+        if event_type:
+            where.append("type = ?")
+            params.append(event_type)
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("ts < ?")
+            params.append(until)
+        if cursor is not None:
+            where.append("id < ?")
+            params.append(cursor)
+        sql = "SELECT id, ts, type, data FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        rows = self._conn().execute(sql, (*params, limit + 1)).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = rows[-1][0] if more and rows else None
+        return [self._row(r) for r in reversed(rows)], next_cursor
+
+    def tail(self, after_id: int, limit: int = 500) -> list[dict]:
+        """Events with id > ``after_id``, oldest first (for SSE followers)."""
+        rows = self._conn().execute(
+            "SELECT id, ts, type, data FROM events WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit),
+        ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def last_id(self) -> int:
+        return self._conn().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+
+_store: NetworkEventStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> NetworkEventStore:
+    """Shared network event store configured from the environment."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NetworkEventStore(
+                os.environ.get("DASHBOARD_NETWORK_DB", str(DASHBOARD_DATA_DIR / "network.db")),
+                max_age_days=float(os.environ.get("DASHBOARD_NETWORK_RETENTION_DAYS", "7")),
+                max_rows=int(os.environ.get("DASHBOARD_NETWORK_MAX_EVENTS", "100000")),
+            )
+            atexit.register(_store.flush)
+        return _store
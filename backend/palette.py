@@ -0,0 +1,326 @@
+"""In-memory trigram index behind the command palette.
+
+Indexes Kanban task titles and tags, session keys, agent names and cron job
+names, so ``/api/palette?q=`` can answer from memory instead of loading each
+list. Text is lowercased and split into words, and each word contributes the
+trigrams of ``"  word "`` (two leading spaces, one trailing, as in pg_trgm).
+A query's last word counts as a prefix (no trailing-space trigram), so
+results show up while typing.
+
+Ranking is typo-tolerant: a document matches when it shares at least
+``MIN_SIMILARITY`` of the query's trigrams. Matches are ranked by that
+share, with bonuses for exact substring and word-prefix hits and a small
+per-kind boost. To stay within a few milliseconds on tens of thousands of
+documents, typo-tolerant candidates come from the query's rarer trigrams
+only, and at most ``MAX_SCAN`` documents are scored per query.
+
+Sources are re-read only when they change. File watcher events mark the
+index dirty, and each refresh compares per-source (mtime, size)
+signatures. A changed source is diffed against what is indexed, so only
+added, removed or renamed documents touch the postings.
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import threading
+from collections import Counter
+
+import fswatch
+from config import OPENCLAW_DIR, get_kanban_file, parse_json5
+from sessionstore import load_sessions
+
+# Share of the query's trigrams a document must contain
+MIN_SIMILARITY = 0.5
+KIND_BOOST = {"agent": 0.15, "cron": 0.1, "task": 0.05, "session": 0.0}
+KINDS = tuple(KIND_BOOST)
+# Queries with at most this many trigrams (one word of up to four letters) must match all
+EXACT_GRAMS = 4
+# Trigrams in more than this share of documents do not select typo-tolerant candidates
+COMMON_SHARE = 0.5
+MAX_WEIGHT = max(KIND_BOOST.values())
+# Documents scored per query at most; bounds queries that nearly everything matches
+MAX_SCAN = 2000
+# Source files whose changes mark the index dirty
+WATCHED_NAMES = ("sessions.json", "openclaw.json", "jobs.json", os.path.basename(str(get_kanban_file())))
+
+_SPLIT = re.compile(r"[\W_]+")
+_EMPTY = frozenset()
+
+
+def normalize(text: str) -> str:
+    """Lowercase words separated by single spaces."""
+    return " ".join(_SPLIT.split(text.lower())).strip()
+
+
+def trigrams(norm: str, prefix: bool = False) -> set[str]:
+    """Trigrams of normalized text; with ``prefix`` the last word may be incomplete."""
+    words = norm.split()
+    grams = set()
+    for i, word in enumerate(words):
+        padded = "  " + word if prefix and i == len(words) - 1 else f"  {word} "
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+def _file_sig(path) -> tuple | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class _Doc:
+    __slots__ = ("kind", "id", "label", "hint", "text", "weight")
+
+    def __init__(self, kind: str, id: str, label: str, hint: str, text: str):
+        self.kind = kind
+        self.id = id
+        self.label = label
+        self.hint = hint
+        self.text = text
+        # Query-independent part of the score: kind boost, preferring short labels
+        self.weight = KIND_BOOST.get(kind, 0.0) - min(len(text), 200) / 2000
+
+
+class TrigramIndex:
+    """Trigram postings over small documents, with add/remove and ranked search."""
+
+    def __init__(self):
+        self._docs: dict[int, _Doc] = {}
+        self._weights: dict[int, float] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc: _Doc) -> int:
+        doc_id = self._next_id
+        self._next_id += 1
+        self._docs[doc_id] = doc
+        self._weights[doc_id] = doc.weight
+        for gram in trigrams(doc.text):
+            self._postings.setdefault(gram, set()).add(doc_id)
+        return doc_id
+
+    def remove(self, doc_id: int):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        del self._weights[doc_id]
+        for gram in trigrams(doc.text):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def search(self, query: str, limit: int = 20, kinds=None) -> list[tuple[float, _Doc]]:
+        """Best ``limit`` (score, doc) pairs for ``query``."""
+        norm = normalize(query)
+        grams = trigrams(norm, prefix=not query[-1:].isspace()) if norm else set()
+        if not grams:
+            return []
+        total = len(grams)
+        # Short queries must match fully; longer ones tolerate typos
+        need = total if total <= EXACT_GRAMS else math.ceil(total * MIN_SIMILARITY)
+        postings = sorted((self._postings.get(g, _EMPTY) for g in grams), key=len)
+        buckets = {total: postings[0].intersection(*postings[1:])}
+        if need < total:
+            # A match shares ``need`` grams, so it is in one of the rarest total - need + 1
+            # postings. Grams most documents contain only add noise there; they still
+            # count toward a candidate's score.
+            head = postings[:total - need + 1]
+            common = len(self._docs) * COMMON_SHARE
+            if len(head[0]) <= common:
+                head = [p for p in head if len(p) <= common]
+            candidates = set().union(*head) - buckets[total]
+            counts = Counter()
+            for posting in postings:
+                counts.update(posting & candidates)
+            for doc_id, shared in counts.items():
+                if shared >= need:
+                    buckets.setdefault(shared, []).append(doc_id)
+        scored = []
+        budget = MAX_SCAN
+        for shared in sorted(buckets, reverse=True):
+            base = shared / total
+            # Partial matches cannot contain the query at a word start (bonus <= 0.2)
+            bonus = 0.5 if shared == total else 0.2
+            if budget <= 0 or len(scored) >= limit and base + MAX_WEIGHT + bonus <= scored[0][0]:
+                break
+            ids = buckets[shared]
+            if kinds:
+                # Filter before scanning so other kinds don't use up the budget
+                ids = [d for d in ids if self._docs[d].kind in kinds]
+            # Heaviest first, so the scan can stop at the first document that cannot make it
+            ids = sorted(ids, key=self._weights.__getitem__, reverse=True)
+            for doc_id in ids[:budget]:
+                budget -= 1
+                doc = self._docs[doc_id]
+                score = base + doc.weight
+                full = len(scored) >= limit
+                if full and score + bonus <= scored[0][0]:
+                    break
+                pos = doc.text.find(norm)
+                if pos >= 0:
+                    score += 0.5 if pos == 0 else 0.35 if doc.text[pos - 1] == " " else 0.2
+                if not full:
+                    heapq.heappush(scored, (score, doc_id))
+                elif score > scored[0][0]:
+                    heapq.heapreplace(scored, (score, doc_id))
+        best = sorted(scored, reverse=True)
+        return [(round(score, 3), self._docs[doc_id]) for score, doc_id in best]
+
+
+class PaletteIndex:
+    """Palette documents from every source, refreshed incrementally."""
+
+    def __init__(self, root=OPENCLAW_DIR):
+        self.root = str(root)
+        self.config = os.path.join(self.root, "openclaw.json")
+        self.lock = threading.Lock()
+        self.index = TrigramIndex()
+        # source name -> (signature, {key: doc id}, {key: (label, hint, text)})
+        self._sources: dict[str, tuple] = {}
+        self._dirty = True
+        self._token = None
+        self.stats = {"refreshes": 0, "sourcesReloaded": 0, "docsAdded": 0, "docsRemoved": 0}
+
+    def start(self):
+        """Subscribe to file changes; without a watcher every query re-checks signatures."""
+        if self._token is None:
+            self._token = fswatch.subscribe(self._on_fs_events, [
+                os.path.join(self.root, "agents"), self.config,
+                os.path.join(self.root, "cron"), get_kanban_file(),
+            ])
+
+    def _on_fs_events(self, events):
+        if any(not e["path"] or e["path"].endswith(WATCHED_NAMES) for e in events):
+            self._dirty = True
+
+    def search(self, query: str, limit: int = 20, kinds=None) -> list[dict]:
+        with self.lock:
+            if self._dirty or self._token is None:
+                self._refresh()
+            return [{"kind": doc.kind, "id": doc.id, "label": doc.label, "hint": doc.hint, "score": score}
+                    for score, doc in self.index.search(query, limit, kinds)]
+
+    def info(self) -> dict:
+        return {"docs": len(self.index), "sources": len(self._sources), "watching": self._token is not None,
+                **self.stats}
+
+    def _refresh(self):
+        self._dirty = False  # events arriving mid-refresh set it again
+        self.stats["refreshes"] += 1
+        seen = set()
+        kanban = get_kanban_file()
+        self._sync("kanban", _file_sig(kanban), lambda: self._kanban_docs(kanban), "task", seen)
+        jobs = os.path.join(self.root, "cron", "jobs.json")
+        self._sync("cron", _file_sig(jobs), lambda: self._cron_docs(jobs), "cron", seen)
+        agents_dir = os.path.join(self.root, "agents")
+        try:
+            agent_dirs = sorted(e.name for e in os.scandir(agents_dir) if e.is_dir())
+        except OSError:
+            agent_dirs = []
+        self._sync("agents", (_file_sig(self.config), tuple(agent_dirs)),
+                   lambda: self._agent_docs(agent_dirs), "agent", seen)
+        for name in agent_dirs:
+            path = os.path.join(agents_dir, name, "sessions", "sessions.json")
+            self._sync(f"sessions:{name}", _file_sig(path),
+                       lambda: self._session_docs(path, name), "session", seen)
+        for gone in set(self._sources) - seen:
+            self._apply(gone, "", None, {})
+
+    def _sync(self, source: str, sig, load, kind: str, seen: set):
+        seen.add(source)
+        current = self._sources.get(source)
+        if current is not None and current[0] == sig:
+            return
+        try:
+            docs = load() if sig is not None else {}
+        except Exception:
+            return  # keep what is indexed (e.g. a file caught mid-write)
+        self.stats["sourcesReloaded"] += 1
+        self._apply(source, kind, sig, docs)
+
+    def _apply(self, source: str, kind: str, sig, docs: dict):
+        """Diff ``docs`` ({key: (label, hint, searchable text)}) against the indexed ones."""
+        _, ids, old = self._sources.get(source, (None, {}, {}))
+        ids = dict(ids)
+        for key in [k for k in old if old[k] != docs.get(k)]:
+            self.index.remove(ids.pop(key))
+            self.stats["docsRemoved"] += 1
+        for key, value in docs.items():
+            if key not in ids:
+                label, hint, text = value
+                ids[key] = self.index.add(_Doc(kind, key, label, hint, normalize(text)))
+                self.stats["docsAdded"] += 1
+        if sig is None and not docs:
+            self._sources.pop(source, None)
+        else:
+            self._sources[source] = (sig, ids, docs)
+
+    @staticmethod
+    def _kanban_docs(path) -> dict:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        docs = {}
+        for task in data.get("tasks", []):
+            if not task.get("id"):
+                continue
+            tags = [str(t) for t in task.get("tags") or []]
+            title = task.get("title") or task["id"]
+            hint = " · ".join([task.get("status") or ""] + ["#" + t for t in tags]).strip(" ·")
+            docs[task["id"]] = (title, hint, " ".join([title] + tags))
+        return docs
+
+    @staticmethod
+    def _cron_docs(path) -> dict:
+        with open(path, encoding="utf-8") as f:
+            jobs = json.load(f).get("jobs", [])
+        docs = {}
+        for job in jobs:
+            if not job.get("id"):
+                continue
+            name = job.get("name") or job["id"]
+            docs[job["id"]] = (name, (job.get("schedule") or {}).get("expr", ""), name)
+        return docs
+
+    def _agent_docs(self, agent_dirs: list[str]) -> dict:
+        try:
+            with open(self.config, encoding="utf-8") as f:
+                configured = parse_json5(f.read()).get("agents", {}).get("list", [])
+        except Exception:
+            configured = []
+        docs = {}
+        for cfg in configured:
+            if cfg.get("id"):
+                name = cfg.get("name") or cfg["id"]
+                docs[cfg["id"]] = (name, cfg.get("model") or "", f"{name} {cfg['id']}")
+        for agent_id in agent_dirs:
+            docs.setdefault(agent_id, (agent_id, "", agent_id))
+        return docs
+
+    @staticmethod
+    def _session_docs(path: str, agent: str) -> dict:
+        return {sess.key: (sess.key, f"{agent} · {sess.get('channel', 'unknown')}", sess.key)
+                for sess in load_sessions(path, agent)}
+
+
+_palette: PaletteIndex | None = None
+_palette_lock = threading.Lock()
+
+
+def get_palette() -> PaletteIndex:
+    """Shared palette index (watching for changes once created)."""
+    global _palette
+    with _palette_lock:
+        if _palette is None:
+            _palette = PaletteIndex()
+            _palette.start()
+        return _palette
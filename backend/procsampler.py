@@ -0,0 +1,216 @@
+"""Sampled process table for the health panel.
+
+A background thread walks ``psutil.process_iter`` with a fixed attribute set
+and derives CPU% from the change in each process's CPU time between two
+samples, so nothing ever blocks on ``cpu_percent(interval=...)``. Each sample
+produces a ready-made snapshot (top processes by CPU and by RSS, per-name
+aggregates, OpenClaw processes), which requests return as-is.
+
+- Processes are tagged as OpenClaw when their command line or working
+  directory points into OPENCLAW_DIR or names ``openclaw``; children inherit
+  the tag (and agent id) from their parent. Command lines are read once per
+  process, not on every sample.
+- The sampler measures its own CPU time per sample. If it would use more
+  than ``SELF_CPU_BUDGET`` of one core, the interval is stretched to match.
+- The thread stops after ``IDLE_SECONDS`` without readers and restarts on
+  the next read.
+
+Configure with ``DASHBOARD_PROC_INTERVAL`` (seconds) and ``DASHBOARD_PROC_TOP``.
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+
+from config import OPENCLAW_DIR
+
+logger = logging.getLogger("admin-dashboard")
+
+ATTRS = ("pid", "ppid", "name", "cpu_times", "memory_info", "create_time", "num_threads")
+MIN_INTERVAL = 1.0
+MAX_INTERVAL = 60.0
+# Fraction of one core the sampler may spend on itself
+SELF_CPU_BUDGET = 0.01
+IDLE_SECONDS = 300
+# Per-name aggregates returned (busiest first)
+MAX_NAMES = 50
+
+
+class ProcessSampler:
+    """Background process sampler holding the latest snapshot."""
+
+    def __init__(self, interval: float = 5.0, top: int = 15, root=OPENCLAW_DIR):
+        self.interval = max(MIN_INTERVAL, interval)
+        self.effective_interval = self.interval
+        self.top = top
+        root = re.escape(str(root).rstrip("/"))
+        self._agent_re = re.compile(rf"{root}/(?:agents/|workspace-)([^/\s\"']+)")
+        self._openclaw_re = re.compile(rf"{root}(?:/|\s|$)|(?:^|[/\s])openclaw(?:[/\s]|$)")
+        # (pid, create_time) -> previous total CPU seconds
+        self._prev_cpu: dict[tuple, float] = {}
+        self._prev_time: float | None = None
+        # (pid, create_time) -> (is openclaw, agent id)
+        self._tags: dict[tuple, tuple[bool, str | None]] = {}
+        self._snapshot: dict | None = None
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._last_read = 0.0
+        self.stats = {"samples": 0, "lastSampleMs": 0.0, "lastSelfCpuMs": 0.0,
+                      "selfCpuMs": 0.0, "tagLookups": 0}
+
+    # ── Sampling ───────────────────────────────────────────────────────
+
+    def _tag(self, proc, key, ppid_key) -> tuple[bool, str | None]:
+        tag = self._tags.get(key)
+        if tag is not None:
+            return tag
+        tag = self._tags.get(ppid_key) if ppid_key else None
+        if not tag or not tag[0]:
+            self.stats["tagLookups"] += 1
+            text = ""
+            try:
+                text = " ".join(proc.cmdline())
+                text += " " + proc.cwd()
+            except Exception:
+                pass
+            agent = self._agent_re.search(text)
+            tag = (bool(agent or self._openclaw_re.search(text)), agent.group(1) if agent else None)
+        self._tags[key] = tag
+        return tag
+
+    def sample(self) -> dict:
+        """Take one sample and publish a new snapshot."""
+        import psutil
+
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+        now = time.monotonic()
+        elapsed = now - self._prev_time if self._prev_time is not None else None
+        ncpu = psutil.cpu_count() or 1
+
+        rows = []
+        cpu_now: dict[tuple, float] = {}
+        by_pid: dict[int, tuple] = {}
+        for proc in psutil.process_iter(ATTRS, ad_value=None):
+            info = proc.info
+            times = info["cpu_times"]
+            key = (info["pid"], info["create_time"])
+            total = times.user + times.system if times else 0.0
+            cpu_now[key] = total
+            by_pid[info["pid"]] = key
+            rows.append((proc, key, info, total))
+        # Parents are tagged before children so inheritance works in one pass
+        rows.sort(key=lambda r: r[2]["create_time"] or 0)
+
+        processes = []
+        for proc, key, info, total in rows:
+            prev = self._prev_cpu.get(key)
+            cpu = 0.0
+            if elapsed and prev is not None:
+                cpu = max(0.0, (total - prev) / elapsed * 100)
+            openclaw, agent = self._tag(proc, key, by_pid.get(info["ppid"]))
+            mem = info["memory_info"]
+            processes.append({
+                "pid": info["pid"],
+                "ppid": info["ppid"],
+                "name": info["name"] or "?",
+                "cpuPercent": round(cpu, 1),
+                "rssMB": round(mem.rss / 1048576, 1) if mem else 0.0,
+                "threads": info["num_threads"],
+                "started": info["create_time"],
+                "openclaw": openclaw,
+                "agent": agent,
+            })
+
+        self._prev_cpu = cpu_now
+        self._prev_time = now
+        self._tags = {k: v for k, v in self._tags.items() if k in cpu_now}
+
+        names: dict[str, dict] = {}
+        for p in processes:
+            agg = names.setdefault(p["name"], {"name": p["name"], "count": 0,
+                                               "cpuPercent": 0.0, "rssMB": 0.0})
+            agg["count"] += 1
+            agg["cpuPercent"] += p["cpuPercent"]
+            agg["rssMB"] += p["rssMB"]
+        for agg in names.values():
+            agg["cpuPercent"] = round(agg["cpuPercent"], 1)
+            agg["rssMB"] = round(agg["rssMB"], 1)
+        openclaw = [p for p in processes if p["openclaw"]]
+
+        self_cpu = time.thread_time() - cpu_start
+        self.stats["samples"] += 1
+        self.stats["lastSampleMs"] = round((time.perf_counter() - start) * 1000, 2)
+        self.stats["lastSelfCpuMs"] = round(self_cpu * 1000, 2)
+        self.stats["selfCpuMs"] = round(self.stats["selfCpuMs"] + self_cpu * 1000, 2)
+        # Keep the sampler under its CPU budget by sampling less often
+        self.effective_interval = min(MAX_INTERVAL, max(self.interval, self_cpu / SELF_CPU_BUDGET))
+
+        snapshot = {
+            "sampledAt": time.time(),
+            "ready": elapsed is not None,
+            "cpuCount": ncpu,
+            "processCount": len(processes),
+            "topCpu": sorted(processes, key=lambda p: -p["cpuPercent"])[:self.top],
+            "topRss": sorted(processes, key=lambda p: -p["rssMB"])[:self.top],
+            "byName": sorted(names.values(), key=lambda a: (-a["cpuPercent"], -a["rssMB"]))[:MAX_NAMES],
+            "openclaw": {
+                "count": len(openclaw),
+                "cpuPercent": round(sum(p["cpuPercent"] for p in openclaw), 1),
+                "rssMB": round(sum(p["rssMB"] for p in openclaw), 1),
+                "processes": sorted(openclaw, key=lambda p: -p["cpuPercent"])[:self.top],
+            },
+            "sampler": {
+                "intervalSeconds": round(self.effective_interval, 2),
+                "selfCpuPercent": round(self_cpu / self.effective_interval * 100, 3),
+                **self.stats,
+            },
+        }
+        self._snapshot = snapshot
+        return snapshot
+
+    def _run(self):
+        while time.monotonic() - self._last_read < IDLE_SECONDS:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Process sample failed: {e}")
+            time.sleep(self.effective_interval)
+        with self._lock:
+            self._thread = None
+
+    def start(self):
+        """Start the sampler thread if it isn't running."""
+        with self._lock:
+            self._last_read = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="proc-sampler", daemon=True)
+                self._thread.start()
+
+    # ── Reading ────────────────────────────────────────────────────────
+
+    def snapshot(self) -> dict:
+        """Latest snapshot (keeps the sampler running); never samples inline."""
+        self.start()
+        snap = self._snapshot
+        if snap is None:
+            return {"ready": False, "processCount": 0, "topCpu": [], "topRss": [], "byName": [],
+                    "openclaw": {"count": 0, "cpuPercent": 0.0, "rssMB": 0.0, "processes": []}}
+        return snap
+
+
+_sampler: ProcessSampler | None = None
+_sampler_lock = threading.Lock()
+
+
+def get_process_sampler() -> ProcessSampler:
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = ProcessSampler(
+                interval=float(os.environ.get("DASHBOARD_PROC_INTERVAL", "5")),
+                top=int(os.environ.get("DASHBOARD_PROC_TOP", "15")),
+            )
+        return _sampler
@@ -0,0 +1,80 @@
+"""Cold-start profile for the dashboard backend.
+
+Each run starts a fresh interpreter, imports ``main``, serves one request
+through the test client and reports how long each step took, plus the
+import/setup cost of every route module. Exits with status 1 if the median
+time to first response is over the budget, so CI can catch regressions.
+
+    python profile_startup.py [--budget-ms 1500] [--runs 3] [--path /api/dashboard/config]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(main.app)
+status = client.get(sys.argv[1]).status_code
+responded = time.perf_counter()
+loader = main.app.state.route_loader
+first_modules = sorted(loader.loaded)
+loader.register_all()
+print(json.dumps({
+    "importMs": (imported - start) * 1000,
+    "firstResponseMs": (responded - start) * 1000,
+    "status": status,
+    "loadedForFirstRequest": first_modules,
+    "modules": loader.timings,
+}))
+"""
+
+
+def profile_once(path: str) -> dict:
+    env = dict(os.environ, DASHBOARD_WARMUP="0")
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, path],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--path", default="/api/dashboard/config")
+    args = parser.parse_args()
+
+    # First run fills the bytecode cache; only warm-disk cold starts are timed
+    profile_once(args.path)
+    runs = [profile_once(args.path) for _ in range(args.runs)]
+    first = statistics.median(r["firstResponseMs"] for r in runs)
+    imported = statistics.median(r["importMs"] for r in runs)
+
+    print(f"import main:          {imported:8.1f} ms")
+    print(f"first response ({args.path}): {first:8.1f} ms (status {runs[-1]['status']})")
+    print(f"modules loaded for it: {', '.join(runs[-1]['loadedForFirstRequest']) or '-'}")
+    print("route modules (import / setup ms):")
+    for name, t in sorted(runs[-1]["modules"].items(), key=lambda kv: -kv[1].get("importMs", 0)):
+        print(f"  {name:<10} {t.get('importMs', 0):8.1f} {t.get('setupMs', 0):8.1f}")
+
+    if first > args.budget_ms:
+        print(f"FAIL: cold start {first:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        return 1
+    print(f"OK: within budget of {args.budget_ms:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
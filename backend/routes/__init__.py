@@ -1,22 +1,183 @@
-"""Routes package."""
-
-from .files import setup_files_routes
-from .kanban import setup_kanban_routes
-from .agents import setup_agents_routes
-from .network import setup_network_routes
-from .terminal import setup_terminal_routes
-from .calendar import setup_calendar_routes
-from .config import setup_config_routes
-from .health import setup_health_routes
-
-
-def register_all_routes(app):
-    """Register all route modules with the FastAPI app."""
-    setup_files_routes(app)
-    setup_kanban_routes(app)
-    setup_agents_routes(app)
-    setup_network_routes(app)
-    setup_terminal_routes(app)
-    setup_calendar_routes(app)
-    setup_config_routes(app)
-    setup_health_routes(app)
+"""Routes package.
+
+Route modules are loaded on demand: ``register_all_routes`` only records
+which URL prefixes each module serves, and the first request under one of
+them imports the module and registers its routes. A background warm-up
+after startup loads the rest once the server is already answering.
+
+- ``DASHBOARD_LAZY_ROUTES=0`` registers everything at startup instead.
+- ``DASHBOARD_WARMUP=0`` disables the warm-up; ``DASHBOARD_WARMUP_DELAY``
+  (seconds, default 2) sets when it starts.
+- ``DASHBOARD_STARTUP_PROFILE=1`` logs import/setup time per module.
+
+A module may define ``warmup()`` (run in a thread during the warm-up) and
+``shutdown()`` (sync or async, run at app shutdown if the module was loaded).
+"""
+
+import os
+import time
+import asyncio
+import logging
+import importlib
+
+from starlette.routing import Mount
+
+logger = logging.getLogger("admin-dashboard")
+
+# module -> (setup function, URL prefixes it serves)
+ROUTE_MODULES = {
+    "files": ("setup_files_routes", ("/api/files",)),
+    "kanban": ("setup_kanban_routes", ("/api/kanban",)),
+    "agents": ("setup_agents_routes", ("/api/agents", "/api/sessions")),
+    "network": ("setup_network_routes", ("/api/network",)),
+    "terminal": ("setup_terminal_routes", ("/api/terminal",)),
+    "calendar": ("setup_calendar_routes", ("/api/calendar",)),
+    "config": ("setup_config_routes", ("/api/dashboard/config", "/api/openclaw/config")),
+    "health": ("setup_health_routes", ("/api/health",)),
+    "live": ("setup_live_routes", ("/api/live",)),
+    "fsevents": ("setup_fsevents_routes", ("/api/fs",)),
+    "storage": ("setup_storage_routes", ("/api/storage",)),
+    "security": ("setup_security_routes", ("/api/security",)),
+    "gateway": ("setup_gateway_routes", ("/api/gateway",)),
+    "palette": ("setup_palette_routes", ("/api/palette",)),
+}
+
+# Paths that need every route registered (API docs, unknown API paths)
+_LOAD_ALL_PATHS = ("/openapi.json", "/docs", "/redoc")
+
+
+def _profiling() -> bool:
+    return os.environ.get("DASHBOARD_STARTUP_PROFILE", "0") == "1"
+
+
+class RouteLoader:
+    """Imports route modules and registers them with the app, once each."""
+
+    def __init__(self, app):
+        self.app = app
+        self.loaded: set[str] = set()
+        self.timings: dict[str, dict] = {}
+
+    def pending_for(self, path: str) -> list[str]:
+        """Modules that must be loaded before ``path`` can be routed."""
+        if len(self.loaded) == len(ROUTE_MODULES):
+            return []
+        if path in _LOAD_ALL_PATHS:
+            return self.pending()
+        for name, (_, prefixes) in ROUTE_MODULES.items():
+            if any(path == p or path.startswith(p + "/") for p in prefixes):
+                return [] if name in self.loaded else [name]
+        # Unknown API path: load everything so the 404/405 is accurate
+        return self.pending() if path.startswith("/api/") else []
+
+    def pending(self) -> list[str]:
+        return [name for name in ROUTE_MODULES if name not in self.loaded]
+
+    def import_module(self, name: str):
+        """Import a route module (safe to call from a worker thread)."""
+        start = time.perf_counter()
+        module = importlib.import_module(f"{__name__}.{name}")
+        # Keep the first (real) import time; later calls just hit sys.modules
+        self.timings.setdefault(name, {}).setdefault(
+            "importMs", round((time.perf_counter() - start) * 1000, 2))
+        return module
+
+    def register(self, name: str):
+        """Import (if needed) and register a module's routes; call from the event loop."""
+        if name in self.loaded:
+            return
+        module = self.import_module(name)
+        if name in self.loaded:
+            return
+        start = time.perf_counter()
+        getattr(module, ROUTE_MODULES[name][0])(self.app)
+        self.loaded.add(name)
+        self.timings[name]["setupMs"] = round((time.perf_counter() - start) * 1000, 2)
+        # Routes added after the static "/" mount would be shadowed by it
+        routes = self.app.router.routes
+        routes[:] = [r for r in routes if not isinstance(r, Mount)] + \
+                    [r for r in routes if isinstance(r, Mount)]
+        self.app.openapi_schema = None
+        if _profiling():
+            t = self.timings[name]
+            logger.info(f"Loaded routes.{name}: import {t['importMs']}ms, setup {t['setupMs']}ms")
+
+    def register_all(self):
+        for name in self.pending():
+            self.register(name)
+
+    async def ensure(self, names: list[str]):
+        for name in names:
+            if name not in self.loaded:
+                await asyncio.to_thread(self.import_module, name)
+                self.register(name)
+
+    async def warm_up(self, delay: float):
+        """Load remaining modules in the background, then run their ``warmup()`` hooks."""
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        await self.ensure(self.pending())
+        for name in ROUTE_MODULES:
+            hook = getattr(importlib.import_module(f"{__name__}.{name}"), "warmup", None)
+            if hook:
+                try:
+                    await asyncio.to_thread(hook)
+                except Exception as e:
+                    logger.warning(f"Warm-up of routes.{name} failed: {e}")
+        if _profiling():
+            logger.info(f"Warm-up finished in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+    async def shut_down(self):
+        """Run the ``shutdown()`` hooks of loaded modules (sync or async)."""
+        for name in list(self.loaded):
+            hook = getattr(importlib.import_module(f"{__name__}.{name}"), "shutdown", None)
+            if hook:
+                try:
+                    result = hook()
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    logger.warning(f"Shutdown of routes.{name} failed: {e}")
+
+
+class LazyRoutesMiddleware:
+    """Loads the route module for a request's path before it is routed."""
+
+    def __init__(self, app, loader: RouteLoader):
+        self.app = app
+        self.loader = loader
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            names = self.loader.pending_for(scope["path"])
+            if names:
+                await self.loader.ensure(names)
+        await self.app(scope, receive, send)
+
+
+def register_all_routes(app) -> RouteLoader:
+    """Register route modules with the FastAPI app (lazily unless disabled)."""
+    loader = RouteLoader(app)
+    app.state.route_loader = loader
+    if os.environ.get("DASHBOARD_LAZY_ROUTES", "1") == "0":
+        loader.register_all()
+    else:
+        app.add_middleware(LazyRoutesMiddleware, loader=loader)
+    return loader
+
+
+def start_warmup(app) -> asyncio.Task | None:
+    """Schedule the background warm-up (call from the app's startup)."""
+    loader = getattr(app.state, "route_loader", None)
+    if loader is None or os.environ.get("DASHBOARD_WARMUP", "1") == "0":
+        return None
+    delay = float(os.environ.get("DASHBOARD_WARMUP_DELAY", "2"))
+    return asyncio.create_task(loader.warm_up(delay))
+
+
+async def stop_routes(app):
+    """Run route modules' shutdown hooks (call from the app's shutdown)."""
+    loader = getattr(app.state, "route_loader", None)
+    if loader is not None:
+        await loader.shut_down()
@@ -2,11 +2,20 @@
 
 import json
 import time
+import heapq
+import base64
 from pathlib import Path
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 from datetime import datetime, timezone
 
 from config import OPENCLAW_DIR, OPENCLAW_CONFIG, parse_json5
+from transcripts import message_of, content_text, get_transcript
+from throughput import get_throughput, is_working, TAU_SECONDS
+from singleflight import group
+from sessionstore import SessionRecord, all_sessions
+
+# Identical concurrent polls share one computation; results may be this old
+AGGREGATE_TTL = 1.0
 
 
 AGENT_ROLES = {
@@ -41,31 +50,11 @@ def _get_last_assistant_message_from_file(file_path: str) -> str | None:
             if not line:
                 continue
             try:
-                entry = json.loads(line)
-                # Case: top-level role
-                if entry.get("role") == "assistant":
-                    content = entry.get("content") or entry.get("text") or ""
-                    if isinstance(content, list):
-                        # Concatenate text blocks
-                        texts = []
-                        for block in content:
-                            if block.get("type") == "text":
-                                texts.append(block.get("text", ""))
-                        content = "\n".join(texts)
-                    return str(content).strip()
-                # Case: message wrapper
-                msg = entry.get("message", {})
-                if msg.get("role") == "assistant":
-                    content = msg.get("content") or msg.get("text") or ""
-                    if isinstance(content, list):
-                        texts = []
-                        for block in content:
-                            if block.get("type") == "text":
-                                texts.append(block.get("text", ""))
-                        content = "\n".join(texts)
-                    return str(content).strip()
+                msg = message_of(json.loads(line))
             except Exception:
                 continue
+            if msg and msg.get("role") == "assistant":
+                return content_text(msg)
         return None
     except Exception:
         return None
@@ -79,35 +68,9 @@ def _get_agents_config() -> list[dict]:
         return []
 
 
-def _get_all_sessions() -> list[dict]:
-    """Read sessions from all agent session files."""
-    sessions = []
-    agents_dir = OPENCLAW_DIR / "agents"
-    if not agents_dir.exists():
-        return sessions
-    
-    now_ms = int(time.time() * 1000)
-    
-    for agent_dir in agents_dir.iterdir():
-        if not agent_dir.is_dir():
-            continue
-        sessions_file = agent_dir / "sessions" / "sessions.json"
-        if not sessions_file.exists():
-            continue
-        try:
-            data = json.loads(sessions_file.read_text())
-            for key, sess in data.items():
-                sess["key"] = key
-                sess["agentDirName"] = agent_dir.name
-                # Calculate age
-                updated = sess.get("updatedAt", 0)
-                if updated:
-                    sess["ageMs"] = now_ms - updated
-                sessions.append(sess)
-        except Exception:
-            continue
-    
-    return sessions
+def _get_all_sessions() -> list[SessionRecord]:
+    """Read sessions from all agent session files (compact, shared records)."""
+    return all_sessions(OPENCLAW_DIR)
 
 
 def format_ist_time(timestamp_ms):
@@ -157,6 +120,269 @@ def _format_time_ist(timestamp_ms):
         return "Invalid"
 
 
+def _list_agents() -> list[dict]:
+    """Build the agent list from config + session files."""
+    agents_config = _get_agents_config()
+    agents_by_id = {a.get("id"): a for a in agents_config}
+    
+    sessions = _get_all_sessions()
+    rates = get_throughput().agent_rates()
+    
+    # Find active main sessions (not cron/run, updated in last 30 min)
+    now_ms = int(time.time() * 1000)
+    active_cutoff = now_ms - (30 * 60 * 1000)  # 30 minutes
+    
+    active_ids = set()
+    active_sessions = {}
+    for sess in sessions:
+        key = sess.get("key", "")
+        if ":run:" in key or "cron:" in key:
+            continue
+        parts = key.split(":")
+        agent_id = parts[1] if len(parts) > 1 else "unknown"
+        
+        updated = sess.get("updatedAt", 0)
+        if updated < active_cutoff:
+            continue
+        
+        active_ids.add(agent_id)
+        if agent_id not in active_sessions or (updated > active_sessions[agent_id].get("updatedAt", 0)):
+            active_sessions[agent_id] = sess
+    
+    agents = []
+    
+    # Active agents
+    for agent_id, sess in active_sessions.items():
+        cfg = agents_by_id.get(agent_id, {})
+        key = sess.get("key", "")
+        
+        # Get model from config
+        model = cfg.get("model", "unknown")
+        
+        updated_at = sess.get("updatedAt", 0)
+        # Working: transcripts are growing; before any growth was seen since
+        # startup, fall back to "updated in the last 30 seconds"
+        if agent_id in rates:
+            working = is_working(rates[agent_id])
+        else:
+            working = (now_ms - updated_at) < 30000 if updated_at else False
+        agents.append({
+            "id": agent_id,
+            "name": cfg.get("name", agent_id),
+            "status": "active",
+            "model": model,
+            "sessionKey": _mask_session_key(key),
+            "capabilities": [],
+            "startedAt": None,
+            "messageCount": 0,
+            "updatedAt": updated_at,
+            "ageMs": now_ms - updated_at if updated_at else 0,
+            "working": working,
+            "activity": rates.get(agent_id),
+            "lastMessage": _get_last_assistant_message_from_file(sess.get("sessionFile")) or ""
+        })
+    
+    # Inactive agents
+    for cfg in agents_config:
+        agent_id = cfg.get("id")
+        if agent_id and agent_id not in active_ids:
+            agents.append({
+                "id": agent_id,
+                "name": cfg.get("name", agent_id),
+                "status": "inactive",
+                "model": cfg.get("model"),
+                "sessionKey": None,
+                "capabilities": [],
+                "startedAt": None,
+                "messageCount": 0,
+                "activity": rates.get(agent_id),
+            })
+    
+    return agents
+
+
+def _session_kind(key: str) -> str:
+    """Classify a session key as run (cron run), cron or main."""
+    if ":run:" in key:
+        return "run"
+    if "cron:" in key:
+        return "cron"
+    return "main"
+
+
+def _session_record(sess: dict, now_ms: int, models: dict) -> dict:
+    """Shape a raw session entry for the API."""
+    key = sess.get("key", "")
+    parts = key.split(":")
+    agent_id = parts[1] if len(parts) > 1 else "unknown"
+    
+    # Get run count if applicable (cron runs)
+    run_count = None
+    if "cron:" in key or ":run:" in key:
+        run_count = sess.get("runCount", 1)
+    
+    # Check if "thinking" (updated within last 30 seconds)
+    updated_at = sess.get("updatedAt", 0)
+    is_thinking = (now_ms - updated_at) < 30 * 1000 if updated_at else False
+    
+    return {
+        "id": key,
+        "agentId": agent_id,
+        "model": models.get(agent_id, "unknown"),
+        "contextTokens": sess.get("contextTokens", 0),
+        "totalTokens": sess.get("totalTokens", 0),
+        "channel": sess.get("channel", "unknown"),
+        "updatedAt": updated_at,
+        "runCount": run_count,
+        "isSubagent": "subagent" in key,
+        "kind": _session_kind(key),
+        "thinking": is_thinking
+    }
+
+
+def _agent_models() -> dict:
+    """Map agent id -> configured model (read openclaw.json once per request)."""
+    return {a.get("id"): a.get("model", "unknown") for a in _get_agents_config()}
+
+
+def _list_sessions() -> list[dict]:
+    """Build the session list including subagents."""
+    now_ms = int(time.time() * 1000)
+    models = _agent_models()
+    return [_session_record(sess, now_ms, models) for sess in _get_all_sessions()]
+
+
+SESSION_SORT_KEYS = {
+    "updatedAt": lambda s: s.get("updatedAt", 0) or 0,
+    "tokens": lambda s: s.get("totalTokens", 0) or 0,
+}
+
+
+def _encode_cursor(value, key: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([value, key]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        value, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return value, key
+    except Exception:
+        raise HTTPException(400, "Invalid cursor")
+
+
+def _session_cursor(cursor: str) -> tuple:
+    """(sort value, session key) from a ``/api/sessions`` cursor; both sort keys are numeric."""
+    value, key = _decode_cursor(cursor)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not isinstance(key, str):
+        raise HTTPException(400, "Invalid cursor")
+    return value, key
+
+
+def _query_sessions(agent: str | None = None, channel: str | None = None,
+                    subagent: bool | None = None, active_within: int | None = None,
+                    kind: str | None = None, sort: str | None = None, order: str = "desc",
+                    cursor: str | None = None, limit: int | None = None) -> tuple[list[dict], str | None, int]:
+    """Filter sessions and select one sorted page with a bounded heap.
+    
+    Returns (page, next cursor, total matches). Without ``sort``/``limit`` every
+    match is returned in discovery order, as before.
+    """
+    now_ms = int(time.time() * 1000)
+    
+    def matches(sess: dict) -> bool:
+        key = sess.get("key", "")
+        if agent is not None:
+            parts = key.split(":")
+            if (parts[1] if len(parts) > 1 else "unknown") != agent:
+                return False
+        if channel is not None and sess.get("channel", "unknown") != channel:
+            return False
+        if subagent is not None and ("subagent" in key) != subagent:
+            return False
+        if kind is not None and _session_kind(key) != kind:
+            return False
+        if active_within is not None:
+            updated = sess.get("updatedAt", 0) or 0
+            if now_ms - updated > active_within * 1000:
+                return False
+        return True
+    
+    matched = [sess for sess in _get_all_sessions() if matches(sess)]
+    total = len(matched)
+    models = _agent_models()
+    
+    if sort is None and limit is None:
+        return [_session_record(sess, now_ms, models) for sess in matched], None, total
+    
+    value_of = SESSION_SORT_KEYS[sort or "updatedAt"]
+    sort_key = lambda sess: (value_of(sess), sess.get("key", ""))
+    descending = order != "asc"
+    if cursor:
+        after = _session_cursor(cursor)
+        if descending:
+            matched = [sess for sess in matched if sort_key(sess) < after]
+        else:
+            matched = [sess for sess in matched if sort_key(sess) > after]
+    
+    # Top-K selection: O(n log k) instead of sorting every session
+    k = (limit or total) + 1
+    select = heapq.nlargest if descending else heapq.nsmallest
+    page = select(k, matched, key=sort_key)
+    next_cursor = None
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        next_cursor = _encode_cursor(*sort_key(page[-1]))
+    return [_session_record(sess, now_ms, models) for sess in page], next_cursor, total
+
+
+def _session_transcript(session_id: str) -> Path:
+    """Transcript file of a session, confined to OPENCLAW_DIR."""
+    for sess in _get_all_sessions():
+        if sess.get("key") == session_id:
+            break
+    else:
+        raise HTTPException(404, "Session not found")
+    if not sess.get("sessionFile"):
+        raise HTTPException(404, "Session has no transcript")
+    path = Path(sess["sessionFile"]).resolve()
+    if not path.is_relative_to(OPENCLAW_DIR.resolve()) or not path.is_file():
+        raise HTTPException(404, "Transcript not found")
+    return path
+
+
+def _turn_cursor(cursor: str, direction: str) -> int:
+    """Turn index from a ``_session_turns`` cursor (400 for cursors of other endpoints)."""
+    index, key = _decode_cursor(cursor)
+    if type(index) is not int or key != direction:
+        raise HTTPException(400, "Invalid cursor")
+    return index
+
+
+def _session_turns(session_id: str, cursor: str | None, limit: int, direction: str) -> dict:
+    """A page of turns; ``backward`` pages toward the start (default page is the latest)."""
+    position = _turn_cursor(cursor, direction) if cursor else None
+    index = get_transcript(_session_transcript(session_id))
+    with index.lock:
+        total = len(index.turns)
+        if direction == "backward":
+            stop = total if position is None else position
+            stop = max(0, min(stop, total))
+            start = max(0, stop - limit)
+            next_cursor = _encode_cursor(start, "backward") if start > 0 else None
+        else:
+            start = position or 0
+            start = max(0, min(start, total))
+            stop = min(total, start + limit)
+            next_cursor = _encode_cursor(stop, "forward") if stop < total else None
+        turns = index.page(start, stop)
+    return {"sessionId": session_id, "total": total, "turns": turns, "nextCursor": next_cursor}
+
+
+def warmup():
+    """Start tracking transcript growth before the first agents poll."""
+    get_throughput().start()
+
+
 def setup_agents_routes(app):
     """Register agent routes."""
     
@@ -164,133 +390,62 @@ def setup_agents_routes(app):
     def list_agents():
         """Get agents from config + session files."""
         try:
-            agents_config = _get_agents_config()
-            agents_by_id = {a.get("id"): a for a in agents_config}
-            
-            sessions = _get_all_sessions()
-            
-            # Find active main sessions (not cron/run, updated in last 30 min)
-            now_ms = int(time.time() * 1000)
-            active_cutoff = now_ms - (30 * 60 * 1000)  # 30 minutes
-            
-            active_ids = set()
-            active_sessions = {}
-            for sess in sessions:
-                key = sess.get("key", "")
-                if ":run:" in key or "cron:" in key:
-                    continue
-                parts = key.split(":")
-                agent_id = parts[1] if len(parts) > 1 else "unknown"
-                
-                updated = sess.get("updatedAt", 0)
-                if updated < active_cutoff:
-                    continue
-                
-                active_ids.add(agent_id)
-                if agent_id not in active_sessions or (updated > active_sessions[agent_id].get("updatedAt", 0)):
-                    active_sessions[agent_id] = sess
-            
-            agents = []
-            
-            # Active agents
-            for agent_id, sess in active_sessions.items():
-                cfg = agents_by_id.get(agent_id, {})
-                key = sess.get("key", "")
-                
-                # Get model from config
-                model = cfg.get("model", "unknown")
-                
-                updated_at = sess.get("updatedAt", 0)
-                # Working: updated in last 30 seconds
-                is_working = (now_ms - updated_at) < 30000 if updated_at else False
-                agents.append({
-                    "id": agent_id,
-                    "name": cfg.get("name", agent_id),
-                    "status": "active",
-                    "model": model,
-                    "sessionKey": _mask_session_key(key),
-                    "capabilities": [],
-                    "startedAt": None,
-                    "messageCount": 0,
-                    "updatedAt": updated_at,
-                    "ageMs": sess.get("ageMs", 0),
-                    "working": is_working,
-                    "lastMessage": _get_last_assistant_message_from_file(sess.get("sessionFile")) or ""
-                })
-            
-            # Inactive agents
-            for cfg in agents_config:
-                agent_id = cfg.get("id")
-                if agent_id and agent_id not in active_ids:
-                    agents.append({
-                        "id": agent_id,
-                        "name": cfg.get("name", agent_id),
-                        "status": "inactive",
-                        "model": cfg.get("model"),
-                        "sessionKey": None,
-                        "capabilities": [],
-                        "startedAt": None,
-                        "messageCount": 0
-                    })
-            
-            return agents
-                
+            return group("agents").do("list", _list_agents, ttl=AGGREGATE_TTL)
         except Exception as e:
             raise HTTPException(500, str(e))
     
+    @app.get("/api/agents/activity")
+    def agents_activity(agent: str | None = None, limit: int = 20):
+        """Decayed lines/tokens/tool calls per minute per agent and busiest sessions."""
+        tracker = get_throughput()
+        return {
+            "tauSeconds": TAU_SECONDS,
+            "agents": tracker.agent_rates(),
+            "sessions": tracker.session_rates(agent, max(1, min(limit, 200))),
+        }
+    
     @app.get("/api/sessions")
-    def list_sessions():
-        """Get all sessions including subagents."""
+    def list_sessions(response: Response, agent: str | None = None, channel: str | None = None,
+                      subagent: bool | None = None, activeWithin: int | None = None,
+                      kind: str | None = None, sort: str | None = None, order: str = "desc",
+                      cursor: str | None = None, limit: int | None = None):
+        """Get sessions including subagents, optionally filtered, sorted and paginated.
+        
+        ``activeWithin`` is in seconds. The next-page cursor and the total match
+        count are returned in the ``X-Next-Cursor`` / ``X-Total-Count`` headers so
+        the body stays a plain list.
+        """
+        if sort is not None and sort not in SESSION_SORT_KEYS:
+            raise HTTPException(400, f"sort must be one of: {', '.join(SESSION_SORT_KEYS)}")
+        if order not in ("asc", "desc"):
+            raise HTTPException(400, "order must be one of: asc, desc")
+        if kind is not None and kind not in ("cron", "run", "main"):
+            raise HTTPException(400, "kind must be one of: cron, run, main")
+        if limit is not None and limit < 1:
+            raise HTTPException(400, "limit must be positive")
         try:
-            sessions = _get_all_sessions()
-            result = []
-            
-            now_ms = int(time.time() * 1000)
-            thinking_threshold = 30 * 1000  # 30 seconds - "thinking" if updated within this time
-            
-            for sess in sessions:
-                key = sess.get("key", "")
-                parts = key.split(":")
-                agent_id = parts[1] if len(parts) > 1 else "unknown"
-                session_id = key
-                
-                # Get model from agent config
-                agents_config = _get_agents_config()
-                agent_config = next((a for a in agents_config if a.get("id") == agent_id), {})
-                model = agent_config.get("model", "unknown")
-                
-                # Get token usage from session
-                context_tokens = sess.get("contextTokens", 0)
-                total_tokens = sess.get("totalTokens", 0)
-                
-                # Get channel from session metadata
-                channel = sess.get("channel", "unknown")
-                
-                # Get run count if applicable (cron runs)
-                run_count = None
-                if "cron:" in key or ":run:" in key:
-                    run_count = sess.get("runCount", 1)
-                
-                # Check if "thinking" (updated within last 30 seconds)
-                updated_at = sess.get("updatedAt", 0)
-                is_thinking = (now_ms - updated_at) < thinking_threshold if updated_at else False
-                # Working: updated in last 30 seconds
-                is_working = (now_ms - updated_at) < 30000 if updated_at else False
-                
-                result.append({
-                    "id": session_id,
-                    "agentId": agent_id,
-                    "model": model,
-                    "contextTokens": context_tokens,
-                    "totalTokens": total_tokens,
-                    "channel": channel,
-                    "updatedAt": updated_at,
-                    "runCount": run_count,
-                    "isSubagent": "subagent" in key,
-                    "thinking": is_thinking
-                })
-            
-            return result
-                
+            params = (agent, channel, subagent, activeWithin, kind, sort, order, cursor, limit)
+            page, next_cursor, total = group("sessions").do(params, lambda: _query_sessions(
+                agent=agent, channel=channel, subagent=subagent, active_within=activeWithin,
+                kind=kind, sort=sort, order=order, cursor=cursor, limit=limit,
+            ), ttl=AGGREGATE_TTL)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(500, str(e))
+        response.headers["X-Total-Count"] = str(total)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return page
+    
+    @app.get("/api/sessions/{session_id}/turns")
+    def session_turns(session_id: str, cursor: str | None = None, limit: int = 50,
+                      direction: str = "forward"):
+        """Conversation turns of a session with text and tool calls extracted.
+        
+        ``direction=backward`` without a cursor returns the latest turns; follow
+        ``nextCursor`` to page further in the same direction.
+        """
+        if direction not in ("forward", "backward"):
+            raise HTTPException(400, "direction must be forward or backward")
+        return _session_turns(session_id, cursor, max(1, min(limit, 500)), direction)
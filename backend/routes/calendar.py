@@ -4,7 +4,11 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from fastapi import HTTPException
+
 from config import OPENCLAW_DIR
+from cronruns import get_cron_runs
+from singleflight import group
 
 
 def _load_cron_jobs() -> list[dict]:
@@ -135,45 +139,73 @@ def _describe_cron(expr: str) -> str:
     return expr
 
 
+def _list_cron_jobs() -> list[dict]:
+    """Build the list of enabled cron jobs with schedule descriptions."""
+    raw_jobs = _load_cron_jobs()
+    runs = get_cron_runs()
+    
+    jobs = []
+    for job in raw_jobs:
+        if not job.get("enabled", True):
+            continue
+        
+        schedule = job.get("schedule", {})
+        state = job.get("state", {})
+        
+        # Build schedule description
+        expr = schedule.get("expr", "")
+        human_desc = _describe_cron(expr)
+        tz = schedule.get("tz", "")
+        schedule_desc = human_desc
+        if tz:
+            schedule_desc += f" ({tz})"
+        
+        # Next/last run
+        next_run = _format_relative_time(state.get("nextRunAtMs", 0)) if state.get("nextRunAtMs") else "-"
+        last_run = _format_relative_time(state.get("lastRunAtMs", 0)) if state.get("lastRunAtMs") else "-"
+        
+        jobs.append({
+            "id": job.get("id", ""),
+            "name": job.get("name", "Unnamed"),
+            "schedule": schedule,
+            "scheduleDesc": schedule_desc,
+            "nextRun": next_run,
+            "lastRun": last_run,
+            "status": state.get("lastStatus", "idle"),
+            "sessionTarget": job.get("sessionTarget", "main"),
+            "agent": job.get("agentId", "main"),
+            "payload": job.get("payload"),
+            "runStats": _job_stats(runs, job.get("id", "")),
+        })
+    
+    return jobs
+
+
+def _job_stats(runs, job_id: str) -> dict:
+    with runs.lock:
+        return runs.job_stats(job_id)
+
+
+def _job_runs(job_id: str, limit: int) -> dict:
+    """Newest runs of a job plus its rolling stats."""
+    runs = get_cron_runs()
+    with runs.lock:
+        page = runs.runs(job_id, limit)
+        stats = runs.job_stats(job_id)
+    if not page and not any(j.get("id") == job_id for j in _load_cron_jobs()):
+        raise HTTPException(404, "Job not found")
+    return {"jobId": job_id, "stats": stats, "runs": page}
+
+
 def setup_calendar_routes(app):
     """Register calendar routes."""
     
     @app.get("/api/calendar/jobs")
     def list_cron_jobs():
         """List scheduled cron jobs."""
-        raw_jobs = _load_cron_jobs()
-        
-        jobs = []
-        for job in raw_jobs:
-            if not job.get("enabled", True):
-                continue
-            
-            schedule = job.get("schedule", {})
-            state = job.get("state", {})
-            
-            # Build schedule description
-            expr = schedule.get("expr", "")
-            human_desc = _describe_cron(expr)
-            tz = schedule.get("tz", "")
-            schedule_desc = human_desc
-            if tz:
-                schedule_desc += f" ({tz})"
-            
-            # Next/last run
-            next_run = _format_relative_time(state.get("nextRunAtMs", 0)) if state.get("nextRunAtMs") else "-"
-            last_run = _format_relative_time(state.get("lastRunAtMs", 0)) if state.get("lastRunAtMs") else "-"
-            
-            jobs.append({
-                "id": job.get("id", ""),
-                "name": job.get("name", "Unnamed"),
-                "schedule": schedule,
-                "scheduleDesc": schedule_desc,
-                "nextRun": next_run,
-                "lastRun": last_run,
-                "status": state.get("lastStatus", "idle"),
-                "sessionTarget": job.get("sessionTarget", "main"),
-                "agent": job.get("agentId", "main"),
-                "payload": job.get("payload")
-            })
-        
-        return jobs
+        return group("calendar").do("jobs", _list_cron_jobs, ttl=1.0)
+    
+    @app.get("/api/calendar/jobs/{job_id}/runs")
+    def list_job_runs(job_id: str, limit: int = 50):
+        """Run history of a cron job (newest first) with p50/p95 duration and failure rate."""
+        return _job_runs(job_id, max(1, min(limit, 500)))
@@ -3,14 +3,32 @@
 import os
 import re
 import json
+import base64
+import shutil
+import tempfile
+import threading
 from pathlib import Path
-from fastapi import HTTPException
-from fastapi.responses import Response
+from fastapi import HTTPException, Request, Header, Query
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from config import (
     OPENCLAW_DIR, parse_json5, _find_qmd, get_openclaw_dir
 )
-from models import FileContent, FileInfo, JsonlLine
+from models import FileContent, FileInfo, JsonlLine, FilePatch
+from jsonl_writer import append_lines
+from jsonl_query import Predicate, scan, as_time
+import archive
+
+# Lines per group-committed batch when streaming an NDJSON upload
+BULK_BATCH_LINES = 1000
+# Longest line accepted in an NDJSON upload
+BULK_MAX_LINE_BYTES = 1024 * 1024
+# Largest body accepted by /api/files/write
+MAX_WRITE_BYTES = 50 * 1024 * 1024
+COPY_CHUNK = 1024 * 1024
+# Striped locks serializing the If-Match re-check and rename per path
+_WRITE_LOCKS = [threading.Lock() for _ in range(64)]
 
 
 def _safe_read(path: Path, max_size: int = 500_000) -> str:
@@ -20,32 +38,171 @@ def _safe_read(path: Path, max_size: int = 500_000) -> str:
     return path.read_text(encoding="utf-8")
 
 
-def _list_dir(root: Path, rel_path: str = "") -> list[FileInfo]:
-    """List directory contents."""
-    target = root / rel_path if rel_path else root
+def _resolve_path(root: Path, path: str) -> Path:
+    """Resolve ``path`` under ``root``, rejecting traversal outside it."""
+    if ".." in path or path.startswith("/"):
+        raise HTTPException(400, "Invalid path")
+    file_path = (root / path).resolve()
+    if not str(file_path).startswith(str(root.resolve())):
+        raise HTTPException(400, "Invalid path")
+    return file_path
+
+
+def _file_etag(path: Path) -> str:
+    """Cheap validator for a file on disk (size + mtime)."""
+    st = path.stat()
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def _check_file_match(if_match: str | None, path: Path):
+    """Reject the write with 409 if the file changed since the client's ETag."""
+    if not if_match or if_match.strip() == "*":
+        return
+    current = _file_etag(path) if path.exists() else None
+    if if_match.strip().removeprefix("W/") != current:
+        raise HTTPException(409, {"message": "File was modified", "etag": current})
+
+
+def _open_tmp(file_path: Path):
+    """Create a temp file next to ``file_path`` (same filesystem, so rename is atomic)."""
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    return os.fdopen(fd, "wb"), Path(tmp)
+
+
+def _commit_tmp(f, tmp: Path, file_path: Path, if_match: str | None = None) -> str:
+    """fsync the temp file and rename it over ``file_path``, keeping its permissions.
+    
+    ``if_match`` is checked again under a per-path lock right before the
+    rename, so two writers holding the same ETag cannot both succeed.
+    Returns the new file's ETag.
+    """
+    try:
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        with _WRITE_LOCKS[hash(str(file_path)) % len(_WRITE_LOCKS)]:
+            _check_file_match(if_match, file_path)
+            if file_path.exists():
+                shutil.copymode(file_path, tmp)
+            else:
+                os.chmod(tmp, 0o644)
+            os.replace(tmp, file_path)
+            etag = _file_etag(file_path)
+    except BaseException:
+        _discard_tmp(f, tmp)
+        raise
+    dir_fd = os.open(file_path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+    return etag
+
+
+def _discard_tmp(f, tmp: Path):
+    f.close()
+    tmp.unlink(missing_ok=True)
+
+
+def _copy_bytes(src, dst, count: int):
+    while count > 0:
+        chunk = src.read(min(count, COPY_CHUNK))
+        if not chunk:
+            break
+        dst.write(chunk)
+        count -= len(chunk)
+
+
+def _apply_edits(src, dst, patch: FilePatch):
+    """Stream ``src`` into ``dst`` with the patch's edits spliced in.
+    
+    Ranges refer to the original file (0-based, end exclusive) and must not
+    overlap. Line edits replace whole lines, so ``text`` carries its own
+    newlines.
+    """
+    edits = sorted(patch.edits, key=lambda e: (e.start, e.end))
+    prev_end = 0
+    for e in edits:
+        if e.start < prev_end or e.end < e.start:
+            raise HTTPException(400, "Edits must be ordered, non-overlapping ranges")
+        prev_end = e.end
+    
+    if patch.unit == "byte":
+        size = os.fstat(src.fileno()).st_size
+        if edits and edits[-1].end > size:
+            raise HTTPException(400, "Edit range beyond end of file")
+        pos = 0
+        for e in edits:
+            _copy_bytes(src, dst, e.start - pos)
+            dst.write(e.text.encode("utf-8"))
+            src.seek(e.end)
+            pos = e.end
+        shutil.copyfileobj(src, dst, COPY_CHUNK)
+    elif patch.unit == "line":
+        i = 0
+        skip_until = 0
+        line_no = 0
+        for line in src:
+            while i < len(edits) and edits[i].start == line_no:
+                dst.write(edits[i].text.encode("utf-8"))
+                skip_until = edits[i].end
+                i += 1
+            if line_no >= skip_until:
+                dst.write(line)
+            line_no += 1
+        # Insertions at end of file
+        while i < len(edits) and edits[i].start == line_no == edits[i].end:
+            dst.write(edits[i].text.encode("utf-8"))
+            i += 1
+        if i < len(edits) or skip_until > line_no:
+            raise HTTPException(400, "Edit range beyond end of file")
+    else:
+        raise HTTPException(400, "unit must be 'line' or 'byte'")
+
+
+def _list_dir(root: Path, rel_path: str = "", offset: int = 0,
+              limit: int | None = None) -> tuple[list[FileInfo], int]:
+    """List directory contents (directories first), one page at a time.
+    
+    Entries are sorted from ``scandir`` data; only the returned page is
+    stat'ed. Returns (page, total entries).
+    """
+    target = _resolve_path(root, rel_path) if rel_path else root
     if not target.exists():
         raise HTTPException(404, "Path not found")
     if not target.is_dir():
         raise HTTPException(400, "Not a directory")
     
     try:
-        entries = sorted(target.iterdir(), key=lambda p: (not p.is_dir(), p.name))
+        with os.scandir(target) as it:
+            entries = [e for e in it if not e.name.startswith(".")]
     except PermissionError:
         raise HTTPException(403, "Permission denied")
     
+    def is_dir(entry) -> bool:
+        try:
+            return entry.is_dir()
+        except OSError:
+            return False
+    
+    entries.sort(key=lambda e: (not is_dir(e), e.name))
+    page = entries[offset:offset + limit] if limit is not None else entries[offset:]
     result = []
-    for entry in entries:
-        name = entry.name
-        if name.startswith("."):
+    for entry in page:
+        try:
+            st = entry.stat()
+        except OSError:
             continue
+        directory = is_dir(entry)
         result.append(FileInfo(
-            name=name,
-            path=str(entry.relative_to(root)),
-            is_dir=entry.is_dir(),
-            size=entry.stat().st_size if entry.is_file() else None,
-            modified=datetime.fromtimestamp(entry.stat().st_mtime).isoformat()
+            name=entry.name,
+            path=str(Path(entry.path).relative_to(root)),
+            is_dir=directory,
+            size=None if directory else st.st_size,
+            modified=datetime.fromtimestamp(st.st_mtime).isoformat()
         ))
-    return result
+    return result, len(entries)
 
 
 from datetime import datetime
@@ -55,10 +212,18 @@ def setup_files_routes(app):
     """Register file operation routes."""
     
     @app.get("/api/files")
-    def list_files(path: str = ""):
-        """List workspace files."""
+    def list_files(response: Response, path: str = "", offset: int = 0, limit: int | None = None):
+        """List workspace files.
+        
+        ``offset``/``limit`` page through large directories; the total entry
+        count is returned in the ``X-Total-Count`` header.
+        """
+        if offset < 0 or (limit is not None and limit < 1):
+            raise HTTPException(400, "offset must be >= 0 and limit positive")
         root = get_openclaw_dir() / "workspace-atlas"
-        return _list_dir(root, path)
+        page, total = _list_dir(root, path, offset, limit)
+        response.headers["X-Total-Count"] = str(total)
+        return page
     
     @app.get("/api/files/read")
     def read_file(path: str):
@@ -114,51 +279,201 @@ def setup_files_routes(app):
         if not file_path.exists():
             raise HTTPException(404, "File not found")
         
-        all_lines = []
+        # Every line is counted, but only the requested page is decoded
+        offset = max(0, offset)
+        page = []
+        total = 0
+        end = offset + limit
         with open(file_path, "r", encoding="utf-8") as f:
             for i, line in enumerate(f):
                 raw = line.strip()
-                if raw:
+                if not raw:
+                    continue
+                if offset <= total < end:
                     try:
                         data = json.loads(raw)
                     except json.JSONDecodeError:
                         data = None
-                    all_lines.append({"index": i, "data": data, "raw": raw})
-        
-        total = len(all_lines)
-        page = all_lines[offset:offset + limit]
+                    page.append({"index": i, "data": data, "raw": raw})
+                total += 1
         return {"lines": page, "total": total}
     
+    @app.get("/api/files/jsonl/query")
+    def query_jsonl(path: str, where: list[str] = Query([]), fields: str = "",
+                    q: str = "", cursor: str | None = None, limit: int = 50):
+        """Stream-filter a JSONL file server-side.
+        
+        ``where`` (repeatable) holds predicates like ``type=message`` or
+        ``timestamp>=2026-01-01``, ``q`` is a raw substring match and ``fields``
+        a comma-separated projection. Pass ``nextCursor`` back to continue.
+        """
+        file_path = _resolve_path(get_openclaw_dir(), path)
+        if not file_path.is_file():
+            raise HTTPException(404, "File not found")
+        try:
+            predicates = [Predicate(w) for w in where]
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        offset, index = 0, 0
+        if cursor:
+            try:
+                offset, index = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            except Exception:
+                raise HTTPException(400, "Invalid cursor")
+        result = scan(
+            file_path, predicates,
+            fields=[f for f in fields.split(",") if f] or None,
+            q=q, offset=offset, index=index, limit=max(1, min(limit, 1000)),
+        )
+        nxt = result.pop("next")
+        result["nextCursor"] = base64.urlsafe_b64encode(json.dumps(nxt).encode()).decode() if nxt else None
+        return result
+    
     @app.put("/api/files/jsonl/line")
     def append_jsonl(path: str, data: dict):
         """Append line to JSONL file."""
-        if ".." in path or path.startswith("/"):
-            raise HTTPException(400, "Invalid path")
-        root = get_openclaw_dir()
-        file_path = (root / path).resolve()
-        # Fixed: Path traversal protection - ensure resolved path is within root
-        if not str(file_path).startswith(str(root.resolve())):
-            raise HTTPException(400, "Invalid path")
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(file_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(data) + "\n")
+        file_path = _resolve_path(get_openclaw_dir(), path)
+        # Serialized and batched with concurrent appenders to the same file
+        append_lines(file_path, [json.dumps(data)])
         return {"success": True}
     
+    @app.post("/api/files/jsonl/bulk")
+    async def append_jsonl_bulk(path: str, request: Request):
+        """Append an NDJSON request body, streamed in group-committed batches.
+        
+        Every line must be valid JSON. Batches are written as they fill, so on
+        a bad line the lines before its batch stay appended; the error reports
+        how many were written.
+        """
+        file_path = _resolve_path(get_openclaw_dir(), path)
+        appended = 0
+        line_no = 0
+        batch: list[str] = []
+        # Pieces of the line still being received
+        partial: list[bytes] = []
+        partial_size = 0
+        
+        async def flush():
+            nonlocal appended, batch
+            if batch:
+                await run_in_threadpool(append_lines, file_path, batch)
+                appended += len(batch)
+                batch = []
+        
+        def take(raw: bytes):
+            nonlocal line_no
+            line_no += 1
+            if len(raw) > BULK_MAX_LINE_BYTES:
+                raise HTTPException(413, {"error": f"Line longer than {BULK_MAX_LINE_BYTES} bytes",
+                                          "line": line_no, "appended": appended})
+            raw = raw.strip()
+            if not raw:
+                return
+            try:
+                text = raw.decode("utf-8")
+                json.loads(text)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                raise HTTPException(400, {"error": "Invalid JSON", "line": line_no, "appended": appended})
+            batch.append(text)
+        
+        async for chunk in request.stream():
+            # Only the new chunk is split; earlier pieces of an unfinished line are kept aside
+            *lines, rest = chunk.split(b"\n")
+            if lines:
+                lines[0] = b"".join(partial) + lines[0]
+                partial, partial_size = [], 0
+            for raw in lines:
+                take(raw)
+                if len(batch) >= BULK_BATCH_LINES:
+                    await flush()
+            if rest:
+                partial.append(rest)
+                partial_size += len(rest)
+                if partial_size > BULK_MAX_LINE_BYTES:
+                    take(b"".join(partial))  # raises 413
+        take(b"".join(partial))
+        await flush()
+        return {"success": True, "appended": appended}
+    
     @app.put("/api/files/write")
-    def write_file(path: str, content: str):
-        """Write file."""
-        if ".." in path or path.startswith("/"):
-            raise HTTPException(400, "Invalid path")
-        root = get_openclaw_dir()
-        file_path = (root / path).resolve()
-        # Fixed: Path traversal protection - ensure resolved path is within root
-        if not str(file_path).startswith(str(root.resolve())):
-            raise HTTPException(400, "Invalid path")
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_text(content, encoding="utf-8")
-        return {"success": True}
+    async def write_file(path: str, request: Request, response: Response,
+                         content: str | None = None, if_match: str | None = Header(None)):
+        """Replace a file with the request body, atomically (temp file + fsync + rename).
+        
+        The body is streamed to disk; the legacy ``content`` query parameter is
+        still accepted for small writes.
+        """
+        file_path = _resolve_path(get_openclaw_dir(), path)
+        _check_file_match(if_match, file_path)
+        f, tmp = await run_in_threadpool(_open_tmp, file_path)
+        size = 0
+        try:
+            if content is not None:
+                data = content.encode("utf-8")
+                size = len(data)
+                await run_in_threadpool(f.write, data)
+            else:
+                async for chunk in request.stream():
+                    size += len(chunk)
+                    if size > MAX_WRITE_BYTES:
+                        raise HTTPException(413, f"File too large (> {MAX_WRITE_BYTES // 1_000_000}MB)")
+                    await run_in_threadpool(f.write, chunk)
+        except BaseException:
+            _discard_tmp(f, tmp)
+            raise
+        response.headers["ETag"] = await run_in_threadpool(_commit_tmp, f, tmp, file_path, if_match)
+        return {"success": True, "size": size}
     
+    @app.patch("/api/files/write")
+    def patch_file(path: str, patch: FilePatch, response: Response,
+                   if_match: str | None = Header(None)):
+        """Apply a line- or byte-range edit list to a file, atomically."""
+        file_path = _resolve_path(get_openclaw_dir(), path)
+        if not file_path.is_file():
+            raise HTTPException(404, "File not found")
+        _check_file_match(if_match, file_path)
+        f, tmp = _open_tmp(file_path)
+        try:
+            with open(file_path, "rb") as src:
+                _apply_edits(src, f, patch)
+        except BaseException:
+            _discard_tmp(f, tmp)
+            raise
+        response.headers["ETag"] = _commit_tmp(f, tmp, file_path, if_match)
+        return {"success": True, "size": file_path.stat().st_size}
+    
+    @app.get("/api/files/archive")
+    def archive_files(path: str = "", format: str = "tar.gz",
+                      include: list[str] = Query([]), exclude: list[str] = Query([]),
+                      since: str | None = None):
+        """Stream a tar.gz or zip of a file or directory under OPENCLAW_DIR.
+
+        ``include``/``exclude`` (repeatable) are glob patterns such as ``*.md``;
+        ``since`` (ISO or epoch) keeps files modified at or after that time.
+        The archive is written while the tree is walked, with no temp files.
+        """
+        if format not in archive.FORMATS:
+            raise HTTPException(400, f"Unsupported format (use {' or '.join(archive.FORMATS)})")
+        root = get_openclaw_dir()
+        file_path = _resolve_path(root, path)
+        if not file_path.exists():
+            raise HTTPException(404, "File not found")
+        since_ts = None
+        if since:
+            try:
+                since_ts = as_time(float(since))
+            except ValueError:
+                since_ts = as_time(since)
+            if since_ts is None:
+                raise HTTPException(400, "Invalid since")
+        name = file_path.name if file_path != root.resolve() else "openclaw"
+        entries = archive.walk(str(file_path), include, exclude, since_ts, name)
+        body = archive.tar_gz(entries) if format == "tar.gz" else archive.zip_stream(entries)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return StreamingResponse(body, media_type=archive.FORMATS[format], headers={
+            "Content-Disposition": f'attachment; filename="{name}-{stamp}.{format}"',
+        })
+
     @app.get("/api/files/search")
     def search_files(q: str, limit: int = 10):
         """Search files using qmd."""
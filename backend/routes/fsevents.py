@@ -0,0 +1,70 @@
+"""Filesystem events API — stream watcher batches to the browser via SSE."""
+
+import json
+import asyncio
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+import fswatch
+from config import OPENCLAW_DIR, KANBAN_FILE
+
+
+def _public_event(event: dict) -> dict:
+    """Report paths relative to OPENCLAW_DIR (kanban.json lives with the dashboard)."""
+    path = event["path"]
+    if path == str(KANBAN_FILE):
+        return {"root": "dashboard", "path": KANBAN_FILE.name, "kind": event["kind"]}
+    root = str(OPENCLAW_DIR)
+    if path.startswith(root + "/"):
+        path = path[len(root) + 1:]
+    return {"root": "openclaw", "path": path, "kind": event["kind"]}
+
+
+def setup_fsevents_routes(app):
+    """Register filesystem event routes."""
+
+    @app.get("/api/fs/status")
+    def fs_status():
+        """Watcher backend and counters."""
+        watcher = fswatch.get_watcher()
+        return watcher.info() if watcher else {"backend": None, "running": False}
+
+    @app.get("/api/fs/events")
+    async def fs_events(request: Request, path: str = ""):
+        """Stream coalesced change batches; ``path`` limits to a prefix under OPENCLAW_DIR."""
+        if ".." in path or path.startswith("/"):
+            raise HTTPException(400, "Invalid path")
+        if fswatch.get_watcher() is None:
+            raise HTTPException(503, "File watching disabled")
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+
+        def on_batch(events):
+            def put():
+                if queue.full():
+                    # Slow client: drop the oldest batch rather than block the watcher
+                    queue.get_nowait()
+                queue.put_nowait(events)
+            loop.call_soon_threadsafe(put)
+
+        prefixes = [str(OPENCLAW_DIR / path)] if path else None
+        token = fswatch.subscribe(on_batch, prefixes)
+
+        async def event_generator():
+            try:
+                yield ": connected\n\n"
+                while True:
+                    try:
+                        events = await asyncio.wait_for(queue.get(), timeout=15)
+                    except asyncio.TimeoutError:
+                        if await request.is_disconnected():
+                            break
+                        yield ": keepalive\n\n"
+                        continue
+                    payload = {"events": [_public_event(e) for e in events]}
+                    yield f"data: {json.dumps(payload)}\n\n"
+            finally:
+                fswatch.get_watcher().unsubscribe(token)
+
+        return StreamingResponse(event_generator(), media_type="text/event-stream")
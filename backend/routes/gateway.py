@@ -0,0 +1,149 @@
+"""Gateway proxy — streams /api/gateway/* to the OpenClaw gateway.
+
+Requests go through one shared keep-alive ``httpx.AsyncClient``; request and
+response bodies are streamed through without buffering. Each proxied request
+is recorded in the network log (method, path, status, bytes, latency).
+"""
+
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+import httpx
+from fastapi import Request, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from config import get_gateway_url, get_gateway_token
+from routes.network import log_network_event
+
+METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"]
+# Never forwarded in either direction (RFC 9110 §7.6.1), plus Host (set by the client)
+HOP_HEADERS = {"connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+               "te", "trailer", "transfer-encoding", "upgrade", "host"}
+# Dashboard session/CSRF headers stay on this side
+PRIVATE_HEADERS = {"cookie", "x-csrf-token"}
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Shared pooled client (created on first use, inside the event loop)."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            # Streams (SSE, long polls) may idle for a long time between chunks
+            timeout=httpx.Timeout(connect=5.0, read=None, write=30.0, pool=10.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20,
+                                keepalive_expiry=30.0),
+            follow_redirects=False,
+            # The client is shared by every dashboard user: never keep gateway cookies
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+    return _client
+
+
+async def shutdown():
+    """Close pooled gateway connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class _Transfer:
+    """Byte counts and timings of one proxied request."""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.start = time.perf_counter()
+        self.status = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.latency_ms = None
+        self.done = False
+
+    async def request_body(self, request: Request):
+        async for chunk in request.stream():
+            self.request_bytes += len(chunk)
+            yield chunk
+
+    async def response_body(self, response: httpx.Response):
+        try:
+            async for chunk in response.aiter_raw():
+                self.response_bytes += len(chunk)
+                yield chunk
+        finally:
+            # Also runs when the client disconnects mid-stream
+            await self.finish(response)
+
+    async def finish(self, response: httpx.Response):
+        """Release the upstream connection and log the request (once)."""
+        if self.done:
+            return
+        self.done = True
+        await response.aclose()
+        self.log()
+
+    def log(self, error: str | None = None):
+        data = {
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "requestBytes": self.request_bytes,
+            "responseBytes": self.response_bytes,
+            "latencyMs": self.latency_ms,
+            "durationMs": round((time.perf_counter() - self.start) * 1000, 1),
+        }
+        if error:
+            data["error"] = error
+        log_network_event("gateway", data)
+
+
+def _forward_headers(headers) -> dict:
+    out = {k: v for k, v in headers.items() if k.lower() not in HOP_HEADERS | PRIVATE_HEADERS}
+    token = get_gateway_token()
+    if token and "authorization" not in {k.lower() for k in out}:
+        out["Authorization"] = f"Bearer {token}"
+    return out
+
+
+def setup_gateway_routes(app):
+    """Register gateway proxy routes."""
+
+    @app.api_route("/api/gateway/{path:path}", methods=METHODS)
+    async def proxy_gateway(path: str, request: Request):
+        """Proxy a request to the configured gateway, streaming both bodies."""
+        transfer = _Transfer(request.method, "/" + path)
+        client = get_client()
+        upstream = client.build_request(
+            request.method,
+            httpx.URL(get_gateway_url() + "/" + path, query=request.url.query.encode()),
+            headers=_forward_headers(request.headers),
+            content=transfer.request_body(request) if request.method not in ("GET", "HEAD") else None,
+        )
+        try:
+            response = await client.send(upstream, stream=True)
+        except httpx.TimeoutException:
+            transfer.status = 504
+            transfer.log("timeout")
+            raise HTTPException(504, "Gateway timed out")
+        except httpx.HTTPError as e:
+            transfer.status = 502
+            transfer.log(type(e).__name__)
+            raise HTTPException(502, "Gateway unreachable")
+        transfer.status = response.status_code
+        transfer.latency_ms = round((time.perf_counter() - transfer.start) * 1000, 1)
+
+        proxied = StreamingResponse(
+            transfer.response_body(response),
+            status_code=response.status_code,
+            background=BackgroundTask(transfer.finish, response),
+        )
+        # Raw (still encoded) bytes are passed through, so Content-Length and
+        # Content-Encoding hold; repeated headers such as Set-Cookie are kept
+        proxied.raw_headers = [
+            (k.encode("latin-1"), v.encode("latin-1"))
+            for k, v in response.headers.multi_items() if k.lower() not in HOP_HEADERS
+        ]
+        return proxied
@@ -3,12 +3,13 @@
 import os
 import time
 import socket
-import psutil
-import httpx
 from fastapi import HTTPException
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from config import get_gateway_url, OPENCLAW_DIR
+from procsampler import get_process_sampler
+from admission import get_admission
+import singleflight
 
 def _format_uptime(seconds: float) -> str:
     """Format uptime in human readable form."""
@@ -21,6 +22,67 @@ def _format_uptime(seconds: float) -> str:
         return f"{hours}h {mins}m"
     return f"{mins}m"
 
+def _collect_health() -> dict:
+    """Collect system health metrics."""
+    # Imported on first use to keep them off the startup path
+    import psutil
+    import httpx
+    
+    # Uptime
+    boot_time = psutil.boot_time()
+    uptime_seconds = time.time() - boot_time
+    
+    # Memory
+    mem = psutil.virtual_memory()
+    
+    # Disk
+    disk = psutil.disk_usage("/")
+    
+    # Load average
+    try:
+        load = os.getloadavg()
+        load_avg = {"1min": load[0], "5min": load[1], "15min": load[2]}
+    except Exception:
+        load_avg = {"1min": 0, "5min": 0, "15min": 0}
+    
+    # Gateway status - just check if the port responds
+    gateway_url = get_gateway_url()
+    gateway_online = False
+    try:
+        with httpx.Client(timeout=3.0) as client:
+            resp = client.get(gateway_url)
+            gateway_online = resp.status_code == 200
+    except Exception:
+        pass
+    
+    return {
+        "uptime": _format_uptime(uptime_seconds),
+        "uptimeSeconds": int(uptime_seconds),
+        "memory": {
+            "usedGB": round(mem.used / (1024**3), 1),
+            "totalGB": round(mem.total / (1024**3), 1),
+            "percent": mem.percent
+        },
+        "disk": {
+            "usedGB": round(disk.used / (1024**3), 1),
+            "totalGB": round(disk.total / (1024**3), 1),
+            "percent": disk.percent
+        },
+        "loadAvg": load_avg,
+        "processCount": len(psutil.pids()),
+        "gatewayOnline": gateway_online,
+        "gatewayUrl": gateway_url
+    }
+
+
+def warmup():
+    """Import psutil/httpx ahead of the first health request."""
+    import psutil
+    import httpx
+    psutil.cpu_percent(interval=None)
+    get_process_sampler().start()
+
+
 def setup_health_routes(app):
     """Register health routes."""
     
@@ -36,48 +98,21 @@ def setup_health_routes(app):
     @app.get("/api/health")
     def get_health():
         """Get system health metrics."""
-        # Uptime
-        boot_time = psutil.boot_time()
-        uptime_seconds = time.time() - boot_time
-        
-        # Memory
-        mem = psutil.virtual_memory()
-        
-        # Disk
-        disk = psutil.disk_usage("/")
-        
-        # Load average
-        try:
-            load = os.getloadavg()
-            load_avg = {"1min": load[0], "5min": load[1], "15min": load[2]}
-        except Exception:
-            load_avg = {"1min": 0, "5min": 0, "15min": 0}
-        
-        # Gateway status - just check if the port responds
-        gateway_url = get_gateway_url()
-        gateway_online = False
-        try:
-            with httpx.Client(timeout=3.0) as client:
-                resp = client.get(gateway_url)
-                gateway_online = resp.status_code == 200
-        except Exception:
-            pass
-        
-        return {
-            "uptime": _format_uptime(uptime_seconds),
-            "uptimeSeconds": int(uptime_seconds),
-            "memory": {
-                "usedGB": round(mem.used / (1024**3), 1),
-                "totalGB": round(mem.total / (1024**3), 1),
-                "percent": mem.percent
-            },
-            "disk": {
-                "usedGB": round(disk.used / (1024**3), 1),
-                "totalGB": round(disk.total / (1024**3), 1),
-                "percent": disk.percent
-            },
-            "loadAvg": load_avg,
-            "processCount": len(psutil.pids()),
-            "gatewayOnline": gateway_online,
-            "gatewayUrl": gateway_url
-        }
+        # The gateway probe can block for seconds; concurrent polls share one
+        return singleflight.group("health").do("health", _collect_health, ttl=2.0)
+
+    @app.get("/api/health/processes")
+    def get_processes():
+        """Latest process sample: top CPU/RSS, per-name totals, OpenClaw processes."""
+        return get_process_sampler().snapshot()
+
+    @app.get("/api/health/admission")
+    def admission_stats():
+        """Limits, active requests and queue depth per admission class."""
+        controller = get_admission()
+        return controller.info() if controller else {"enabled": False}
+
+    @app.get("/api/health/singleflight")
+    def singleflight_stats():
+        """Per-group call, execution, coalesced and hit counters."""
+        return singleflight.stats()
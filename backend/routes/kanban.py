@@ -1,18 +1,32 @@
 """Kanban board API."""
 
+import os
 import json
+import heapq
 import random
+import threading
+from collections import defaultdict
 from pathlib import Path
-from fastapi import HTTPException
+from fastapi import HTTPException, Header, Response
 
 from config import get_kanban_file
-from models import KanbanTask, KanbanBoard
+from models import KanbanTask, KanbanBoard, KanbanBatch, KanbanBatchOp
 
 # Random words for shareable task IDs
 ADJECTIVES = ["brave", "cool", "swift", "happy", "calm", "bright", "bold", "eager", "gentle", "keen", "lively", "merry", "noble", "proud", "quick", "royal", "steady", "tender", "vivid", "wise", "young", "zesty", "amber", "azure", "cosmic", "dapper", "electric", "frosty", "golden", "honest", "iron", "jolly", "kind", "lemon", "mint", "neon", "olive", "pearl", "ruby", "silver", "topaz", "ultra", "violet", "warm", "xenon", "yellow", "zen"]
 
 ANIMALS = ["lion", "tiger", "eagle", "wolf", "fox", "bear", "hawk", "owl", "deer", "fox", "whale", "dolphin", "raven", "snake", "jaguar", "panther", "cobra", "falcon", "phoenix", "dragon", "panda", "koala", "sloth", "otter", "seal", "penguin", "polar bear", "leopard", "cheetah", "gorilla", "chimpanzee", "elephant", "giraffe", "zebra", "hippo", "rhino", "buffalo", "moose", "elk", "bison", "pronghorn", "ibex", "chamois", "yak", "ox", "water buffalo", "gaur", "nilgai", "blackbuck", "sambar", "sika", "wapiti", "caribou"]
 
+# Number of task-level changes kept for /api/kanban/changes delta sync
+MAX_CHANGES = 1000
+
+# Upper bound on operations in one /api/kanban/batch request
+MAX_BATCH_OPS = 5000
+
+# Serializes load-modify-save cycles within this process
+_kanban_lock = threading.Lock()
+
+
 def _generate_task_id() -> str:
     """Generate a random word-based task ID."""
     adj = random.choice(ADJECTIVES).capitalize()
@@ -25,16 +39,297 @@ def _load_kanban() -> dict:
     kanban_file = get_kanban_file()
     if kanban_file.exists():
         try:
-            return json.loads(kanban_file.read_text())
+            data = json.loads(kanban_file.read_text())
+            data.setdefault("version", 0)
+            data.setdefault("changes", [])
+            return data
         except Exception:
             pass
-    return {"tasks": [], "columns": ["backlog", "in-progress", "review", "done"]}
+    return {"tasks": [], "columns": ["backlog", "in-progress", "review", "done"], "version": 0, "changes": []}
 
 
 def _save_kanban(data: dict):
-    """Save kanban data to file."""
+    """Save kanban data to file atomically (temp file + fsync + rename)."""
     kanban_file = get_kanban_file()
-    kanban_file.write_text(json.dumps(data, indent=2))
+    tmp = kanban_file.with_name(f".{kanban_file.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(data, indent=2))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, kanban_file)
+
+
+def _public_board(data: dict) -> dict:
+    """Board as served to clients (without the internal change log)."""
+    return {k: v for k, v in data.items() if k != "changes"}
+
+
+def _record_change(data: dict, task_id: str, task: dict | None) -> int:
+    """Bump the board version and append a task-level change (task=None means deleted)."""
+    data["version"] = data.get("version", 0) + 1
+    if task is not None:
+        task["version"] = data["version"]
+    data["changes"].append({"version": data["version"], "id": task_id, "task": task})
+    del data["changes"][:-MAX_CHANGES]
+    return data["version"]
+
+
+def _changes_since(data: dict, since: int) -> dict:
+    """Task-level deltas after ``since``, or a full reset if the log no longer covers it."""
+    version = data.get("version", 0)
+    changes = data.get("changes", [])
+    oldest = changes[0]["version"] if changes else version + 1
+    if since > version or since < oldest - 1:
+        return {"version": version, "reset": True, "tasks": data["tasks"]}
+    # Only the latest change per task matters to the client
+    latest = {}
+    for change in changes:
+        if change["version"] > since:
+            latest[change["id"]] = change
+    return {
+        "version": version,
+        "reset": False,
+        "changes": sorted(latest.values(), key=lambda c: c["version"]),
+    }
+
+
+def _check_if_match(if_match: str | None, task: dict):
+    """Reject the write with 409 if the client's task version is stale."""
+    if not if_match:
+        return
+    expected = if_match.strip()
+    if expected == "*":
+        return
+    if expected.startswith("W/"):
+        expected = expected[2:]
+    expected = expected.strip('"')
+    current = str(task.get("version", 0))
+    if expected != current:
+        raise HTTPException(409, {"message": "Task was modified", "task": task})
+
+
+class _KanbanIndex:
+    """In-memory secondary indexes over the board, kept in step with the change log."""
+    
+    FIELDS = ("status", "agent", "priority")
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.file_key = None
+        self._reset()
+    
+    def _reset(self):
+        self.tasks: dict[str, dict] = {}
+        self.seq: dict[str, int] = {}
+        self.next_seq = 0
+        self.by_field = {f: defaultdict(set) for f in self.FIELDS}
+        self.by_tag = defaultdict(set)
+    
+    def _add(self, task: dict):
+        task_id = task["id"]
+        if task_id in self.tasks:
+            self._remove(task_id, keep_seq=True)
+        else:
+            self.seq[task_id] = self.next_seq
+            self.next_seq += 1
+        self.tasks[task_id] = task
+        for f in self.FIELDS:
+            self.by_field[f][task.get(f)].add(task_id)
+        for tag in task.get("tags") or []:
+            self.by_tag[tag].add(task_id)
+    
+    def _remove(self, task_id: str, keep_seq: bool = False):
+        task = self.tasks.pop(task_id, None)
+        if task is None:
+            return
+        for f in self.FIELDS:
+            ids = self.by_field[f].get(task.get(f))
+            if ids is not None:
+                ids.discard(task_id)
+                if not ids:
+                    del self.by_field[f][task.get(f)]
+        for tag in task.get("tags") or []:
+            ids = self.by_tag.get(tag)
+            if ids is not None:
+                ids.discard(task_id)
+                if not ids:
+                    del self.by_tag[tag]
+        if not keep_seq:
+            self.seq.pop(task_id, None)
+    
+    def _rebuild(self, data: dict):
+        self._reset()
+        for task in data["tasks"]:
+            if task.get("id"):
+                self._add(task)
+    
+    def sync(self, data: dict, file_key=None, external: bool = False):
+        """Bring the index up to ``data``'s version, replaying the change log when possible.
+        
+        ``external`` marks a file edited outside the API: without a version bump the
+        log can't describe the edit, so the index is rebuilt.
+        """
+        version = data.get("version", 0)
+        with self.lock:
+            if self.version is not None and version >= self.version:
+                changes = [c for c in data.get("changes", []) if c["version"] > self.version]
+                if version == self.version:
+                    covered = not external
+                else:
+                    covered = bool(changes) and changes[0]["version"] == self.version + 1
+                if covered:
+                    for change in changes:
+                        if change["task"] is None:
+                            self._remove(change["id"])
+                        else:
+                            self._add(change["task"])
+                else:
+                    self._rebuild(data)
+            else:
+                self._rebuild(data)
+            self.version = version
+            self.file_key = file_key
+    
+    def counts(self) -> dict:
+        return {status: len(ids) for status, ids in self.by_field["status"].items()}
+    
+    def query(self, status=None, agent=None, tag=None, priority=None, q=None,
+              cursor: int = -1, limit: int = 50) -> dict:
+        """Filter via the indexes, then page by insertion order after ``cursor``."""
+        with self.lock:
+            sets = []
+            for field, value in (("status", status), ("agent", agent), ("priority", priority)):
+                if value is not None:
+                    sets.append(self.by_field[field].get(value, set()))
+            if tag is not None:
+                sets.append(self.by_tag.get(tag, set()))
+            if sets:
+                sets.sort(key=len)
+                candidates = sets[0].intersection(*sets[1:])
+            else:
+                candidates = self.tasks.keys()
+            if q:
+                needle = q.lower()
+                candidates = [
+                    i for i in candidates
+                    if needle in (self.tasks[i].get("title") or "").lower()
+                    or needle in (self.tasks[i].get("description") or "").lower()
+                ]
+            total = len(candidates)
+            seq = self.seq
+            page = heapq.nsmallest(limit + 1, (i for i in candidates if seq[i] > cursor), key=seq.__getitem__)
+            more = len(page) > limit
+            page = page[:limit]
+            return {
+                "tasks": [self.tasks[i] for i in page],
+                "nextCursor": str(seq[page[-1]]) if more and page else None,
+                "total": total,
+                "counts": self.counts(),
+                "version": self.version,
+            }
+
+
+_index = _KanbanIndex()
+
+
+def _kanban_file_key():
+    """(mtime_ns, size) of kanban.json, to notice edits made outside this process."""
+    try:
+        st = get_kanban_file().stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _save_and_index(data: dict):
+    """Persist the board and bring the in-memory index up to date."""
+    _save_kanban(data)
+    _index.sync(data, _kanban_file_key())
+
+
+def _get_index() -> _KanbanIndex:
+    """Index for the current file, reloading it only if kanban.json changed on disk."""
+    key = _kanban_file_key()
+    if _index.version is None or key != _index.file_key:
+        _index.sync(_load_kanban(), key, external=True)
+    return _index
+
+
+def warmup():
+    """Build the task index ahead of the first Kanban request."""
+    _get_index()
+
+
+def _find_task(data: dict, task_id: str) -> int:
+    """Index of task in board, or 404."""
+    for i, t in enumerate(data["tasks"]):
+        if t["id"] == task_id:
+            return i
+    raise HTTPException(404, "Task not found")
+
+
+def _apply_create(data: dict, task: KanbanTask) -> dict:
+    """Add a task to the loaded board (not saved)."""
+    # Generate random word-based ID if not provided
+    task.id = task.id or _generate_task_id()
+    record = task.model_dump()
+    data["tasks"].append(record)
+    _record_change(data, task.id, record)
+    return record
+
+
+def _apply_update(data: dict, task_id: str, task: KanbanTask, if_match: str | None = None) -> dict:
+    """Replace a task on the loaded board (not saved)."""
+    i = _find_task(data, task_id)
+    _check_if_match(if_match, data["tasks"][i])
+    task.id = task_id
+    record = task.model_dump()
+    data["tasks"][i] = record
+    _record_change(data, task_id, record)
+    return record
+
+
+def _apply_move(data: dict, task_id: str, status: str, if_match: str | None = None) -> dict:
+    """Change a task's column on the loaded board (not saved)."""
+    t = data["tasks"][_find_task(data, task_id)]
+    _check_if_match(if_match, t)
+    t["status"] = status
+    _record_change(data, task_id, t)
+    return t
+
+
+def _apply_delete(data: dict, task_id: str, if_match: str | None = None) -> bool:
+    """Remove a task from the loaded board (not saved); False if it didn't exist."""
+    existing = [t for t in data["tasks"] if t["id"] == task_id]
+    if not existing:
+        return False
+    _check_if_match(if_match, existing[0])
+    data["tasks"] = [t for t in data["tasks"] if t["id"] != task_id]
+    _record_change(data, task_id, None)
+    return True
+
+
+def _apply_op(data: dict, op: KanbanBatchOp) -> dict:
+    """Apply one batch operation to the loaded board."""
+    if op.op == "create":
+        if op.task is None:
+            raise HTTPException(400, "create requires task")
+        return _apply_create(data, op.task)
+    if not op.id or not op.id.strip():
+        raise HTTPException(400, "Invalid task ID")
+    if op.op == "update":
+        if op.task is None:
+            raise HTTPException(400, "update requires task")
+        return _apply_update(data, op.id, op.task, op.ifMatch)
+    if op.op == "move":
+        if not op.status:
+            raise HTTPException(400, "Missing status")
+        return _apply_move(data, op.id, op.status, op.ifMatch)
+    if op.op == "delete":
+        # Like DELETE /api/kanban/task/{id}: a missing task is not an error, but not a delete
+        return {"id": op.id, "deleted": _apply_delete(data, op.id, op.ifMatch)}
+    raise HTTPException(400, f"Unknown op: {op.op}")
 
 
 def setup_kanban_routes(app):
@@ -43,56 +338,93 @@ def setup_kanban_routes(app):
     @app.get("/api/kanban")
     def get_kanban():
         """Get kanban board."""
-        return _load_kanban()
+        return _public_board(_load_kanban())
+    
+    @app.get("/api/kanban/changes")
+    def get_kanban_changes(since: int = 0):
+        """Get task-level changes after board version ``since``."""
+        return _changes_since(_load_kanban(), since)
+    
+    @app.get("/api/kanban/tasks")
+    def query_tasks(status: str | None = None, agent: str | None = None,
+                    tag: str | None = None, priority: str | None = None,
+                    q: str | None = None, cursor: str | None = None, limit: int = 50):
+        """Query tasks with filters and cursor pagination (per-column lazy loading)."""
+        if limit < 1 or limit > 1000:
+            raise HTTPException(400, "limit must be between 1 and 1000")
+        try:
+            after = int(cursor) if cursor else -1
+        except ValueError:
+            raise HTTPException(400, "Invalid cursor")
+        return _get_index().query(status=status, agent=agent, tag=tag, priority=priority,
+                                  q=q, cursor=after, limit=limit)
     
     @app.post("/api/kanban/task")
-    def create_task(task: KanbanTask):
+    def create_task(task: KanbanTask, response: Response):
         """Create new task."""
-        data = _load_kanban()
-        # Generate random word-based ID if not provided
-        task.id = task.id or _generate_task_id()
-        data["tasks"].append(task.model_dump())
-        _save_kanban(data)
-        return task
+        with _kanban_lock:
+            data = _load_kanban()
+            record = _apply_create(data, task)
+            _save_and_index(data)
+        response.headers["ETag"] = f'"{record["version"]}"'
+        return record
     
     @app.put("/api/kanban/task/{task_id}")
-    def update_task(task_id: str, task: KanbanTask):
+    def update_task(task_id: str, task: KanbanTask, response: Response,
+                    if_match: str | None = Header(None)):
         """Update task."""
         # Fixed: Validate task ID is not empty
         if not task_id or not task_id.strip():
             raise HTTPException(400, "Invalid task ID")
         
-        data = _load_kanban()
-        for i, t in enumerate(data["tasks"]):
-            if t["id"] == task_id:
-                task.id = task_id
-                data["tasks"][i] = task.model_dump()
-                _save_kanban(data)
-                return task
-        raise HTTPException(404, "Task not found")
+        with _kanban_lock:
+            data = _load_kanban()
+            record = _apply_update(data, task_id, task, if_match)
+            _save_and_index(data)
+        response.headers["ETag"] = f'"{record["version"]}"'
+        return record
     
     @app.delete("/api/kanban/task/{task_id}")
-    def delete_task(task_id: str):
+    def delete_task(task_id: str, if_match: str | None = Header(None)):
         """Delete task."""
         # Fixed: Validate task ID is not empty
         if not task_id or not task_id.strip():
             raise HTTPException(400, "Invalid task ID")
         
-        data = _load_kanban()
-        data["tasks"] = [t for t in data["tasks"] if t["id"] != task_id]
-        _save_kanban(data)
-        return {"success": True}
+        with _kanban_lock:
+            data = _load_kanban()
+            if _apply_delete(data, task_id, if_match):
+                _save_and_index(data)
+        return {"success": True, "version": data["version"]}
     
     @app.put("/api/kanban/task/{task_id}/move")
-    def move_task(task_id: str, body: dict):
+    def move_task(task_id: str, body: dict, response: Response,
+                  if_match: str | None = Header(None)):
         """Move task to column."""
         status = body.get("status", "")
         if not status:
             raise HTTPException(400, "Missing status")
-        data = _load_kanban()
-        for t in data["tasks"]:
-            if t["id"] == task_id:
-                t["status"] = status
-                _save_kanban(data)
-                return t
-        raise HTTPException(404, "Task not found")
+        with _kanban_lock:
+            data = _load_kanban()
+            t = _apply_move(data, task_id, status, if_match)
+            _save_and_index(data)
+        response.headers["ETag"] = f'"{t["version"]}"'
+        return t
+    
+    @app.post("/api/kanban/batch")
+    def batch_tasks(batch: KanbanBatch):
+        """Apply create/update/move/delete operations all-or-nothing in one write."""
+        if len(batch.ops) > MAX_BATCH_OPS:
+            raise HTTPException(413, f"Too many operations (> {MAX_BATCH_OPS})")
+        with _kanban_lock:
+            data = _load_kanban()
+            results = []
+            for n, op in enumerate(batch.ops):
+                try:
+                    results.append(_apply_op(data, op))
+                except HTTPException as e:
+                    # Nothing has been written yet, so the board is untouched
+                    raise HTTPException(e.status_code, {"op": n, "error": e.detail})
+            if batch.ops:
+                _save_and_index(data)
+        return {"version": data["version"], "tasks": results}
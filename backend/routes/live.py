@@ -0,0 +1,321 @@
+"""Live updates API — one multiplexed WebSocket for dashboard topics.
+
+Clients connect to ``/api/live`` and send ``{"subscribe": [topics]}`` or
+``{"unsubscribe": [topics]}``. The server computes each subscribed topic once
+per interval (no matter how many tabs are open), sends a full snapshot on
+subscribe and afterwards only pushes a patch when the value changed.
+
+Patch format (applied recursively by the client):
+- ``{"replace": value}``                        — replace the value wholesale
+- ``{"keys": {k: patch}, "unset": [k]}``        — dict: patch/remove keys
+- ``{"upsert": [...], "remove": [ids], "order": [ids]}`` — list of ``id`` records
+"""
+
+import asyncio
+import logging
+import time
+from urllib.parse import urlsplit
+from fastapi import WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+
+import fswatch
+from config import OPENCLAW_DIR, KANBAN_FILE, ALLOWED_ORIGINS
+
+logger = logging.getLogger("admin-dashboard")
+
+_MISSING = object()
+
+
+def _origin_allowed(ws: WebSocket) -> bool:
+    """Same-origin or ``ALLOWED_ORIGINS`` browsers; CORS does not cover WebSockets."""
+    origin = ws.headers.get("origin")
+    if origin is None:
+        return True  # not a browser, so no cross-site page behind it
+    return origin in ALLOWED_ORIGINS or urlsplit(origin).netloc == ws.headers.get("host")
+
+
+def _topic_agents():
+    from .agents import _list_agents
+    return _list_agents()
+
+
+def _topic_sessions():
+    from .agents import _list_sessions
+    return _list_sessions()
+
+
+def _topic_kanban():
+    from .kanban import _load_kanban, _public_board
+    return _public_board(_load_kanban())
+
+
+def _topic_health():
+    from .health import _collect_health
+    return _collect_health()
+
+
+def _topic_network():
+    from netstore import get_store
+    return get_store().query(limit=50)[0]
+
+
+def _topic_calendar():
+    from .calendar import _list_cron_jobs
+    return _list_cron_jobs()
+
+
+# topic -> (producer, refresh interval in seconds, volatile keys stripped from records)
+TOPICS = {
+    "agents": (_topic_agents, 5.0, {"ageMs"}),
+    "sessions": (_topic_sessions, 5.0, set()),
+    "kanban": (_topic_kanban, 2.0, set()),
+    "health": (_topic_health, 15.0, {"uptime", "uptimeSeconds"}),
+    "network": (_topic_network, 2.0, set()),
+    "calendar": (_topic_calendar, 30.0, set()),
+}
+
+
+def _topics_for_path(path: str) -> set:
+    """Topics whose data comes from a changed file."""
+    if path == str(KANBAN_FILE):
+        return {"kanban"}
+    root = str(OPENCLAW_DIR) + "/"
+    if not path.startswith(root):
+        return set()
+    rel = path[len(root):]
+    if rel == "openclaw.json":
+        return {"agents", "sessions"}
+    if rel.startswith("agents/"):
+        return {"agents", "sessions"}
+    if rel.startswith("cron/"):
+        return {"calendar"}
+    return set()
+
+
+def _strip_volatile(value, volatile: set):
+    """Drop fields that change on every poll (e.g. ``ageMs``) so they don't trigger pushes."""
+    if not volatile:
+        return value
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if k not in volatile}
+    if isinstance(value, list):
+        return [_strip_volatile(v, volatile) if isinstance(v, dict) else v for v in value]
+    return value
+
+
+def _record_ids(value) -> list | None:
+    """Return the ids of a list of ``{"id": ...}`` records, or None if it isn't one."""
+    if not isinstance(value, list):
+        return None
+    ids = []
+    for item in value:
+        if not isinstance(item, dict) or "id" not in item:
+            return None
+        ids.append(item["id"])
+    if len(set(ids)) != len(ids):
+        return None
+    return ids
+
+
+def _diff(old, new):
+    """Return a patch that turns ``old`` into ``new``, or None if they are equal."""
+    if old == new:
+        return None
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        keys = {}
+        for k, v in new.items():
+            prev = old.get(k, _MISSING)
+            if prev is _MISSING:
+                keys[k] = {"replace": v}
+            elif prev != v:
+                keys[k] = _diff(prev, v)
+        patch = {"keys": keys}
+        unset = [k for k in old if k not in new]
+        if unset:
+            patch["unset"] = unset
+        return patch
+
+    old_ids, new_ids = _record_ids(old), _record_ids(new)
+    if old_ids is not None and new_ids is not None:
+        old_by_id = {item["id"]: item for item in old}
+        new_id_set = set(new_ids)
+        patch = {
+            "upsert": [item for item in new if old_by_id.get(item["id"]) != item],
+            "remove": [i for i in old_ids if i not in new_id_set],
+        }
+        if old_ids != new_ids:
+            patch["order"] = new_ids
+        return patch
+
+    return {"replace": new}
+
+
+class LiveHub:
+    """Computes each topic once and fans the result out to every subscriber."""
+
+    def __init__(self, topics: dict):
+        self.topics = topics
+        self.subscribers: dict[str, set] = {name: set() for name in topics}
+        self.values: dict[str, object] = {}
+        self.versions: dict[str, int] = {name: 0 for name in topics}
+        self.next_due: dict[str, float] = {name: 0.0 for name in topics}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._watch_token = None
+
+    def _lock(self, topic: str) -> asyncio.Lock:
+        if topic not in self._locks:
+            self._locks[topic] = asyncio.Lock()
+        return self._locks[topic]
+
+    async def _compute(self, topic: str):
+        """Recompute a topic; returns (value, patch) with patch None if unchanged."""
+        producer, interval, volatile = self.topics[topic]
+        async with self._lock(topic):
+            try:
+                value = await run_in_threadpool(producer)
+            except Exception as e:
+                logger.warning(f"Live topic {topic} failed: {e}")
+                self.next_due[topic] = time.monotonic() + interval
+                return self.values.get(topic), None
+            value = _strip_volatile(value, volatile)
+            previous = self.values.get(topic, _MISSING)
+            self.values[topic] = value
+            self.next_due[topic] = time.monotonic() + interval
+            if previous is _MISSING:
+                self.versions[topic] += 1
+                return value, None
+            patch = _diff(previous, value)
+            if patch is not None:
+                self.versions[topic] += 1
+            return value, patch
+
+    async def subscribe(self, ws: WebSocket, topic: str):
+        """Add a subscriber and send it the current snapshot."""
+        if not self.subscribers[topic] or topic not in self.values:
+            await self._compute(topic)
+        self.subscribers[topic].add(ws)
+        await ws.send_json({
+            "type": "snapshot",
+            "topic": topic,
+            "version": self.versions[topic],
+            "data": self.values.get(topic),
+        })
+        self._ensure_running()
+
+    def unsubscribe(self, ws: WebSocket, topic: str):
+        """Remove a subscriber; drop the cached value once nobody listens."""
+        self.subscribers[topic].discard(ws)
+        if not self.subscribers[topic]:
+            self.values.pop(topic, None)
+
+    def invalidate(self, topic: str):
+        """Mark a topic stale so it is recomputed on the next tick (thread-safe)."""
+        if topic not in self.next_due:
+            return
+        self.next_due[topic] = 0.0
+        if self._loop and self._wake:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def stats(self) -> dict:
+        return {
+            name: {"subscribers": len(subs), "version": self.versions[name]}
+            for name, subs in self.subscribers.items()
+        }
+
+    def _on_fs_events(self, events: list):
+        """File watcher hook: recompute affected topics now instead of at the next interval."""
+        topics = set()
+        for event in events:
+            if event["kind"] == "overflow":
+                topics.update(self.topics)
+            else:
+                topics |= _topics_for_path(event["path"])
+        for topic in topics:
+            self.invalidate(topic)
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        if self._watch_token is None:
+            self._watch_token = fswatch.subscribe(self._on_fs_events) or False
+
+    async def _broadcast(self, topic: str, message: dict):
+        subs = list(self.subscribers[topic])
+        results = await asyncio.gather(*(ws.send_json(message) for ws in subs), return_exceptions=True)
+        for ws, result in zip(subs, results):
+            if isinstance(result, Exception):
+                self.unsubscribe(ws, topic)
+
+    async def _run(self):
+        """Refresh loop: recompute due topics that have subscribers and push patches."""
+        while any(self.subscribers.values()):
+            now = time.monotonic()
+            for topic, subs in self.subscribers.items():
+                if not subs or self.next_due[topic] > now:
+                    continue
+                _, patch = await self._compute(topic)
+                if patch is not None:
+                    await self._broadcast(topic, {
+                        "type": "patch",
+                        "topic": topic,
+                        "version": self.versions[topic],
+                        "patch": patch,
+                    })
+            active = [self.next_due[t] for t, subs in self.subscribers.items() if subs]
+            if not active:
+                break
+            delay = max(0.05, min(active) - time.monotonic())
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        self._task = None
+
+
+hub = LiveHub(TOPICS)
+
+
+def setup_live_routes(app):
+    """Register live update routes."""
+
+    @app.get("/api/live/topics")
+    def live_topics():
+        """List live topics with subscriber counts and versions."""
+        return hub.stats()
+
+    @app.websocket("/api/live")
+    async def live_socket(ws: WebSocket):
+        """Multiplexed topic subscriptions over one WebSocket."""
+        if not _origin_allowed(ws):
+            await ws.close(code=1008)
+            return
+        await ws.accept()
+        subscribed = set()
+        try:
+            while True:
+                msg = await ws.receive_json()
+                if not isinstance(msg, dict):
+                    continue
+                for topic in msg.get("subscribe", []) or []:
+                    if topic not in hub.topics:
+                        await ws.send_json({"type": "error", "topic": topic, "detail": "Unknown topic"})
+                        continue
+                    if topic not in subscribed:
+                        subscribed.add(topic)
+                        await hub.subscribe(ws, topic)
+                for topic in msg.get("unsubscribe", []) or []:
+                    if topic in subscribed:
+                        subscribed.discard(topic)
+                        hub.unsubscribe(ws, topic)
+        except (WebSocketDisconnect, RuntimeError, ValueError):
+            pass
+        finally:
+            for topic in subscribed:
+                hub.unsubscribe(ws, topic)
@@ -1,62 +1,130 @@
 """Network monitor API."""
 
 from datetime import datetime
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 from fastapi.responses import StreamingResponse
 import asyncio
 import json
+import threading
+import time
 
-from config import network_log, network_paused, network_id_counter
+from state import get_state
+from netstore import get_store
+
+
+# The pause flag lives in the shared state backend so every worker sees it, but
+# events are logged from the event loop; keep a per-process copy and re-read it
+# at most every _PAUSED_TTL seconds, off the loop when the backend is blocking.
+_PAUSED_TTL = 5.0
+_paused = False
+_paused_at = 0.0
+_paused_refreshing = threading.Lock()
+
+
+def _refresh_paused():
+    """Re-read the pause flag from the state backend into the process cache."""
+    global _paused, _paused_at
+    if not _paused_refreshing.acquire(blocking=False):
+        return
+    try:
+        _paused = bool(get_state().get("network:paused", False))
+        _paused_at = time.monotonic()
+    finally:
+        _paused_refreshing.release()
+
+
+def _is_paused() -> bool:
+    """Cached pause flag; a stale value triggers a refresh without waiting on it."""
+    if time.monotonic() - _paused_at >= _PAUSED_TTL and not _paused_refreshing.locked():
+        if get_state().blocking:
+            threading.Thread(target=_refresh_paused, daemon=True).start()
+        else:
+            _refresh_paused()
+    return _paused
+
+
+def warmup():
+    """Load the pause flag before the first event is logged."""
+    _refresh_paused()
+
+
+def _parse_time(value: str | None) -> float | None:
+    """Accept epoch seconds or an ISO-8601 timestamp."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        raise HTTPException(400, f"Invalid time: {value}")
 
 
 def setup_network_routes(app):
     """Register network routes."""
     
     @app.get("/api/network/log")
-    def get_network_log(limit: int = 50):
-        """Get network activity log."""
-        return list(network_log)[-limit:]
+    def get_network_log(response: Response, limit: int = 50, type: str | None = None,
+                        since: str | None = None, until: str | None = None,
+                        cursor: int | None = None):
+        """Get network activity log.
+        
+        Filters by event ``type`` and time range (``since``/``until``, epoch seconds
+        or ISO-8601). Returns the newest ``limit`` matches oldest-first; pass the
+        ``X-Next-Cursor`` header back as ``cursor`` to page further back.
+        """
+        if limit < 1 or limit > 5000:
+            raise HTTPException(400, "limit must be between 1 and 5000")
+        events, next_cursor = get_store().query(
+            event_type=type, since=_parse_time(since), until=_parse_time(until),
+            cursor=cursor, limit=limit,
+        )
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
+        return events
     
     @app.post("/api/network/clear")
     def clear_network_log():
         """Clear network log."""
-        network_log.clear()
+        get_store().clear()
         return {"success": True}
     
     @app.post("/api/network/pause")
     def pause_network(pause: bool = True):
         """Pause/resume network monitoring."""
-        global network_paused
-        network_paused = pause
+        global _paused, _paused_at
+        get_state().set("network:paused", pause)
+        _paused, _paused_at = pause, time.monotonic()
         return {"paused": pause}
     
+    @app.get("/api/network/stats")
+    def network_stats():
+        """Event store writer counters."""
+        return get_store().stats
+    
     @app.get("/api/network/tail")
     async def stream_network():
         """Stream network events via SSE."""
+        store = get_store()
+        
         async def event_generator():
-            last_id = 0
+            last_id = await asyncio.to_thread(store.last_id)
             while True:
                 await asyncio.sleep(2)
                 # Send new entries since last check
-                current_log = list(network_log)
-                new_entries = current_log[last_id:]
+                new_entries = await asyncio.to_thread(store.tail, last_id)
                 for entry in new_entries:
                     yield f"data: {json.dumps(entry)}\n\n"
-                last_id = len(current_log)
+                if new_entries:
+                    last_id = new_entries[-1]["id"]
         
         return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
 def log_network_event(event_type: str, data: dict):
-    """Add entry to network log."""
-    global network_id_counter, network_paused
-    if network_paused:
+    """Add entry to network log (queued; never blocks the caller on disk I/O)."""
+    if _is_paused():
         return
-    
-    network_id_counter += 1
-    network_log.append({
-        "id": network_id_counter,
-        "timestamp": datetime.now().isoformat(),
-        "type": event_type,
-        **data
-    })
+    get_store().append(event_type, data)
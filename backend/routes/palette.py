@@ -0,0 +1,40 @@
+"""Palette API — instant fuzzy search over tasks, sessions, agents and cron jobs."""
+
+import time
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from palette import KINDS, get_palette
+
+
+def warmup():
+    """Build the index so the first palette keystroke is answered from memory."""
+    get_palette().search("")
+
+
+def setup_palette_routes(app):
+    """Register palette routes."""
+
+    @app.get("/api/palette")
+    async def search_palette(q: str = "", limit: int = 20, kind: str | None = None):
+        """Ranked, typo-tolerant matches for ``q`` (``kind``: comma-separated filter)."""
+        kinds = None
+        if kind:
+            kinds = {k.strip() for k in kind.split(",") if k.strip()}
+            unknown = kinds - set(KINDS)
+            if unknown:
+                raise HTTPException(400, f"Unknown kind: {', '.join(sorted(unknown))}")
+        limit = max(1, min(limit, 100))
+
+        def search():
+            start = time.perf_counter()
+            results = get_palette().search(q, limit, kinds)
+            return {"results": results, "tookMs": round((time.perf_counter() - start) * 1000, 2)}
+
+        return await run_in_threadpool(search)
+
+    @app.get("/api/palette/stats")
+    async def palette_stats():
+        """Index size and refresh counters."""
+        return get_palette().info()
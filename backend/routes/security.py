@@ -0,0 +1,32 @@
+"""Security API — auth log aggregates (logins, failures, threat level)."""
+
+from starlette.concurrency import run_in_threadpool
+
+from authlog import get_auth_log
+
+
+def warmup():
+    """Catch up on the auth logs before the first security request."""
+    get_auth_log().ingest(force=True)
+
+
+def setup_security_routes(app):
+    """Register security routes."""
+
+    @app.get("/api/security")
+    async def get_security():
+        """Threat level, recent logins and failure counts for the last 24h."""
+        summary = await run_in_threadpool(get_auth_log().summary, 24, 5)
+        return {
+            "threatLevel": summary["threatLevel"],
+            "recentLogins": summary["recentLogins"],
+            "authFailures24h": summary["failure"],
+            "failuresLastHour": summary["failuresLastHour"],
+            "topSources": summary["sources"],
+        }
+
+    @app.get("/api/security/auth")
+    async def get_auth_events(hours: int = 24, top: int = 20):
+        """Per-source-IP login/failure counters and hourly series."""
+        hours = max(1, min(hours, 24 * 7))
+        return await run_in_threadpool(get_auth_log().summary, hours, max(1, min(top, 500)))
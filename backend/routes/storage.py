@@ -0,0 +1,19 @@
+"""Storage API — disk usage of OPENCLAW_DIR per agent and workspace."""
+
+from starlette.concurrency import run_in_threadpool
+
+from storage import get_storage_index
+
+
+def warmup():
+    """Fill the usage cache so the first /api/storage call is cheap."""
+    get_storage_index().report()
+
+
+def setup_storage_routes(app):
+    """Register storage routes."""
+
+    @app.get("/api/storage")
+    async def get_storage():
+        """Bytes and file counts per agent (and session directory) and workspace."""
+        return await run_in_threadpool(get_storage_index().report)
@@ -0,0 +1,163 @@
+"""Compact session records read from agents' sessions.json files.
+
+A sessions.json maps session key -> session object, and the objects carry
+far more than the dashboard uses (skill snapshots, prompt reports, ...).
+Decoding a whole file with ``json.loads`` materialises all of it at once, so
+files are parsed incrementally instead: the file is read in chunks and one
+session object is decoded at a time, keeping only ``FIELDS`` in a
+``__slots__`` record. The rest of each object is dropped before the next one
+is decoded.
+
+Parsed files are cached by (mtime, size), so polls that find an unchanged
+file reuse its records. Records are shared and must not be mutated.
+"""
+
+import os
+import re
+import sys
+import json
+import threading
+
+from config import OPENCLAW_DIR
+
+# Session fields the routes read
+FIELDS = ("updatedAt", "totalTokens", "contextTokens", "inputTokens", "outputTokens",
+          "channel", "runCount", "sessionFile", "abortedLastRun", "status")
+CHUNK_SIZE = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+_WS = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9eE.+-]*")
+
+
+class SessionRecord:
+    """The fields of one session the dashboard uses, with a dict-like ``get``."""
+
+    __slots__ = ("key", "agentDirName") + FIELDS
+
+    def __init__(self, key: str, agent_dir: str, data: dict):
+        self.key = key
+        self.agentDirName = agent_dir
+        for name in FIELDS:
+            setattr(self, name, data.get(name))
+        if isinstance(self.channel, str):
+            self.channel = sys.intern(self.channel)
+
+    def get(self, name: str, default=None):
+        value = getattr(self, name, None)
+        return default if value is None else value
+
+    def __getitem__(self, name: str):
+        value = getattr(self, name, None)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+
+class _Reader:
+    """Chunked text buffer that grows whenever a token runs past its end."""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = f.read(chunk_size)
+        self.pos = 0
+        self.eof = not self.buf
+
+    def more(self) -> bool:
+        if self.eof:
+            return False
+        # Read at least as much as is buffered so a huge value is re-scanned O(log n) times
+        chunk = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self.more():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Most likely cut off at the end of the buffer
+                if not self.more():
+                    raise
+                continue
+            if not isinstance(value, (dict, list, str)) and \
+                    _NUMBER_TAIL.fullmatch(self.buf, end) and self.more():
+                continue  # a number cut at the buffer end (e.g. "1.5e|3") may go on
+            self.pos = end
+            return value
+
+
+def iter_sessions(path, chunk_size: int = CHUNK_SIZE):
+    """Yield (key, session object) pairs from a sessions.json, one at a time."""
+    with open(path, encoding="utf-8") as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect("{")
+        while True:
+            char = reader.peek()
+            if char == "}":
+                return
+            if char == ",":  # also tolerates trailing commas
+                reader.pos += 1
+                continue
+            key = reader.value()
+            reader.expect(":")
+            yield key, reader.value()
+
+
+_cache: dict[str, tuple[int, int, list]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_sessions(path, agent_dir: str) -> list[SessionRecord]:
+    """Records of one sessions.json (cached until the file changes)."""
+    path = str(path)
+    st = os.stat(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    records = [SessionRecord(key, agent_dir, sess)
+               for key, sess in iter_sessions(path) if isinstance(sess, dict)]
+    with _cache_lock:
+        _cache[path] = (st.st_mtime_ns, st.st_size, records)
+    return records
+
+
+def all_sessions(root=OPENCLAW_DIR) -> list[SessionRecord]:
+    """Records from every agent's sessions.json (unreadable files are skipped)."""
+    sessions = []
+    agents_dir = os.path.join(str(root), "agents")
+    try:
+        agent_dirs = sorted(e.name for e in os.scandir(agents_dir) if e.is_dir())
+    except OSError:
+        return sessions
+    seen = set()
+    for name in agent_dirs:
+        path = os.path.join(agents_dir, name, "sessions", "sessions.json")
+        seen.add(path)
+        try:
+            sessions.extend(load_sessions(path, name))
+        except (OSError, ValueError):
+            continue
+    with _cache_lock:
+        for gone in [p for p in _cache if p.startswith(agents_dir + os.sep) and p not in seen]:
+            del _cache[gone]
+    return sessions
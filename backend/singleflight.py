@@ -0,0 +1,116 @@
+"""Single-flight coalescing for expensive computations.
+
+Concurrent calls with the same key wait for one in-flight computation and
+share its result (or its exception) instead of each running it. A call may
+also accept a result that finished less than ``ttl`` seconds ago, so polls
+that arrive just after a computation reuse it too.
+
+Results are shared between callers and must be treated as read-only.
+
+    flight = group("agents")
+    agents = flight.do(("list",), _list_agents, ttl=1.0)
+
+Groups are thread-safe (sync routes run in the threadpool). Per-group
+counters are available from ``stats()``.
+"""
+
+import time
+import threading
+
+# Finished results kept per group before expired ones are swept
+MAX_KEYS = 256
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "finished", "ttl")
+
+    def __init__(self, ttl: float):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+        self.finished = 0.0
+        self.ttl = ttl
+
+
+class SingleFlight:
+    """One in-flight computation per key, plus a short freshness window."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0, "hits": 0, "errors": 0}
+
+    def do(self, key, fn, ttl: float = 0.0):
+        """Return ``fn()``, sharing one execution among concurrent callers of ``key``."""
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                if not call.done.is_set():
+                    self.stats["coalesced"] += 1
+                    leader = False
+                elif call.error is None and time.monotonic() - call.finished < ttl:
+                    self.stats["hits"] += 1
+                    return call.result
+                else:
+                    call = None
+            if call is None:
+                if len(self._calls) >= MAX_KEYS:
+                    self._sweep()
+                call = self._calls[key] = _Call(ttl)
+                self.stats["executions"] += 1
+                leader = True
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            call.finished = time.monotonic()
+            call.done.set()
+            with self._lock:
+                # Failed calls are never reused; successful ones only within a ttl
+                if call.error is not None or ttl <= 0:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+        return call.result
+
+    def _sweep(self):
+        now = time.monotonic()
+        for key in [k for k, c in self._calls.items()
+                    if c.done.is_set() and now - c.finished >= c.ttl]:
+            del self._calls[key]
+
+    def info(self) -> dict:
+        calls = self.stats["calls"]
+        saved = self.stats["coalesced"] + self.stats["hits"]
+        return {**self.stats, "inFlight": sum(not c.done.is_set() for c in list(self._calls.values())),
+                "savedRatio": round(saved / calls, 3) if calls else 0.0}
+
+
+_groups: dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def group(name: str) -> SingleFlight:
+    """Shared single-flight group ``name``."""
+    with _groups_lock:
+        flight = _groups.get(name)
+        if flight is None:
+            flight = _groups[name] = SingleFlight(name)
+        return flight
+
+
+def stats() -> dict:
+    """Counters for every group."""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {flight.name: flight.info() for flight in groups}
@@ -0,0 +1,187 @@
+"""Shared dashboard state (flags, rate-limit windows, secrets).
+
+Module globals are per process, so ``uvicorn --workers N`` would give every
+worker its own flags and rate-limit clocks. Everything that must agree
+across workers goes through ``get_state()`` instead:
+
+- ``memory`` (default): in-process, same behaviour as before.
+- ``sqlite``: a WAL-mode SQLite file shared by all workers on the host.
+
+Select with ``DASHBOARD_STATE_BACKEND`` and ``DASHBOARD_STATE_DB``.
+"""
+
+import os
+import json
+import time
+import secrets
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from config import DASHBOARD_DATA_DIR
+
+
+class StateBackend(ABC):
+    """Interface shared by the state backends."""
+
+    name = "base"
+    # Whether calls may block (disk I/O, cross-process locks); async callers offload them
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str, default=None):
+        """Value stored under ``key`` (JSON-serializable), else ``default``."""
+
+    @abstractmethod
+    def set(self, key: str, value):
+        """Store a JSON-serializable value."""
+
+    @abstractmethod
+    def rate_limit_hit(self, bucket: str, calls: int, period: float) -> bool:
+        """Record a hit in a sliding window; False if ``calls`` per ``period`` is exceeded."""
+
+    @abstractmethod
+    def secret(self, name: str) -> str:
+        """Get a random secret, creating it once for all workers."""
+
+
+class MemoryStateBackend(StateBackend):
+    """Per-process state (single worker)."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._clocks = defaultdict(list)
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def set(self, key, value):
+        self._values[key] = value
+
+    def rate_limit_hit(self, bucket, calls, period):
+        now = time.time()
+        with self._lock:
+            clock = [t for t in self._clocks[bucket] if now - t < period]
+            allowed = len(clock) < calls
+            if allowed:
+                clock.append(now)
+            self._clocks[bucket] = clock
+            return allowed
+
+    def secret(self, name):
+        with self._lock:
+            key = f"secret:{name}"
+            if key not in self._values:
+                self._values[key] = secrets.token_hex(32)
+            return self._values[key]
+
+
+class SQLiteStateBackend(StateBackend):
+    """State in a WAL-mode SQLite file, consistent across worker processes."""
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            DROP TABLE IF EXISTS logs;
+            CREATE TABLE IF NOT EXISTS hits (bucket TEXT NOT NULL, ts REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS hits_bucket_ts ON hits (bucket, ts);
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread (and per process: workers import us fresh)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._enable_wal(conn)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _enable_wal(conn: sqlite3.Connection):
+        # WAL is persistent per file, but switching to it needs an exclusive lock
+        # that ignores the busy timeout, so retry while other workers start up.
+        for _ in range(50):
+            try:
+                if conn.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+                    conn.execute("PRAGMA journal_mode=WAL")
+                return
+            except sqlite3.OperationalError:
+                time.sleep(0.1)
+        raise sqlite3.OperationalError(f"Could not enable WAL on {conn}")
+
+    def _write(self, fn):
+        """Run ``fn(conn)`` inside one IMMEDIATE transaction."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def get(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key, value):
+        self._conn().execute(
+            "INSERT INTO kv (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value)),
+        )
+
+    def rate_limit_hit(self, bucket, calls, period):
+        now = time.time()
+
+        def op(conn):
+            conn.execute("DELETE FROM hits WHERE bucket = ? AND ts <= ?", (bucket, now - period))
+            count = conn.execute("SELECT COUNT(*) FROM hits WHERE bucket = ?", (bucket,)).fetchone()[0]
+            if count >= calls:
+                return False
+            conn.execute("INSERT INTO hits (bucket, ts) VALUES (?, ?)", (bucket, now))
+            return True
+        return self._write(op)
+
+    def secret(self, name):
+        key = f"secret:{name}"
+
+        def op(conn):
+            # INSERT OR IGNORE makes the first worker's secret win
+            conn.execute("INSERT OR IGNORE INTO kv (key, value) VALUES (?, ?)",
+                         (key, json.dumps(secrets.token_hex(32))))
+            return json.loads(conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()[0])
+        return self._write(op)
+
+
+_state: StateBackend | None = None
+_state_lock = threading.Lock()
+
+
+def get_state() -> StateBackend:
+    """Shared state backend selected by ``DASHBOARD_STATE_BACKEND`` (memory | sqlite)."""
+    global _state
+    with _state_lock:
+        if _state is None:
+            kind = os.environ.get("DASHBOARD_STATE_BACKEND", "memory")
+            if kind == "sqlite":
+                path = os.environ.get("DASHBOARD_STATE_DB", str(DASHBOARD_DATA_DIR / "state.db"))
+                _state = SQLiteStateBackend(path)
+            elif kind == "memory":
+                _state = MemoryStateBackend()
+            else:
+                raise ValueError(f"Unknown DASHBOARD_STATE_BACKEND: {kind}")
+        return _state
@@ -0,0 +1,233 @@
+"""Disk usage accounting for OPENCLAW_DIR.
+
+Walking every transcript on each request is too slow for the overview page,
+so totals are cached per directory:
+
+- A directory's own files (count + bytes) are reused while its mtime is
+  unchanged, so only directories that gained or lost entries are re-listed.
+- Appending to a file does not touch its directory's mtime. Under the shared
+  file watcher, change events invalidate the file's directory and its
+  ancestors, and a clean subtree is reused without any syscalls. Elsewhere,
+  own-file sizes are re-stat'ed once they are ``RESTAT_SECONDS`` old.
+- Top-level units (agents, workspaces) are walked in parallel threads.
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import fswatch
+from config import OPENCLAW_DIR
+
+# Re-stat files in unwatched directories at most this often
+RESTAT_SECONDS = 30
+WALK_THREADS = 8
+
+
+class _DirEntry:
+    __slots__ = ("mtime_ns", "own_bytes", "own_files", "subdirs", "checked",
+                 "total_bytes", "total_files", "gen", "clean_gen", "own_gen", "own_clean_gen")
+
+    def __init__(self):
+        self.mtime_ns = None
+        self.own_bytes = self.own_files = 0
+        self.subdirs: list[str] = []
+        self.checked = 0.0
+        self.total_bytes = self.total_files = 0
+        # Bumped by watcher events; a cached value is clean while its *_clean_gen matches
+        self.gen = self.own_gen = 0
+        self.clean_gen = self.own_clean_gen = -1
+
+
+class StorageIndex:
+    """Per-directory usage cache with watcher-driven invalidation."""
+
+    def __init__(self, root):
+        self.root = str(root)
+        self._dirs: dict[str, _DirEntry] = {}
+        self._lock = threading.Lock()
+        self._watched: list[str] = []
+        self._token = None
+        self.stats = {"scans": 0, "dirsListed": 0, "dirsReused": 0}
+
+    # ── Invalidation ───────────────────────────────────────────────────
+
+    def _ensure_watch(self):
+        if self._token is not None:
+            return
+        watcher = fswatch.get_watcher()
+        if watcher is None:
+            return
+        self._watched = [str(r.path) for r in watcher.roots if r.recursive]
+        self._token = watcher.subscribe(self._on_fs_events, self._watched)
+
+    def _covered(self, path: str) -> bool:
+        """True if the watcher reports every change under ``path``."""
+        return any(path == w or path.startswith(w + os.sep) for w in self._watched)
+
+    def _on_fs_events(self, events: list[dict]):
+        with self._lock:
+            for event in events:
+                if event["kind"] == "overflow":
+                    for entry in self._dirs.values():
+                        entry.gen += 1
+                        entry.own_gen += 1
+                    continue
+                path = event["path"]
+                entry = self._dirs.get(path)
+                if entry is not None:  # a directory changed itself
+                    entry.own_gen += 1
+                parent = os.path.dirname(path)
+                if parent in self._dirs:
+                    self._dirs[parent].own_gen += 1
+                # Every ancestor's subtree total is now stale
+                while parent.startswith(self.root):
+                    entry = self._dirs.get(parent)
+                    if entry is not None:
+                        entry.gen += 1
+                    if parent == self.root:
+                        break
+                    parent = os.path.dirname(parent)
+
+    # ── Walking ────────────────────────────────────────────────────────
+
+    def _entry(self, path: str) -> _DirEntry:
+        with self._lock:
+            entry = self._dirs.get(path)
+            if entry is None:
+                entry = self._dirs[path] = _DirEntry()
+            return entry
+
+    def walk(self, path: str, done: dict | None = None) -> tuple[int, int]:
+        """(bytes, files) under ``path``, reusing whatever is still valid.
+
+        ``done`` maps directories already walked in this pass to their totals.
+        """
+        if done and path in done:
+            return done[path]
+        entry = self._entry(path)
+        covered = self._covered(path)
+        with self._lock:
+            gen, own_gen = entry.gen, entry.own_gen
+        if covered and entry.clean_gen == gen:
+            self.stats["dirsReused"] += 1
+            return entry.total_bytes, entry.total_files
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._dirs.pop(path, None)
+            return 0, 0
+        now = time.monotonic()
+        own_valid = entry.mtime_ns == mtime_ns and (
+            entry.own_clean_gen == own_gen if covered else now - entry.checked < RESTAT_SECONDS
+        )
+        if own_valid:
+            self.stats["dirsReused"] += 1
+        else:
+            self._list(path, entry, mtime_ns, now)
+            entry.own_clean_gen = own_gen
+            self.stats["dirsListed"] += 1
+        total_bytes, total_files = entry.own_bytes, entry.own_files
+        for sub in entry.subdirs:
+            b, f = self.walk(sub, done)
+            total_bytes += b
+            total_files += f
+        entry.total_bytes, entry.total_files = total_bytes, total_files
+        entry.clean_gen = gen
+        return total_bytes, total_files
+
+    def _list(self, path: str, entry: _DirEntry, mtime_ns: int, now: float):
+        own_bytes = own_files = 0
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            subdirs.append(e.path)
+                        elif e.is_file(follow_symlinks=False):
+                            own_bytes += e.stat(follow_symlinks=False).st_size
+                            own_files += 1
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        with self._lock:
+            # Forget cached subdirectories that no longer exist
+            for gone in set(entry.subdirs) - set(subdirs):
+                prefix = gone + os.sep
+                for key in [k for k in self._dirs if k == gone or k.startswith(prefix)]:
+                    del self._dirs[key]
+        entry.mtime_ns = mtime_ns
+        entry.own_bytes, entry.own_files = own_bytes, own_files
+        entry.subdirs = subdirs
+        entry.checked = now
+
+    # ── Report ─────────────────────────────────────────────────────────
+
+    def report(self) -> dict:
+        """Usage per agent (and its session directories), per workspace and in total."""
+        self._ensure_watch()
+        start = time.perf_counter()
+        self.stats["scans"] += 1
+        root = self.root
+        agents_dir = os.path.join(root, "agents")
+
+        def subdirs(path):
+            try:
+                with os.scandir(path) as it:
+                    return sorted(e.name for e in it if e.is_dir(follow_symlinks=False))
+            except OSError:
+                return []
+
+        agent_ids = subdirs(agents_dir)
+        workspaces = [name for name in subdirs(root) if name.startswith("workspace")]
+        # Agents' session directories are walked as their own units so they run in parallel
+        units = {os.path.join(agents_dir, a, name) for a in agent_ids
+                 for name in subdirs(os.path.join(agents_dir, a))}
+        units.update(os.path.join(root, w) for w in workspaces)
+
+        with ThreadPoolExecutor(max_workers=WALK_THREADS) as pool:
+            done = dict(zip(units, pool.map(self.walk, units)))
+        # The root walk stitches the units' fresh totals together
+        total_bytes, total_files = self.walk(root, done)
+
+        def usage(path):
+            entry = self._dirs.get(path)
+            return {"bytes": entry.total_bytes, "files": entry.total_files} if entry \
+                else {"bytes": 0, "files": 0}
+
+        agents = []
+        for a in agent_ids:
+            path = os.path.join(agents_dir, a)
+            agents.append({
+                "id": a,
+                **usage(path),
+                "dirs": {name: usage(os.path.join(path, name))
+                         for name in subdirs(path)},
+            })
+        return {
+            "root": root,
+            "bytes": total_bytes,
+            "files": total_files,
+            "agents": sorted(agents, key=lambda x: -x["bytes"]),
+            "workspaces": sorted(({"name": w, **usage(os.path.join(root, w))} for w in workspaces),
+                                 key=lambda x: -x["bytes"]),
+            "scanMs": round((time.perf_counter() - start) * 1000, 1),
+            "watched": bool(self._watched),
+            **self.stats,
+        }
+
+
+_index: StorageIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_storage_index() -> StorageIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = StorageIndex(OPENCLAW_DIR)
+        return _index
@@ -0,0 +1,36 @@
+"""Counts produced by the auth log parser for a small sshd/PAM fixture."""
+
+from pathlib import Path
+
+from authlog import AuthLog, parse_event
+
+FIXTURE = Path(__file__).parent / "fixtures" / "auth.log"
+
+
+def test_parse_event_counts_failures_from_sshd_lines_only():
+    assert parse_event("pam_unix(sshd:auth): authentication failure; logname= uid=0 "
+                       "euid=0 tty=ssh ruser= rhost=203.0.113.7  user=root") is None
+    assert parse_event("Invalid user admin from 203.0.113.7 port 40102") == \
+        ("invalid", "admin", "203.0.113.7", 1)
+    assert parse_event("Failed password for invalid user admin from 203.0.113.7 port 40102 ssh2") == \
+        ("failure", "admin", "203.0.113.7", 1)
+
+
+def test_fixture_counts_one_failure_per_attempt(tmp_path):
+    log = AuthLog([str(FIXTURE)], tmp_path / "authlog.json")
+    # Read without pruning: the fixture's timestamps are older than the retention window
+    log._ingest_file(str(FIXTURE))
+
+    attacker = log.sources["203.0.113.7"]
+    assert attacker["failure"] == 4  # root, invalid admin, then root repeated twice
+    assert attacker["invalidUser"] == 1
+    assert attacker["success"] == 0
+    assert sorted(attacker["users"]) == ["admin", "root"]
+
+    assert log.sources["10.0.0.5"]["success"] == 1
+    bob = log.sources["198.51.100.2"]
+    assert (bob["success"], bob["failure"]) == (1, 1)
+
+    assert sum(v[0] for v in log.buckets.values()) == 2
+    assert sum(v[1] for v in log.buckets.values()) == 5
+    assert [e["user"] for e in log.logins] == ["alice", "bob"]
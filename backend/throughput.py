@@ -0,0 +1,284 @@
+"""Live agent throughput from transcript growth.
+
+Session transcripts only ever grow while an agent works, so activity is
+measured from the bytes appended to ``agents/<id>/sessions/*.jsonl``: each
+new line, the tokens in its ``usage`` and its tool calls feed exponentially
+decayed counters per session and per agent. A counter decays with time
+constant ``TAU_SECONDS``, so at a steady rate r/s it settles at r * TAU and
+reading a per-minute rate is O(1) whenever it is polled.
+
+Growth is picked up from the shared file watcher: the watcher callback only
+marks transcripts dirty (with the time of the change), and the appended
+bytes are read on the next rates request. When watching is off, each read
+stats the transcripts instead. A line longer than ``MAX_READ_BYTES`` is
+skipped (counted as a line, not parsed) rather than buffered.
+"""
+
+import os
+import json
+import math
+import time
+import threading
+
+import fswatch
+from config import OPENCLAW_DIR
+from transcripts import message_of, tool_calls
+
+TAU_SECONDS = 60.0
+# An agent counts as working above this many transcript lines per minute
+WORKING_LINES_PER_MIN = 0.5
+# Appended bytes read per chunk
+MAX_READ_BYTES = 4 * 1024 * 1024
+
+
+class DecayedCounter:
+    """Event counter whose value decays exponentially with time."""
+
+    __slots__ = ("value", "at")
+
+    def __init__(self):
+        self.value = 0.0
+        self.at = 0.0
+
+    def add(self, amount: float, now: float):
+        self.value = self.value * math.exp(-(now - self.at) / TAU_SECONDS) + amount
+        self.at = now
+
+    def per_minute(self, now: float) -> float:
+        return self.value * math.exp(-(now - self.at) / TAU_SECONDS) * 60 / TAU_SECONDS
+
+
+class _Rates:
+    __slots__ = ("lines", "tokens", "tool_calls", "last")
+
+    def __init__(self):
+        self.lines = DecayedCounter()
+        self.tokens = DecayedCounter()
+        self.tool_calls = DecayedCounter()
+        self.last = None
+
+    def add(self, lines: int, tokens: int, calls: int, now: float):
+        self.lines.add(lines, now)
+        self.tokens.add(tokens, now)
+        self.tool_calls.add(calls, now)
+        self.last = time.time()
+
+    def snapshot(self, now: float) -> dict:
+        return {
+            "linesPerMin": round(self.lines.per_minute(now), 2),
+            "tokensPerMin": round(self.tokens.per_minute(now), 1),
+            "toolCallsPerMin": round(self.tool_calls.per_minute(now), 2),
+            "lastActivity": int(self.last * 1000) if self.last else None,
+        }
+
+
+def _usage_tokens(msg: dict) -> int:
+    usage = msg.get("usage")
+    if not isinstance(usage, dict):
+        return 0
+    total = usage.get("totalTokens") or usage.get("total_tokens")
+    if total is None:
+        total = sum(usage.get(k) or 0 for k in ("input", "output", "input_tokens", "output_tokens"))
+    return total if isinstance(total, (int, float)) else 0
+
+
+class ThroughputTracker:
+    """Per-session and per-agent decayed rates fed by transcript appends."""
+
+    def __init__(self, root=OPENCLAW_DIR):
+        self.agents_dir = os.path.join(str(root), "agents")
+        self.lock = threading.Lock()
+        # transcript path -> [(dev, inode), offset, inside an oversize line]
+        self._files: dict[str, list] = {}
+        self._sessions: dict[str, _Rates] = {}
+        self._agents: dict[str, _Rates] = {}
+        # transcripts changed since the last read -> monotonic time of the change
+        self._dirty: dict[str, float] = {}
+        self._overflow = None
+        self._dirty_lock = threading.Lock()
+        self._token = None
+        self._started = False
+        self.stats = {"batches": 0, "bytesRead": 0, "lines": 0, "oversizeLines": 0}
+
+    def _agent_of(self, path: str) -> str | None:
+        """Agent id for ``agents/<id>/sessions/<file>.jsonl``, else None."""
+        if not path.endswith(".jsonl"):
+            return None
+        rel = os.path.relpath(path, self.agents_dir).split(os.sep)
+        if len(rel) != 3 or rel[1] != "sessions":
+            return None
+        return rel[0]
+
+    def _transcripts(self):
+        try:
+            agents = [e.path for e in os.scandir(self.agents_dir) if e.is_dir()]
+        except OSError:
+            return
+        for agent in agents:
+            try:
+                with os.scandir(os.path.join(agent, "sessions")) as it:
+                    for e in it:
+                        if e.name.endswith(".jsonl") and e.is_file():
+                            yield e.path
+            except OSError:
+                continue
+
+    def start(self):
+        """Record current transcript sizes (history isn't counted) and subscribe."""
+        with self.lock:
+            if self._started:
+                return
+            self._started = True
+            for path in self._transcripts():
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                self._files[path] = [(st.st_dev, st.st_ino), st.st_size, False]
+        self._token = fswatch.subscribe(self._on_fs_events, [self.agents_dir])
+
+    def _on_fs_events(self, events: list[dict]):
+        """Mark changed transcripts; they are read on the next rates request."""
+        now = time.monotonic()
+        with self._dirty_lock:
+            self.stats["batches"] += 1
+            for event in events:
+                if event["kind"] == "overflow":
+                    self._overflow = now
+                elif self._agent_of(event["path"]) is not None:
+                    self._dirty[event["path"]] = now
+
+    def _drain(self):
+        """Read what was appended to transcripts marked dirty by the watcher."""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, {}
+            overflow, self._overflow = self._overflow, None
+        if overflow is not None:
+            # Changes were lost: re-check every transcript, known or new
+            for path in list(self._transcripts()) + list(self._files):
+                dirty.setdefault(path, overflow)
+        with self.lock:
+            for path, at in sorted(dirty.items(), key=lambda item: item[1]):
+                if os.path.exists(path):
+                    self._consume(path, at)
+                else:
+                    self._forget(path)
+
+    def _forget(self, path: str):
+        self._files.pop(path, None)
+        self._sessions.pop(path, None)
+
+    def _poll(self):
+        """Without a watcher: check every transcript for growth."""
+        with self.lock:
+            seen = set()
+            for path in self._transcripts():
+                seen.add(path)
+                self._consume(path)
+            for gone in set(self._files) - seen:
+                self._forget(gone)
+
+    def _consume(self, path: str, at: float | None = None):
+        agent = self._agent_of(path)
+        if agent is None:
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        ident = (st.st_dev, st.st_ino)
+        state = self._files.get(path)
+        if state is None or state[0] != ident or st.st_size < state[1]:
+            # New (or replaced) transcript: everything in it is new activity
+            state = self._files[path] = [ident, 0, False]
+        if st.st_size == state[1]:
+            return
+        lines = tokens = calls = 0
+        try:
+            with open(path, "rb") as f:
+                f.seek(state[1])
+                while state[1] < st.st_size:
+                    data = f.read(min(st.st_size - state[1], MAX_READ_BYTES))
+                    if not data:
+                        break
+                    if state[2]:
+                        # Inside an oversize line: discard up to its end
+                        nl = data.find(b"\n")
+                        state[1] += len(data) if nl < 0 else nl + 1
+                        if nl >= 0:
+                            state[2] = False
+                            lines += 1
+                            self.stats["oversizeLines"] += 1
+                            f.seek(state[1])
+                        continue
+                    end = data.rfind(b"\n") + 1
+                    if not end:
+                        if len(data) < MAX_READ_BYTES:
+                            break  # no complete line yet
+                        state[1] += len(data)
+                        state[2] = True
+                        continue
+                    for raw in data[:end].splitlines():
+                        if not raw.strip():
+                            continue
+                        lines += 1
+                        try:
+                            msg = message_of(json.loads(raw))
+                        except ValueError:
+                            continue
+                        if msg and msg.get("role") == "assistant":
+                            tokens += _usage_tokens(msg)
+                            calls += len(tool_calls(msg))
+                    state[1] += end
+                    f.seek(state[1])
+                    self.stats["bytesRead"] += end
+        except OSError:
+            pass
+        if not lines:
+            return
+        self.stats["lines"] += lines
+        now = time.monotonic() if at is None else at
+        self._sessions.setdefault(path, _Rates()).add(lines, tokens, calls, now)
+        self._agents.setdefault(agent, _Rates()).add(lines, tokens, calls, now)
+
+    def agent_rates(self) -> dict[str, dict]:
+        """Agent id -> current rates (agents with no activity since start are absent)."""
+        self.start()
+        if self._token is None:
+            self._poll()
+        else:
+            self._drain()
+        now = time.monotonic()
+        with self.lock:
+            return {agent: rates.snapshot(now) for agent, rates in self._agents.items()}
+
+    def session_rates(self, agent: str | None = None, limit: int = 20) -> list[dict]:
+        """Busiest sessions by current line rate."""
+        self.start()
+        if self._token is None:
+            self._poll()
+        else:
+            self._drain()
+        now = time.monotonic()
+        with self.lock:
+            items = [(path, rates.snapshot(now)) for path, rates in self._sessions.items()
+                     if agent is None or self._agent_of(path) == agent]
+        items.sort(key=lambda item: -item[1]["linesPerMin"])
+        return [{"agentId": self._agent_of(path), "file": os.path.basename(path), **rates}
+                for path, rates in items[:limit]]
+
+
+def is_working(rates: dict | None) -> bool:
+    return bool(rates) and rates["linesPerMin"] >= WORKING_LINES_PER_MIN
+
+
+_tracker: ThroughputTracker | None = None
+_tracker_lock = threading.Lock()
+
+
+def get_throughput() -> ThroughputTracker:
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = ThroughputTracker()
+        return _tracker
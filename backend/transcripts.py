@@ -0,0 +1,191 @@
+"""Turn index for session transcripts (JSONL).
+
+A turn is one user or assistant message. Assistant turns carry their tool
+calls, each paired with the ``toolResult`` entry that answers it, wherever
+that result lands in the file. The index keeps only byte ranges and small
+metadata per turn: text is re-read for the turns being served, so memory
+stays flat for long sessions.
+
+Transcripts are append-only, so an index is extended from the last parsed
+byte when the file grows and rebuilt only if it shrinks or is replaced.
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+
+# Indexes kept in memory (least recently used are dropped)
+MAX_INDEXES = 32
+# Characters of tool arguments/results included in a turn
+TOOL_PREVIEW_CHARS = 2000
+
+
+def message_of(entry: dict) -> dict | None:
+    """The message in a transcript entry (top-level role or ``message`` wrapper)."""
+    if not isinstance(entry, dict):
+        return None
+    if entry.get("role"):
+        return entry
+    msg = entry.get("message")
+    if isinstance(msg, dict) and msg.get("role"):
+        return msg
+    return None
+
+
+def content_text(msg: dict) -> str:
+    """Plain text of a message, joining its text blocks."""
+    content = msg.get("content") or msg.get("text") or ""
+    if isinstance(content, list):
+        content = "\n".join(
+            block.get("text", "") for block in content
+            if isinstance(block, dict) and block.get("type") == "text"
+        )
+    return str(content).strip()
+
+
+def tool_calls(msg: dict) -> list[dict]:
+    """Tool call blocks of an assistant message."""
+    content = msg.get("content")
+    if not isinstance(content, list):
+        return []
+    return [b for b in content if isinstance(b, dict) and b.get("type") in ("toolCall", "tool_use")]
+
+
+def _result_id(msg: dict) -> str | None:
+    return msg.get("toolCallId") or msg.get("tool_use_id") or msg.get("toolUseId")
+
+
+class _Turn:
+    __slots__ = ("start", "end", "role", "text_len", "timestamp", "calls")
+
+    def __init__(self, start, end, role, text_len, timestamp):
+        self.start = start
+        self.end = end
+        self.role = role
+        self.text_len = text_len
+        self.timestamp = timestamp
+        # [(call id, name, result (start, end) or None)]
+        self.calls: list[list] = []
+
+
+class TranscriptIndex:
+    """Turns of one transcript file, extended incrementally."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, ident):
+        self.ident = ident
+        self.offset = 0
+        self.turns: list[_Turn] = []
+        # Tool call id -> (turn index, call index) awaiting a result
+        self.open_calls: dict[str, tuple[int, int]] = {}
+
+    def refresh(self):
+        """Parse whatever was appended since the last call."""
+        st = os.stat(self.path)
+        ident = (st.st_dev, st.st_ino)
+        if ident != self.ident or st.st_size < self.offset:
+            self._reset(ident)
+        if st.st_size == self.offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            offset = self.offset
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # partial line still being written
+                start, offset = offset, offset + len(raw)
+                self._add(raw, start, offset)
+            self.offset = offset
+
+    def _add(self, raw: bytes, start: int, end: int):
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return
+        msg = message_of(entry)
+        if msg is None:
+            return
+        role = msg.get("role")
+        if role in ("toolResult", "tool"):
+            where = self.open_calls.pop(_result_id(msg), None)
+            if where is not None:
+                self.turns[where[0]].calls[where[1]][2] = (start, end)
+            return
+        turn = _Turn(start, end, role, len(content_text(msg)),
+                     entry.get("timestamp") or msg.get("timestamp"))
+        for call in tool_calls(msg):
+            call_id = call.get("id")
+            turn.calls.append([call_id, call.get("name"), None])
+            if call_id:
+                self.open_calls[call_id] = (len(self.turns), len(turn.calls) - 1)
+        self.turns.append(turn)
+
+    def page(self, start: int, stop: int) -> list[dict]:
+        """Turns [start, stop) with text and tool results read back from the file."""
+        out = []
+        with open(self.path, "rb") as f:
+            for i in range(start, stop):
+                turn = self.turns[i]
+                msg = message_of(_read_json(f, turn.start, turn.end)) or {}
+                blocks = {c.get("id"): c for c in tool_calls(msg)}
+                calls = []
+                for call_id, name, result in turn.calls:
+                    args = blocks.get(call_id, {}).get("arguments", blocks.get(call_id, {}).get("input"))
+                    item = {"id": call_id, "name": name,
+                            "arguments": _preview(args), "result": None, "isError": False}
+                    if result:
+                        res = message_of(_read_json(f, *result)) or {}
+                        item["result"] = content_text(res)[:TOOL_PREVIEW_CHARS]
+                        item["isError"] = bool(res.get("isError"))
+                    calls.append(item)
+                out.append({
+                    "index": i,
+                    "role": turn.role,
+                    "start": turn.start,
+                    "end": turn.end,
+                    "timestamp": turn.timestamp,
+                    "text": content_text(msg),
+                    "textLength": turn.text_len,
+                    "toolCalls": calls,
+                })
+        return out
+
+
+def _read_json(f, start: int, end: int):
+    f.seek(start)
+    try:
+        return json.loads(f.read(end - start))
+    except ValueError:
+        return None
+
+
+def _preview(value) -> str | None:
+    if value is None:
+        return None
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    return text[:TOOL_PREVIEW_CHARS]
+
+
+_indexes: OrderedDict[str, TranscriptIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_transcript(path) -> TranscriptIndex:
+    """Up-to-date turn index for ``path`` (shared, LRU-cached)."""
+    path = str(path)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = TranscriptIndex(path)
+            while len(_indexes) > MAX_INDEXES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(path)
+    with index.lock:
+        index.refresh()
+    return index
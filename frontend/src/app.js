@@ -342,9 +342,10 @@ function showView(name) {
   var target = document.getElementById('view-' + name);
   if (target) target.classList.add('active');
 
-  if (name === 'kanban') loadKanban();
+  if (name === 'kanban') return loadKanban();
   if (name === 'agents') loadAgents();
   if (name === 'subagents') loadSubagents();
+  if (name === 'files') loadFiles(currentPath);
   if (name === 'calendar') loadCalendar();
 }
 
@@ -361,6 +362,7 @@ var COLUMNS = [
 ];
 
 var kanbanTasks = [];
+var kanbanVersion = 0;
 var editingTaskId = null;
 
 async function loadKanban() {
@@ -368,12 +370,54 @@ async function loadKanban() {
     var res = await fetch(API + '/kanban');
     var board = await res.json();
     kanbanTasks = board.tasks || [];
+    kanbanVersion = board.version || 0;
     renderKanban();
   } catch (e) {
     document.getElementById('kanban-board').innerHTML = '<div class="loading">Error loading tasks</div>';
   }
 }
 
+// Pull only the task-level changes since our board version
+async function syncKanban() {
+  try {
+    var res = await fetch(API + '/kanban/changes?since=' + kanbanVersion);
+    var feed = await res.json();
+    if (feed.reset) {
+      kanbanTasks = feed.tasks || [];
+    } else {
+      for (var i = 0; i < feed.changes.length; i++) {
+        var change = feed.changes[i];
+        var idx = kanbanTasks.findIndex(function(t) { return t.id === change.id; });
+        if (!change.task) { if (idx !== -1) kanbanTasks.splice(idx, 1); }
+        else if (idx === -1) kanbanTasks.push(change.task);
+        else kanbanTasks[idx] = change.task;
+      }
+    }
+    kanbanVersion = feed.version;
+    renderKanban();
+  } catch (e) {
+    await loadKanban();
+  }
+}
+
+function taskIfMatch(taskId) {
+  var task = kanbanTasks.find(function(t) { return t.id === taskId; });
+  return task && task.version ? { 'If-Match': '"' + task.version + '"' } : {};
+}
+
+// Writes carry the task version; a 409 means someone else changed it first
+async function kanbanWrite(url, options, taskId) {
+  options.headers = Object.assign({ 'Content-Type': 'application/json' }, options.headers || {}, taskIfMatch(taskId));
+  var res = await fetch(url, options);
+  if (res.status === 409) {
+    toast('Task was changed elsewhere — reloaded', 'error');
+    await syncKanban();
+    return null;
+  }
+  if (!res.ok) throw new Error('HTTP ' + res.status);
+  return res;
+}
+
 function renderKanban() {
   var board = document.getElementById('kanban-board');
   var html = '';
@@ -501,13 +545,14 @@ async function kanbanDrop(e) {
   if (!draggedTaskId || !newStatus) return;
 
   try {
-    await fetch(API + '/kanban/task/' + encodeURIComponent(draggedTaskId) + '/move', {
+    var res = await kanbanWrite(API + '/kanban/task/' + encodeURIComponent(draggedTaskId) + '/move', {
       method: 'PUT',
-      headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ status: newStatus }),
-    });
-    await loadKanban();
-    toast('Moved to ' + newStatus, 'success');
+    }, draggedTaskId);
+    if (res) {
+      await syncKanban();
+      toast('Moved to ' + newStatus, 'success');
+    }
   } catch (e) {
     toast('Move failed', 'error');
   }
@@ -585,11 +630,11 @@ document.getElementById('btn-task-save').addEventListener('click', async functio
 
   try {
     if (editingTaskId) {
-      await fetch(API + '/kanban/task/' + encodeURIComponent(editingTaskId), {
+      var res = await kanbanWrite(API + '/kanban/task/' + encodeURIComponent(editingTaskId), {
         method: 'PUT',
-        headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(taskData),
-      });
+      }, editingTaskId);
+      if (!res) return;
       toast('Task updated!', 'success');
     } else {
       taskData.id = '';
@@ -602,7 +647,7 @@ document.getElementById('btn-task-save').addEventListener('click', async functio
     }
 
     closeTaskModal();
-    await loadKanban();
+    await syncKanban();
   } catch (e) {
     toast('Error: ' + e.message, 'error');
   }
@@ -613,12 +658,13 @@ document.getElementById('btn-task-delete').addEventListener('click', async funct
   if (!confirm('Delete this task?')) return;
 
   try {
-    await fetch(API + '/kanban/task/' + encodeURIComponent(editingTaskId), {
+    var res = await kanbanWrite(API + '/kanban/task/' + encodeURIComponent(editingTaskId), {
       method: 'DELETE',
-    });
+    }, editingTaskId);
+    if (!res) return;
     toast('Task deleted', 'success');
     closeTaskModal();
-    await loadKanban();
+    await syncKanban();
   } catch (e) {
     toast('Delete failed', 'error');
   }
@@ -630,20 +676,74 @@ document.getElementById('task-modal').addEventListener('click', function(e) {
 
 function updateBreadcrumbs(path) {
   var bc = document.getElementById('breadcrumbs');
-  var html = '<span class="crumb" onclick="loadFiles(\'\')">~/.openclaw</span>';
+  var html = '<span class="crumb" data-path="">~/.openclaw</span>';
 
   if (path) {
     var parts = path.split('/');
     var cumulative = '';
     for (var i = 0; i < parts.length; i++) {
       cumulative = cumulative ? cumulative + '/' + parts[i] : parts[i];
-      html += '<span class="crumb" onclick="loadFiles(\'' + escAttr(cumulative) + '\')">' + esc(parts[i]) + '</span>';
+      html += '<span class="crumb" data-path="' + esc(cumulative) + '">' + esc(parts[i]) + '</span>';
     }
   }
 
   bc.innerHTML = html;
 }
 
+// ── File Explorer ──────────────────────────────────────────────────
+// Directory entries come from /files a page at a time into a VirtualList.
+
+var FILE_PAGE_SIZE = 200;
+var fileList = null;
+
+function loadFiles(path) {
+  currentPath = path || '';
+  updateBreadcrumbs(currentPath);
+  var dir = currentPath;
+  var fetchPage = async function(page) {
+    var res = await fetch(API + '/files?path=' + encodeURIComponent(dir)
+      + '&offset=' + (page * FILE_PAGE_SIZE) + '&limit=' + FILE_PAGE_SIZE);
+    if (!res.ok) throw new Error((await res.json()).detail || 'HTTP ' + res.status);
+    var items = await res.json();
+    var total = parseInt(res.headers.get('X-Total-Count') || String(items.length), 10);
+    document.getElementById('files-count').textContent = total + (total === 1 ? ' item' : ' items');
+    return { items: items, total: total };
+  };
+  if (!fileList) {
+    fileList = new VirtualList(document.getElementById('file-list'), {
+      pageSize: FILE_PAGE_SIZE,
+      rowHeight: 41,
+      renderItem: renderFileItem,
+      emptyHtml: '<div class="loading">Empty directory</div>',
+      onError: function(e) { toast('Error: ' + e.message, 'error'); },
+    });
+  }
+  // One provisional row so the first page gets requested
+  fileList.setSource(fetchPage, 1);
+  fileList.scrollToTop();
+}
+
+function renderFileItem(f) {
+  return '<div class="file-item" data-path="' + esc(f.path) + '"' + (f.is_dir ? ' data-dir="1"' : '') + '>'
+    + '<span class="file-icon">' + (f.is_dir ? '📁' : getFileIcon(f.name)) + '</span>'
+    + '<span class="file-name">' + esc(f.name) + '</span>'
+    + '<span class="file-meta">' + esc(formatIST(f.modified)) + '</span>'
+    + '<span class="file-meta file-size">' + (f.is_dir ? '' : formatSize(f.size || 0)) + '</span>'
+    + '</div>';
+}
+
+document.getElementById('file-list').addEventListener('click', function(e) {
+  var item = e.target.closest('.file-item[data-path]');
+  if (!item) return;
+  if (item.dataset.dir) loadFiles(item.dataset.path);
+  else openFile(item.dataset.path);
+});
+
+document.getElementById('breadcrumbs').addEventListener('click', function(e) {
+  var crumb = e.target.closest('.crumb[data-path]');
+  if (crumb) loadFiles(crumb.dataset.path);
+});
+
 // ── File Editor ────────────────────────────────────────────────────
 
 function isImageFile(path) {
@@ -875,15 +975,49 @@ document.getElementById('btn-toggle-preview').addEventListener('click', function
   }
 });
 
+// Last saved content + ETag, so later saves only send the changed lines
+var editorSaved = { path: '', content: '', etag: null };
+
+// Single line-range edit turning `before` into `after` (common prefix/suffix kept).
+// Server lines keep their newline, so the last split element is the
+// unterminated tail (or '' after a final newline) and never joins the prefix.
+function lineEdit(before, after) {
+  var a = before.split('\n'), b = after.split('\n');
+  var start = 0;
+  while (start < Math.min(a.length, b.length) - 1 && a[start] === b[start]) start++;
+  var endA = a.length, endB = b.length;
+  while (endA > start && endB > start && a[endA - 1] === b[endB - 1]) { endA--; endB--; }
+  if (endA === a.length && a[a.length - 1] === '') endA--;
+  var text = b.slice(start, endB).map(function(line, i) {
+    return start + i < b.length - 1 ? line + '\n' : line;
+  }).join('');
+  return { start: start, end: endA, text: text };
+}
+
 document.getElementById('btn-save').addEventListener('click', async function() {
   if (!currentEditPath) return;
+  var content = document.getElementById('editor').value;
+  var url = API + '/files/write?path=' + encodeURIComponent(currentEditPath);
   try {
-    var res = await fetch(API + '/files/write?path=' + encodeURIComponent(currentEditPath), {
-      method: 'PUT',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ content: document.getElementById('editor').value }),
-    });
+    var res = null;
+    if (editorSaved.path === currentEditPath && editorSaved.etag) {
+      res = await fetch(url, {
+        method: 'PATCH',
+        headers: { 'Content-Type': 'application/json', 'If-Match': editorSaved.etag },
+        body: JSON.stringify({ unit: 'line', edits: [lineEdit(editorSaved.content, content)] }),
+      });
+      // Changed on disk (or patch rejected): fall back to a full write
+      if (!res.ok) res = null;
+    }
+    if (!res) {
+      res = await fetch(url, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'text/plain; charset=utf-8' },
+        body: content,
+      });
+    }
     if (!res.ok) { toast((await res.json()).detail || 'Save failed', 'error'); return; }
+    editorSaved = { path: currentEditPath, content: content, etag: res.headers.get('ETag') };
     toast('Saved!', 'success');
   } catch (e) { toast('Error: ' + e.message, 'error'); }
 });
@@ -912,17 +1046,20 @@ async function loadAgents() {
 
   try {
     var res = await fetch(API + '/agents');
-    var agents = await res.json();
-    var html = '';
-    for (var i = 0; i < agents.length; i++) {
-      html += renderAgentCard(agents[i], false, AGENT_ROLES);
-    }
-    list.innerHTML = html || '<div class="loading">No agents configured</div>';
+    renderAgentList(await res.json());
   } catch (e) {
     list.innerHTML = '<div class="loading">Error: ' + esc(e.message) + '</div>';
   }
 }
 
+function renderAgentList(agents) {
+  var html = '';
+  for (var i = 0; i < agents.length; i++) {
+    html += renderAgentCard(agents[i], false, AGENT_ROLES);
+  }
+  document.getElementById('agent-list').innerHTML = html || '<div class="loading">No agents configured</div>';
+}
+
 function renderAgentCard(agent, compact, agentRoles) {
   var emoji = getAgentEmoji(agent.id, agent.name);
   var modelStr = typeof agent.model === 'object' ? JSON.stringify(agent.model) : String(agent.model || '');
@@ -960,6 +1097,11 @@ function renderAgentCard(agent, compact, agentRoles) {
     html += '<div class="meta-item"><span class="meta-label">Role</span><span class="meta-value" style="font-size:12px;opacity:0.7;">' + esc(role) + '</span></div>';
     html += '<div class="meta-item"><span class="meta-label">Messages</span><span class="meta-value">' + (agent.messageCount || 0) + '</span></div>';
     if (lastActive) html += '<div class="meta-item"><span class="meta-label">Last Active</span><span class="meta-value">' + esc(lastActive) + '</span></div>';
+    if (agent.activity) {
+      var act = agent.activity;
+      html += '<div class="meta-item"><span class="meta-label">Activity</span><span class="meta-value" title="Decayed rates from transcript growth">'
+        + act.linesPerMin.toFixed(1) + ' lines · ' + Math.round(act.tokensPerMin) + ' tok · ' + act.toolCallsPerMin.toFixed(1) + ' tools /min</span></div>';
+    }
     html += '</div>';
     if (agent.sessionKey) {
       html += '<div style="font-size:10px;color:var(--text-muted);margin-top:6px;font-family:monospace;opacity:0.6;">' + esc(agent.sessionKey) + '</div>';
@@ -991,35 +1133,54 @@ function formatTimeAgo(timestampMs) {
   else return Math.floor(mins / 1440) + 'd ago';
 }
 
-async function loadSubagents() {
-  var list = document.getElementById('subagent-list');
-  list.innerHTML = '<div class="loading">Loading subagents...</div>';
-
-  try {
-    var res = await fetch(API + '/sessions');
-    var sessions = await res.json();
-    
-    // Filter to subagents that are active (updated in last 30 minutes)
-    var now = Date.now();
-    var activeThreshold = 30 * 60 * 1000; // 30 minutes
-    var subagents = sessions.filter(function(s) {
-      if (!s.isSubagent) return false;
-      var updatedAt = s.updatedAt || 0;
-      return (now - updatedAt) < activeThreshold;
+// Subagent cards live in a VirtualList grid; pages come from /sessions
+// (filtered server-side) and live pushes replace them with the pushed list.
+var SESSION_PAGE_SIZE = 100;
+var subagentList = null;
+
+function getSubagentList() {
+  if (!subagentList) {
+    subagentList = new VirtualList(document.getElementById('subagent-list'), {
+      pageSize: SESSION_PAGE_SIZE,
+      rowHeight: 200,
+      overscan: 1,
+      columns: function(width) { return Math.max(1, Math.floor((width + 14) / (280 + 14))); },
+      renderItem: renderSubagentCard,
+      emptyHtml: '<div class="loading" style="text-align:center;padding:40px;">No active subagents</div>',
+      onError: function(e) { toast('Error: ' + e.message, 'error'); },
     });
-    
-    var html = '';
-    if (subagents.length > 0) {
-      for (var i = 0; i < subagents.length; i++) {
-        html += renderSubagentCard(subagents[i]);
-      }
-    } else {
-      html = '<div class="loading" style="text-align:center;padding:40px;">No active subagents</div>';
-    }
-    list.innerHTML = html;
-  } catch (e) {
-    list.innerHTML = '<div class="loading">Error: ' + esc(e.message) + '</div>';
   }
+  return subagentList;
+}
+
+function loadSubagents() {
+  // Only active subagents, newest first — filtered server-side
+  var fetchPage = cursorPages(async function(cursor) {
+    var url = API + '/sessions?subagent=true&activeWithin=1800&sort=updatedAt&limit=' + SESSION_PAGE_SIZE;
+    if (cursor) url += '&cursor=' + encodeURIComponent(cursor);
+    var res = await fetch(url);
+    if (!res.ok) throw new Error('HTTP ' + res.status);
+    return {
+      items: await res.json(),
+      next: res.headers.get('X-Next-Cursor'),
+      total: parseInt(res.headers.get('X-Total-Count') || '0', 10),
+    };
+  }, SESSION_PAGE_SIZE);
+  // One provisional card so the first page gets requested
+  getSubagentList().setSource(fetchPage, 1);
+}
+
+function renderSubagentList(sessions) {
+  // Filter to subagents that are active (updated in last 30 minutes)
+  var now = Date.now();
+  var activeThreshold = 30 * 60 * 1000; // 30 minutes
+  var subagents = sessions.filter(function(s) {
+    if (!s.isSubagent) return false;
+    var updatedAt = s.updatedAt || 0;
+    return (now - updatedAt) < activeThreshold;
+  });
+  subagents.sort(function(a, b) { return (b.updatedAt || 0) - (a.updatedAt || 0); });
+  getSubagentList().setSource(arrayPages(subagents, SESSION_PAGE_SIZE), subagents.length);
 }
 
 function renderSubagentCard(session) {
@@ -1051,7 +1212,7 @@ function renderSubagentCard(session) {
     ? '<span style="display:inline-block;width:8px;height:8px;border-radius:50%;background:#10b981;margin-right:6px;animation:pulse 1s infinite;"></span>Thinking'
     : '<span style="display:inline-block;width:8px;height:8px;border-radius:50%;background:#3b82f6;margin-right:6px;"></span>Subagent';
 
-  var html = '<div class="agent-card clickable" style="opacity:0.9;">'
+  var html = '<div class="agent-card clickable" style="opacity:0.9;" data-session-id="' + esc(sessionId) + '">'
     + '<div class="agent-card-header">'
     + '<div class="agent-avatar-large">🤖</div>'
     + '<div class="agent-info">'
@@ -1078,21 +1239,349 @@ function renderSubagentCard(session) {
 document.getElementById('btn-refresh-agents').addEventListener('click', loadAgents);
 document.getElementById('btn-refresh-subagents').addEventListener('click', loadSubagents);
 
+// ── Virtual List ───────────────────────────────────────────────────
+// A scrolling list that keeps only the rows in (and just around) the
+// viewport in the DOM. Items arrive a page at a time from fetchPage(page),
+// which returns {items, total} or a promise of it. Loaded pages are cached
+// (at most maxPages) and fetched again if they scroll back into view after
+// eviction. Rows may differ in height: every rendered row is measured and
+// row offsets live in a Fenwick tree, so an offset <-> row lookup is
+// O(log n) even with 100k+ rows. A columns(width) option puts several items
+// in each row (card grids).
+
+var VLIST_MAX_ROWS = 300;
+
+function VirtualList(container, opts) {
+  var self = this;
+  this.container = container;
+  this.pageSize = opts.pageSize || 100;
+  this.rowHeight = opts.rowHeight || 40;
+  this.overscan = opts.overscan != null ? opts.overscan : 4;
+  this.maxPages = opts.maxPages || 30;
+  this.columns = opts.columns || null;
+  this.renderItem = opts.renderItem;
+  this.placeholderHtml = opts.placeholderHtml || '<div class="vlist-placeholder"></div>';
+  this.emptyHtml = opts.emptyHtml || '<div class="loading">Nothing to show</div>';
+  this.onRange = opts.onRange || null;
+  this.onError = opts.onError || null;
+  this.cols = 1;
+  this.rows = 0;
+  this.total = 0;
+  this.heights = new Float64Array(0);
+  this.tree = new Float64Array(1);
+  this.generation = 0;
+  this.frame = null;
+  this.rendered = null;
+  this.pinEnd = false;
+  container.classList.add('vlist');
+  container.innerHTML = '<div class="vlist-spacer"><div class="vlist-window"></div></div>';
+  this.spacer = container.firstChild;
+  this.win = this.spacer.firstChild;
+  this.schedule = function() {
+    if (!self.frame) self.frame = requestAnimationFrame(function() { self.frame = null; self.render(); });
+  };
+  container.addEventListener('scroll', this.schedule, { passive: true });
+  window.addEventListener('resize', this.schedule);
+  this.setSource(opts.fetchPage, opts.total || 0);
+}
+
+// Replace the data source (keeps row heights and the scroll position)
+VirtualList.prototype.setSource = function(fetchPage, total) {
+  this.fetchPage = fetchPage;
+  this.total = total;
+  this.invalidate();
+};
+
+VirtualList.prototype.setTotal = function(total) {
+  if (total === this.total) return;
+  this.total = total;
+  this.rendered = null;
+  this.schedule();
+};
+
+// Drop cached pages from the one holding ``fromIndex`` on (all by default)
+VirtualList.prototype.invalidate = function(fromIndex) {
+  var fromPage = fromIndex ? Math.floor(fromIndex / this.pageSize) : 0;
+  if (!fromPage) this.pages = new Map();
+  else this.pages.forEach(function(_, page, pages) { if (page >= fromPage) pages.delete(page); });
+  this.generation++;  // results of requests still in flight are ignored
+  this.pending = {};
+  this.failed = {};
+  this.rendered = null;
+  this.schedule();
+};
+
+VirtualList.prototype.refresh = function() { this.invalidate(); };
+VirtualList.prototype.rerender = function() { this.rendered = null; this.schedule(); };
+
+VirtualList.prototype.scrollToTop = function() { this.pinEnd = false; this.container.scrollTop = 0; this.schedule(); };
+VirtualList.prototype.scrollToEnd = function() { this.pinEnd = true; this.schedule(); };
+VirtualList.prototype.scrollByPage = function(dir) {
+  this.container.scrollTop += dir * Math.max(1, this.container.clientHeight - this.rowHeight);
+};
+VirtualList.prototype.atEnd = function() {
+  var c = this.container;
+  return c.scrollTop + c.clientHeight >= c.scrollHeight - 4;
+};
+
+// First loaded item matching ``fn``
+VirtualList.prototype.find = function(fn) {
+  var found = null;
+  this.pages.forEach(function(items) {
+    if (!found) for (var i = 0; i < items.length && !found; i++) if (fn(items[i])) found = items[i];
+  });
+  return found;
+};
+
+VirtualList.prototype.destroy = function() {
+  if (this.frame) cancelAnimationFrame(this.frame);
+  this.container.removeEventListener('scroll', this.schedule);
+  window.removeEventListener('resize', this.schedule);
+  this.generation++;
+  this.container.classList.remove('vlist');
+  this.container.innerHTML = '';
+};
+
+// Item at ``index``: undefined while its page loads, null if the page came back short
+VirtualList.prototype.itemAt = function(index) {
+  var page = Math.floor(index / this.pageSize);
+  var items = this.pages.get(page);
+  if (!items) { this._load(page); return this.pages.has(page) ? this.itemAt(index) : undefined; }
+  this.pages.delete(page);  // keep the Map in least-recently-used order
+  this.pages.set(page, items);
+  var item = items[index - page * this.pageSize];
+  return item === undefined ? null : item;
+};
+
+VirtualList.prototype._load = function(page) {
+  if (this.pending[page] || this.failed[page]) return;
+  var self = this, generation = this.generation, result;
+  try { result = this.fetchPage(page); } catch (e) { this._fail(page, e); return; }
+  if (!result || typeof result.then !== 'function') { this._store(page, result); return; }
+  this.pending[page] = true;
+  result.then(function(r) {
+    if (generation !== self.generation) return;
+    delete self.pending[page];
+    self._store(page, r);
+  }, function(e) {
+    if (generation !== self.generation) return;
+    delete self.pending[page];
+    self._fail(page, e);
+  });
+};
+
+VirtualList.prototype._store = function(page, result) {
+  this.pages.set(page, result.items || []);
+  while (this.pages.size > this.maxPages) this.pages.delete(this.pages.keys().next().value);
+  if (result.total != null) this.setTotal(result.total);
+  this.rendered = null;
+  this.schedule();
+};
+
+VirtualList.prototype._fail = function(page, e) {
+  this.failed[page] = true;  // not retried until the next invalidate()
+  if (this.onError) this.onError(e);
+};
+
+VirtualList.prototype._layout = function() {
+  var cols = this.columns ? Math.max(1, this.columns(this.container.clientWidth)) : 1;
+  var rows = Math.ceil(this.total / cols);
+  if (rows === this.rows && cols === this.cols) return;
+  var old = cols === this.cols ? this.heights : new Float64Array(0);
+  var heights = new Float64Array(rows);
+  heights.fill(this.rowHeight);
+  heights.set(old.subarray(0, Math.min(rows, old.length)));
+  var tree = new Float64Array(rows + 1);
+  for (var i = 1; i <= rows; i++) {
+    tree[i] += heights[i - 1];
+    var j = i + (i & -i);
+    if (j <= rows) tree[j] += tree[i];
+  }
+  this.cols = cols;
+  this.rows = rows;
+  this.heights = heights;
+  this.tree = tree;
+  this.rendered = null;
+};
+
+// Total height of the rows before ``row``
+VirtualList.prototype._offset = function(row) {
+  var sum = 0;
+  for (var i = row; i > 0; i -= i & -i) sum += this.tree[i];
+  return sum;
+};
+
+// Row containing vertical position ``y``
+VirtualList.prototype._rowAt = function(y) {
+  var pos = 0, step = 1;
+  while (step * 2 <= this.rows) step *= 2;
+  for (; step; step >>= 1) {
+    if (pos + step <= this.rows && this.tree[pos + step] <= y) { pos += step; y -= this.tree[pos]; }
+  }
+  return Math.min(pos, Math.max(0, this.rows - 1));
+};
+
+VirtualList.prototype._setHeight = function(row, height) {
+  var delta = height - this.heights[row];
+  this.heights[row] = height;
+  for (var i = row + 1; i <= this.rows; i += i & -i) this.tree[i] += delta;
+};
+
+VirtualList.prototype.render = function() {
+  this._layout();
+  var c = this.container;
+  if (!this.total) {
+    this.spacer.style.height = '';
+    this.win.style.transform = '';
+    if (this.rendered !== this.emptyHtml) this.win.innerHTML = this.rendered = this.emptyHtml;
+    if (this.onRange) this.onRange(0, 0, 0);
+    return;
+  }
+  if (this.pinEnd) c.scrollTop = this._offset(this.rows);
+  var top = c.scrollTop;
+  var bottom = top + (c.clientHeight || 600);
+  var first = Math.max(0, this._rowAt(top) - this.overscan);
+  var last = first, y = this._offset(first);
+  while (last < this.rows && y <= bottom && last - first < VLIST_MAX_ROWS) y += this.heights[last++];
+  last = Math.min(this.rows, last + this.overscan);
+
+  var html = '';
+  for (var row = first; row < last; row++) {
+    html += '<div class="vlist-row">';
+    for (var k = 0; k < this.cols; k++) {
+      var index = row * this.cols + k;
+      if (index >= this.total) break;
+      var item = this.itemAt(index);
+      if (item === undefined) html += this.placeholderHtml;
+      else if (item !== null) html += this.renderItem(item, index);
+    }
+    html += '</div>';
+  }
+  // Unchanged rows keep their DOM (and any text selection) while scrolling
+  if (html !== this.rendered) {
+    this.win.innerHTML = this.rendered = html;
+    this.win.style.setProperty('--vlist-cols', this.cols);
+  }
+  this.win.style.transform = 'translateY(' + this._offset(first) + 'px)';
+
+  // Measure rendered rows (only while visible: hidden rows measure 0)
+  var changed = false, shift = 0, firstVisible = this._rowAt(top);
+  var loading = Object.keys(this.pending).length > 0;
+  if (c.clientHeight) {
+    var children = this.win.children;
+    for (var i = 0; i < children.length; i++) {
+      var h = children[i].offsetHeight;
+      if (h === this.heights[first + i]) continue;
+      if (first + i < firstVisible) shift += h - this.heights[first + i];
+      this._setHeight(first + i, h);
+      changed = true;
+    }
+  }
+  this.spacer.style.height = this._offset(this.rows) + 'px';
+  if (shift && !this.pinEnd) c.scrollTop = top + shift;  // keep the visible rows in place
+  if (changed) this.schedule();
+  else if (!loading) this.pinEnd = false;  // stay pinned until the last rows have arrived
+
+  if (this.onRange) {
+    var lastVisible = this._rowAt(Math.max(top, bottom - 1));
+    this.onRange(firstVisible * this.cols, Math.min(this.total, (lastVisible + 1) * this.cols), this.total);
+  }
+};
+
+// fetchPage for an in-memory array
+function arrayPages(items, pageSize) {
+  return function(page) {
+    return { items: items.slice(page * pageSize, (page + 1) * pageSize), total: items.length };
+  };
+}
+
+// fetchPage for a keyset-paginated endpoint. loadAfter(cursor) resolves to
+// {items, next, total}; page N needs page N-1's cursor, so jumping ahead
+// fetches the pages in between first. Without a total, the list grows by a
+// page while there is a next cursor.
+function cursorPages(loadAfter, pageSize) {
+  var cursors = [''];  // page -> cursor it starts at (null: past the end)
+  var known = 0;
+  function fetchPage(page) {
+    var cursor = cursors[page] !== undefined ? Promise.resolve(cursors[page])
+      : fetchPage(page - 1).then(function() { return cursors[page]; });
+    return cursor.then(function(after) {
+      if (after === null) return { items: [], total: null };
+      return loadAfter(after).then(function(r) {
+        cursors[page + 1] = r.next || null;
+        if (r.total != null) known = r.total;
+        else if (!r.next) known = page * pageSize + r.items.length;
+        else known = Math.max(known, (page + 2) * pageSize);
+        return { items: r.items, total: known };
+      });
+    });
+  }
+  return fetchPage;
+}
+
+// Render-time benchmark: run benchmarkVirtualList(100000) in the devtools
+// console. Renders synthetic JSONL rows off-screen and reports the initial
+// render, per-scroll render times and how many DOM nodes the list holds.
+function benchmarkVirtualList(rows) {
+  rows = rows || 100000;
+  var items = new Array(rows);
+  for (var i = 0; i < rows; i++) {
+    items[i] = { index: i, data: { role: i % 3 ? 'assistant' : 'user', content: 'Synthetic line ' + i }, raw: '' };
+  }
+  var host = document.createElement('div');
+  host.className = 'jsonl-lines';
+  host.style.cssText = 'position:fixed;left:-10000px;top:0;width:900px;height:700px;';
+  document.body.appendChild(host);
+  var t0 = performance.now();
+  var list = new VirtualList(host, {
+    pageSize: 1000, rowHeight: 40, total: rows, maxPages: rows,
+    fetchPage: arrayPages(items, 1000), renderItem: renderJsonlLine,
+  });
+  list.render();
+  var initialMs = performance.now() - t0;
+  var times = [];
+  for (var step = 1; step <= 50; step++) {
+    host.scrollTop = host.scrollHeight * step / 50;
+    var t = performance.now();
+    list.render();
+    times.push(performance.now() - t);
+  }
+  var result = {
+    rows: rows,
+    initialRenderMs: +initialMs.toFixed(2),
+    scrollRenderAvgMs: +(times.reduce(function(a, b) { return a + b; }, 0) / times.length).toFixed(2),
+    scrollRenderMaxMs: +Math.max.apply(null, times).toFixed(2),
+    domNodes: host.getElementsByTagName('*').length,
+  };
+  list.destroy();
+  host.remove();
+  console.table([result]);
+  return result;
+}
+window.benchmarkVirtualList = benchmarkVirtualList;
+
 // ── JSONL Viewer ───────────────────────────────────────────────────
+// Lines live in a VirtualList that fetches /files/jsonl pages as they scroll
+// into view, opening at the end of the file. Enter in the filter box swaps
+// in server search results (/files/jsonl/query, cursor-paged).
 
 var jsonlPath = '';
-var jsonlOffset = 0;
-var JSONL_PAGE_SIZE = 20;
-var jsonlData = [];
+var JSONL_PAGE_SIZE = 100;
 var jsonlTotal = 0;
+var jsonlList = null;
+var jsonlOpen = {};  // line index -> expanded
+var jsonlFilter = { search: '', role: '' };
 var jsonlPollTimer = null;
 var jsonlLastTotal = 0;
-var jsonlAutoScroll = true;
+// Server-side search: {q} or null
+var jsonlQuery = null;
 
 async function openJsonl(path) {
   jsonlPath = path;
-  jsonlLastTotal = 0;
-  jsonlAutoScroll = true;
+  jsonlQuery = null;
+  turnsView = null;
+  jsonlOpen = {};
+  jsonlFilter = { search: '', role: '' };
   document.getElementById('jsonl-title').textContent = path.split('/').pop();
   document.getElementById('jsonl-search').value = '';
   document.getElementById('jsonl-role-filter').value = '';
@@ -1100,58 +1589,115 @@ async function openJsonl(path) {
   document.querySelectorAll('.view').forEach(function(v) { v.classList.remove('active'); });
   document.getElementById('view-jsonl').classList.add('active');
 
+  jsonlTotal = 0;
   try {
-    var res = await fetch(API + '/files/jsonl?path=' + encodeURIComponent(path) + '&offset=0&limit=1');
-    var data = await res.json();
-    jsonlTotal = data.total;
-    jsonlOffset = Math.max(0, jsonlTotal - JSONL_PAGE_SIZE);
-  } catch (e) { jsonlOffset = 0; }
+    var res = await fetch(API + '/files/jsonl?path=' + encodeURIComponent(path) + '&offset=0&limit=0');
+    if (!res.ok) { toast((await res.json()).detail || 'Cannot open', 'error'); }
+    else jsonlTotal = (await res.json()).total;
+  } catch (e) { toast('Error: ' + e.message, 'error'); }
+  jsonlLastTotal = jsonlTotal;
 
-  await loadJsonlPage();
+  showJsonlList(jsonlFilePage, jsonlTotal);
+  jsonlList.scrollToEnd();
   startJsonlPolling();
 }
 
-async function loadJsonlPage() {
-  var container = document.getElementById('jsonl-lines');
-  if (!jsonlData.length) container.innerHTML = '<div class="loading">Loading...</div>';
+function jsonlFilePage(page) {
+  var url = API + '/files/jsonl?path=' + encodeURIComponent(jsonlPath)
+    + '&offset=' + (page * JSONL_PAGE_SIZE) + '&limit=' + JSONL_PAGE_SIZE;
+  return fetch(url).then(function(res) {
+    if (!res.ok) throw new Error('HTTP ' + res.status);
+    return res.json();
+  }).then(function(data) {
+    return { items: data.lines, total: data.total };
+  });
+}
+
+function jsonlSearchPages(q) {
+  return cursorPages(async function(cursor) {
+    var url = API + '/files/jsonl/query?path=' + encodeURIComponent(jsonlPath)
+      + '&q=' + encodeURIComponent(q) + '&limit=' + JSONL_PAGE_SIZE;
+    if (cursor) url += '&cursor=' + encodeURIComponent(cursor);
+    var res = await fetch(url);
+    if (!res.ok) throw new Error((await res.json()).detail || 'Search failed');
+    var data = await res.json();
+    return { items: data.lines, next: data.nextCursor };
+  }, JSONL_PAGE_SIZE);
+}
+
+function showJsonlList(fetchPage, total) {
+  if (jsonlList) { jsonlList.setSource(fetchPage, total); return; }
+  jsonlList = new VirtualList(document.getElementById('jsonl-lines'), {
+    pageSize: JSONL_PAGE_SIZE,
+    rowHeight: 40,
+    total: total,
+    fetchPage: fetchPage,
+    renderItem: renderJsonlLine,
+    placeholderHtml: '<div class="jsonl-line vlist-placeholder"></div>',
+    emptyHtml: '<div class="loading">No matching lines</div>',
+    onRange: updateJsonlPagination,
+    onError: function(e) { toast('Error: ' + e.message, 'error'); },
+  });
+}
+
+function closeJsonlList() {
+  if (jsonlList) { jsonlList.destroy(); jsonlList = null; }
+}
+
+var jsonlEvents = null;
 
+async function refreshJsonl() {
+  if (!document.getElementById('view-jsonl').classList.contains('active')) { stopJsonlPolling(); return; }
+  if (jsonlQuery || !jsonlList) return;
   try {
-    var res = await fetch(API + '/files/jsonl?path=' + encodeURIComponent(jsonlPath) + '&offset=' + jsonlOffset + '&limit=' + JSONL_PAGE_SIZE);
+    var res = await fetch(API + '/files/jsonl?path=' + encodeURIComponent(jsonlPath) + '&offset=0&limit=0');
     var data = await res.json();
-    jsonlData = data.lines;
-    jsonlTotal = data.total;
-    updateJsonlPagination();
-    renderJsonlLines();
-  } catch (e) { container.innerHTML = '<div class="loading">Error: ' + esc(e.message) + '</div>'; }
+    if (data.total === jsonlLastTotal) return;
+    var follow = jsonlList.atEnd();
+    // Appended lines only change the last page; a shrunk file is reloaded
+    jsonlList.invalidate(data.total > jsonlLastTotal ? jsonlLastTotal : 0);
+    jsonlList.setTotal(data.total);
+    jsonlTotal = jsonlLastTotal = data.total;
+    if (follow) jsonlList.scrollToEnd();
+  } catch (e) {}
 }
 
 function startJsonlPolling() {
   stopJsonlPolling();
   jsonlLastTotal = jsonlTotal;
-  jsonlPollTimer = setInterval(async function() {
-    if (!document.getElementById('view-jsonl').classList.contains('active')) { stopJsonlPolling(); return; }
-    try {
-      var res = await fetch(API + '/files/jsonl?path=' + encodeURIComponent(jsonlPath) + '&offset=' + jsonlOffset + '&limit=' + JSONL_PAGE_SIZE);
-      var data = await res.json();
-      if (data.total !== jsonlLastTotal || data.lines.length !== jsonlData.length) {
-        jsonlData = data.lines; jsonlTotal = data.total; jsonlLastTotal = jsonlTotal;
-        updateJsonlPagination(); renderJsonlLines();
-        if (jsonlAutoScroll && jsonlOffset + JSONL_PAGE_SIZE >= jsonlTotal) {
-          document.getElementById('jsonl-lines').scrollTop = 999999;
-        }
-      }
-    } catch (e) {}
-  }, 2000);
+  // Prefer server file-change events; fall back to polling if unavailable
+  if (window.EventSource) {
+    jsonlEvents = new EventSource(API + '/fs/events?path=' + encodeURIComponent(jsonlPath));
+    jsonlEvents.onmessage = refreshJsonl;
+    jsonlEvents.onerror = function() {
+      if (jsonlEvents) { jsonlEvents.close(); jsonlEvents = null; }
+      if (!jsonlPollTimer) jsonlPollTimer = setInterval(refreshJsonl, 2000);
+    };
+    return;
+  }
+  jsonlPollTimer = setInterval(refreshJsonl, 2000);
 }
 
-function stopJsonlPolling() { if (jsonlPollTimer) { clearInterval(jsonlPollTimer); jsonlPollTimer = null; } }
+function stopJsonlPolling() {
+  if (jsonlEvents) { jsonlEvents.close(); jsonlEvents = null; }
+  if (jsonlPollTimer) { clearInterval(jsonlPollTimer); jsonlPollTimer = null; }
+}
 
-function updateJsonlPagination() {
-  var end = Math.min(jsonlOffset + JSONL_PAGE_SIZE, jsonlTotal);
-  var start = jsonlTotal > 0 ? jsonlOffset + 1 : 0;
-  document.getElementById('jsonl-pagination').textContent = start + '–' + end + ' of ' + jsonlTotal;
-  document.getElementById('btn-jsonl-prev').disabled = jsonlOffset === 0;
-  document.getElementById('btn-jsonl-next').disabled = jsonlOffset + JSONL_PAGE_SIZE >= jsonlTotal;
+// Search the whole file on the server (Enter in the filter box)
+function searchJsonl(q) {
+  jsonlQuery = { q: q };
+  jsonlOpen = {};
+  // One provisional row so the first page gets requested
+  showJsonlList(jsonlSearchPages(q), 1);
+  jsonlList.scrollToTop();
+}
+
+function updateJsonlPagination(start, end, total) {
+  var range = total ? (start + 1) + '–' + end : '0';
+  document.getElementById('jsonl-pagination').textContent = jsonlQuery
+    ? 'Matches · ' + range : range + ' of ' + total;
+  document.getElementById('btn-jsonl-prev').disabled = start === 0;
+  document.getElementById('btn-jsonl-next').disabled = end >= total;
 }
 
 function getPreview(d, raw) {
@@ -1197,51 +1743,60 @@ function getRoleClass(role) {
   return 'role-unknown';
 }
 
-function renderJsonlLines() {
-  var container = document.getElementById('jsonl-lines');
-  var search = document.getElementById('jsonl-search').value.toLowerCase();
-  var roleFilter = document.getElementById('jsonl-role-filter').value;
+function renderJsonlLine(line) {
+  var d = line.data || {};
+  var role = getRole(d);
+  // The filter box and role filter apply to loaded lines; lines they hide
+  // render empty (zero height). Server search results already match.
+  if (jsonlFilter.role && role.toLowerCase() !== jsonlFilter.role) return '';
+  if (jsonlFilter.search && !jsonlQuery && JSON.stringify(d).toLowerCase().indexOf(jsonlFilter.search) === -1) return '';
 
-  var filtered = [];
-  for (var i = 0; i < jsonlData.length; i++) {
-    var line = jsonlData[i];
-    var d = line.data || {};
-    if (roleFilter && getRole(d).toLowerCase() !== roleFilter) continue;
-    if (search && JSON.stringify(d).toLowerCase().indexOf(search) === -1) continue;
-    filtered.push(line);
+  // Only expanded lines pay for pretty-printing and highlighting
+  var body = '';
+  if (jsonlOpen[line.index]) {
+    body = '<div class="jsonl-line-body open"><pre>'
+      + syntaxHighlight(JSON.stringify(line.data || line.raw || '', null, 2)) + '</pre></div>';
   }
+  return '<div class="jsonl-line" data-index="' + line.index + '">'
+    + '<div class="jsonl-line-header">'
+    + '<span class="jsonl-line-index">#' + line.index + '</span>'
+    + '<span class="jsonl-line-role ' + getRoleClass(role) + '">' + esc(role) + '</span>'
+    + '<span class="jsonl-line-preview">' + esc(getPreview(d, line.raw)) + '</span>'
+    + '<div class="jsonl-line-actions">'
+    + '<button data-action="edit" title="Edit">✏️</button>'
+    + '<button data-action="copy" title="Copy">📋</button>'
+    + '</div></div>'
+    + body + '</div>';
+}
 
-  if (!filtered.length) { container.innerHTML = '<div class="loading">No matching lines</div>'; return; }
-
-  var html = '';
-  for (var i = 0; i < filtered.length; i++) {
-    var line = filtered[i];
-    var d = line.data || {};
-    var role = getRole(d);
-    var roleClass = getRoleClass(role);
-    var preview = getPreview(d, line.raw);
-    var jsonStr = JSON.stringify(line.data || line.raw || '', null, 2);
-    var highlighted = syntaxHighlight(jsonStr);
-
-    html += '<div class="jsonl-line" data-index="' + line.index + '">'
-      + '<div class="jsonl-line-header" onclick="toggleJsonlLine(this)">'
-      + '<span class="jsonl-line-index">#' + line.index + '</span>'
-      + '<span class="jsonl-line-role ' + roleClass + '">' + esc(role) + '</span>'
-      + '<span class="jsonl-line-preview">' + esc(preview) + '</span>'
-      + '<div class="jsonl-line-actions">'
-      + '<button onclick="event.stopPropagation(); editJsonlLine(' + line.index + ')" title="Edit">✏️</button>'
-      + '<button onclick="event.stopPropagation(); copyJsonlLine(' + line.index + ')" title="Copy">📋</button>'
-      + '</div></div>'
-      + '<div class="jsonl-line-body"><pre>' + highlighted + '</pre></div></div>';
-  }
+function renderJsonlLines() {
+  if (turnsView) { renderSessionTurns(); return; }
+  if (jsonlList) jsonlList.rerender();
+}
 
-  container.innerHTML = html;
+function findJsonlLine(index) {
+  return jsonlList ? jsonlList.find(function(l) { return l.index === index; }) : null;
 }
 
-function toggleJsonlLine(header) { header.nextElementSibling.classList.toggle('open'); }
+// Header clicks expand a line; its buttons edit or copy it
+document.getElementById('jsonl-lines').addEventListener('click', function(e) {
+  var header = e.target.closest('.jsonl-line-header');
+  if (!header) return;
+  var lineEl = header.parentElement;
+  var index = parseInt(lineEl.dataset.index);
+  var action = e.target.closest('[data-action]');
+  if (action) {
+    if (action.dataset.action === 'edit') editJsonlLine(index);
+    else copyJsonlLine(index);
+    return;
+  }
+  if (turnsView) { header.nextElementSibling.classList.toggle('open'); return; }
+  jsonlOpen[index] = !jsonlOpen[index];
+  renderJsonlLines();
+});
 
 function editJsonlLine(index) {
-  var line = jsonlData.find(function(l) { return l.index === index; });
+  var line = findJsonlLine(index);
   if (!line) return;
   document.getElementById('jsonl-edit-title').textContent = 'Edit Line #' + index;
   document.getElementById('jsonl-edit-area').value = JSON.stringify(line.data || line.raw, null, 2);
@@ -1250,7 +1805,7 @@ function editJsonlLine(index) {
 }
 
 function copyJsonlLine(index) {
-  var line = jsonlData.find(function(l) { return l.index === index; });
+  var line = findJsonlLine(index);
   if (!line) return;
   navigator.clipboard.writeText(JSON.stringify(line.data || line.raw, null, 2));
   toast('Copied!', 'success');
@@ -1280,31 +1835,33 @@ document.getElementById('btn-jsonl-edit-save').addEventListener('click', async f
     if (!res.ok) { toast((await res.json()).detail || 'Save failed', 'error'); return; }
     toast('Saved!', 'success');
     modal.classList.add('hidden');
-    await loadJsonlPage();
+    if (jsonlList) jsonlList.refresh();
   } catch (e) { toast('Error: ' + e.message, 'error'); }
 });
 
 document.getElementById('btn-jsonl-prev').addEventListener('click', function() {
-  jsonlAutoScroll = false;
-  jsonlOffset = Math.max(0, jsonlOffset - JSONL_PAGE_SIZE);
-  loadJsonlPage();
+  if (turnsView) { loadSessionTurns(); return; }
+  if (jsonlList) jsonlList.scrollByPage(-1);
 });
 
 document.getElementById('btn-jsonl-next').addEventListener('click', function() {
-  if (jsonlOffset + JSONL_PAGE_SIZE < jsonlTotal) {
-    jsonlOffset += JSONL_PAGE_SIZE;
-    jsonlAutoScroll = (jsonlOffset + JSONL_PAGE_SIZE >= jsonlTotal);
-    loadJsonlPage();
-  }
+  if (turnsView) return;
+  if (jsonlList) jsonlList.scrollByPage(1);
 });
 
 document.getElementById('btn-jsonl-last').addEventListener('click', function() {
-  jsonlOffset = jsonlTotal > JSONL_PAGE_SIZE ? Math.floor((jsonlTotal - 1) / JSONL_PAGE_SIZE) * JSONL_PAGE_SIZE : 0;
-  jsonlAutoScroll = true;
-  loadJsonlPage();
+  if (turnsView || !jsonlList) return;
+  if (jsonlQuery) {
+    jsonlQuery = null;
+    document.getElementById('jsonl-search').value = '';
+    jsonlFilter.search = '';
+    showJsonlList(jsonlFilePage, jsonlTotal);
+  }
+  jsonlList.scrollToEnd();
 });
 
 document.getElementById('btn-jsonl-raw').addEventListener('click', function() {
+  if (turnsView) return;
   stopJsonlPolling();
   currentEditPath = jsonlPath;
   fetch(API + '/files/read?path=' + encodeURIComponent(jsonlPath))
@@ -1320,12 +1877,92 @@ document.getElementById('btn-jsonl-raw').addEventListener('click', function() {
 
 document.getElementById('btn-close-jsonl').addEventListener('click', function() {
   stopJsonlPolling();
+  closeJsonlList();
   showView('files');
   document.querySelectorAll('.nav-btn').forEach(function(b) { b.classList.toggle('active', b.dataset.view === 'files'); });
 });
 
-document.getElementById('jsonl-search').addEventListener('input', renderJsonlLines);
-document.getElementById('jsonl-role-filter').addEventListener('change', renderJsonlLines);
+document.getElementById('jsonl-search').addEventListener('input', function() {
+  jsonlFilter.search = this.value.toLowerCase();
+  if (jsonlQuery && !this.value) {
+    jsonlQuery = null;
+    showJsonlList(jsonlFilePage, jsonlTotal);
+    jsonlList.scrollToEnd();
+    return;
+  }
+  renderJsonlLines();
+});
+document.getElementById('jsonl-search').addEventListener('keydown', function(e) {
+  if (e.key !== 'Enter' || !this.value || turnsView) return;
+  searchJsonl(this.value);
+});
+document.getElementById('jsonl-role-filter').addEventListener('change', function() {
+  jsonlFilter.role = this.value;
+  renderJsonlLines();
+});
+
+// ── Session Transcript ───────────────────────────────────────────────
+// Turns come pre-extracted from /api/sessions/{id}/turns; opens at the latest
+// turns and "Prev" pages backwards through the index.
+
+var turnsView = null;
+
+async function openSessionTurns(sessionId) {
+  stopJsonlPolling();
+  closeJsonlList();
+  jsonlQuery = null;
+  turnsView = { id: sessionId, turns: [], next: null, total: 0 };
+  document.getElementById('jsonl-title').textContent = sessionId;
+  document.getElementById('jsonl-lines').innerHTML = '<div class="loading">Loading...</div>';
+  document.querySelectorAll('.view').forEach(function(v) { v.classList.remove('active'); });
+  document.getElementById('view-jsonl').classList.add('active');
+  await loadSessionTurns();
+  document.getElementById('jsonl-lines').scrollTop = 999999;
+}
+
+async function loadSessionTurns() {
+  if (!turnsView || (turnsView.turns.length && !turnsView.next)) return;
+  var url = API + '/sessions/' + encodeURIComponent(turnsView.id) + '/turns?direction=backward&limit=50';
+  if (turnsView.next) url += '&cursor=' + encodeURIComponent(turnsView.next);
+  try {
+    var res = await fetch(url);
+    if (!res.ok) { toast((await res.json()).detail || 'Cannot load transcript', 'error'); return; }
+    var data = await res.json();
+    turnsView.turns = data.turns.concat(turnsView.turns);
+    turnsView.next = data.nextCursor;
+    turnsView.total = data.total;
+    renderSessionTurns();
+  } catch (e) { toast('Error: ' + e.message, 'error'); }
+}
+
+function renderSessionTurns() {
+  var html = '';
+  turnsView.turns.forEach(function(turn) {
+    var body = turn.text || '';
+    turn.toolCalls.forEach(function(call) {
+      body += '\n\n🔧 ' + call.name + ' ' + (call.arguments || '')
+        + (call.result != null ? '\n' + (call.isError ? '❌ ' : '→ ') + call.result : '\n… (no result yet)');
+    });
+    var preview = turn.text ? turn.text.substring(0, 150)
+      : turn.toolCalls.map(function(c) { return '🔧 ' + c.name; }).join(' ');
+    html += '<div class="jsonl-line" data-index="' + turn.index + '">'
+      + '<div class="jsonl-line-header">'
+      + '<span class="jsonl-line-index">#' + turn.index + '</span>'
+      + '<span class="jsonl-line-role ' + getRoleClass(turn.role) + '">' + esc(turn.role) + '</span>'
+      + '<span class="jsonl-line-preview">' + esc(preview) + '</span>'
+      + '</div>'
+      + '<div class="jsonl-line-body"><pre>' + esc(body) + '</pre></div></div>';
+  });
+  document.getElementById('jsonl-lines').innerHTML = html || '<div class="loading">No turns</div>';
+  document.getElementById('jsonl-pagination').textContent = turnsView.turns.length + ' of ' + turnsView.total + ' turns';
+  document.getElementById('btn-jsonl-prev').disabled = !turnsView.next;
+  document.getElementById('btn-jsonl-next').disabled = true;
+}
+
+document.getElementById('subagent-list').addEventListener('click', function(e) {
+  var card = e.target.closest('[data-session-id]');
+  if (card) openSessionTurns(card.dataset.sessionId);
+});
 
 function syntaxHighlight(json) {
   var escaped = esc(json);
@@ -1723,19 +2360,32 @@ var PALETTE_COMMANDS = [
   { icon: '📋', label: 'Kanban', hint: 'Task board', action: function() { switchView('kanban'); } },
   { icon: '🤖', label: 'Agents', hint: 'Agent sessions', action: function() { switchView('agents'); } },
   { icon: '📅', label: 'Calendar', hint: 'Scheduled cron jobs', action: function() { switchView('calendar'); } },
+  { icon: '📁', label: 'Files', hint: 'Workspace files', action: function() { switchView('files'); } },
+  { icon: '🧩', label: 'Subagents', hint: 'Active subagent sessions', action: function() { switchView('subagents'); } },
   { icon: '➕', label: 'New Task', hint: 'Create a task', action: function() { closePalette(); openNewTask('backlog'); } },
   { icon: '🔄', label: 'Refresh', hint: 'Reload current view', action: function() { refreshCurrentView(); } },
 ];
 
 var paletteSelectedIdx = 0;
 var paletteFileResults = [];
+var paletteIndexResults = [];
 var paletteMode = 'commands'; // 'commands' or 'files'
 var paletteSearchTimer = null;
+var paletteIndexTimer = null;
+var paletteIndexQuery = '';
+
+// Tasks, sessions, agents and cron jobs from /api/palette (in-memory trigram index)
+var PALETTE_KINDS = {
+  task: { icon: '📋', label: 'TASKS', action: function(r) { Promise.resolve(switchView('kanban')).then(function() { viewTaskModal(r.id); }); } },
+  session: { icon: '💬', label: 'SESSIONS', action: function(r) { closePalette(); openSessionTurns(r.id); } },
+  agent: { icon: '🤖', label: 'AGENTS', action: function() { switchView('agents'); } },
+  cron: { icon: '⏰', label: 'CRON JOBS', action: function() { switchView('calendar'); } },
+};
 
 function switchView(name) {
   closePalette();
   document.querySelectorAll('.nav-btn').forEach(function(b) { b.classList.toggle('active', b.dataset.view === name); });
-  showView(name);
+  return showView(name);
 }
 
 function refreshCurrentView() {
@@ -1748,16 +2398,18 @@ function openPalette() {
   document.getElementById('command-palette').classList.remove('hidden');
   var input = document.getElementById('palette-input');
   input.value = ''; input.focus();
-  input.placeholder = 'Search commands or files...';
+  input.placeholder = 'Search commands, tasks, sessions, agents or files...';
   paletteSelectedIdx = 0;
   paletteMode = 'commands';
   paletteFileResults = [];
+  paletteIndexResults = [];
   renderPaletteResults('');
 }
 
 function closePalette() {
   document.getElementById('command-palette').classList.add('hidden');
   if (paletteSearchTimer) { clearTimeout(paletteSearchTimer); paletteSearchTimer = null; }
+  if (paletteIndexTimer) { clearTimeout(paletteIndexTimer); paletteIndexTimer = null; }
 }
 
 function getFileSearchIcon(name) {
@@ -1773,6 +2425,17 @@ async function searchFiles(query) {
   } catch (e) { paletteFileResults = []; }
 }
 
+async function searchPaletteIndex(query) {
+  paletteIndexQuery = query;
+  if (!query.trim()) { paletteIndexResults = []; return; }
+  try {
+    var res = await fetch(API + '/palette?q=' + encodeURIComponent(query) + '&limit=12');
+    var data = await res.json();
+    // Drop answers that arrive after a newer keystroke was sent
+    if (query === paletteIndexQuery) paletteIndexResults = data.results || [];
+  } catch (e) { paletteIndexResults = []; }
+}
+
 function renderPaletteResults(query) {
   var results = document.getElementById('palette-results');
   var q = query.toLowerCase();
@@ -1797,6 +2460,22 @@ function renderPaletteResults(query) {
     }
   }
 
+  // Index results, grouped by kind in rank order of each group's best hit
+  var groups = {};
+  var groupOrder = [];
+  paletteIndexResults.forEach(function(r) {
+    if (!PALETTE_KINDS[r.kind]) return;
+    if (!groups[r.kind]) { groups[r.kind] = []; groupOrder.push(r.kind); }
+    groups[r.kind].push(r);
+  });
+  groupOrder.forEach(function(kind) {
+    var spec = PALETTE_KINDS[kind];
+    allItems.push({ type: 'separator', label: spec.label });
+    groups[kind].forEach(function(r) {
+      allItems.push({ type: kind, icon: spec.icon, label: r.label, hint: r.hint, action: function() { spec.action(r); } });
+    });
+  });
+
   // File results
   if (paletteFileResults.length > 0) {
     allItems.push({ type: 'separator', label: 'FILES' });
@@ -1859,6 +2538,13 @@ document.getElementById('palette-input').addEventListener('input', function() {
   // Render commands immediately
   renderPaletteResults(query);
 
+  // The index answers from memory, so it only needs a keystroke-sized debounce
+  if (paletteIndexTimer) clearTimeout(paletteIndexTimer);
+  paletteIndexTimer = setTimeout(async function() {
+    await searchPaletteIndex(query);
+    if (query === paletteIndexQuery) renderPaletteResults(query);
+  }, 40);
+
   // Debounce file search
   if (paletteSearchTimer) clearTimeout(paletteSearchTimer);
   if (query.length >= 2) {
@@ -1974,15 +2660,12 @@ function toast(msg, type) {
 // ── Top Bar Stats ────────────────────────────────────────────────────
 
 async function updateTopBarStats() {
+  // Live socket pushes these; only poll as a fallback
+  if (live.connected) return;
   try {
     // Agents: working vs idle
     var agentsRes = await fetch(API + '/agents');
-    var agents = await agentsRes.json();
-    var activeAgents = agents.filter(a => a.status === 'active');
-    var workingCount = activeAgents.filter(a => a.working).length;
-    var idleCount = activeAgents.length - workingCount;
-    document.getElementById('stat-working').textContent = workingCount;
-    document.getElementById('stat-idle').textContent = idleCount;
+    renderAgentStats(await agentsRes.json());
   } catch (e) {
     console.error('Failed to load agents for stats', e);
   }
@@ -1990,14 +2673,131 @@ async function updateTopBarStats() {
   // System health: RAM and Disk
   try {
     var healthRes = await fetch(API + '/health');
-    var health = await healthRes.json();
-    document.getElementById('stat-ram').textContent = health.memory.percent.toFixed(0);
-    document.getElementById('stat-disk').textContent = health.disk.percent.toFixed(0);
+    renderHealthStats(await healthRes.json());
   } catch (e) {
     console.error('Failed to load health for stats', e);
   }
 }
 
+function renderAgentStats(agents) {
+  var activeAgents = agents.filter(a => a.status === 'active');
+  var workingCount = activeAgents.filter(a => a.working).length;
+  var idleCount = activeAgents.length - workingCount;
+  document.getElementById('stat-working').textContent = workingCount;
+  document.getElementById('stat-idle').textContent = idleCount;
+}
+
+function renderHealthStats(health) {
+  document.getElementById('stat-ram').textContent = health.memory.percent.toFixed(0);
+  document.getElementById('stat-disk').textContent = health.disk.percent.toFixed(0);
+}
+
+// OpenClaw data size in the top bar; breakdown in the tooltip
+async function loadStorage() {
+  try {
+    var res = await fetch(API + '/storage');
+    var data = await res.json();
+    var lines = ['OpenClaw data: ' + formatSize(data.bytes) + ' in ' + data.files + ' files'];
+    data.agents.forEach(function(a) { lines.push('  agent ' + a.id + ': ' + formatSize(a.bytes)); });
+    data.workspaces.forEach(function(w) { lines.push('  ' + w.name + ': ' + formatSize(w.bytes)); });
+    document.getElementById('stat-openclaw').textContent = formatSize(data.bytes);
+    document.getElementById('stat-openclaw-wrap').title = lines.join('\n');
+  } catch (e) {
+    console.error('Failed to load storage', e);
+  }
+}
+
+// ── Live Updates ─────────────────────────────────────────────────────
+// One WebSocket per tab; the server pushes a snapshot per topic and then
+// only patches when something changed. Polling stays as the fallback.
+
+var live = { socket: null, connected: false, data: {}, handlers: {}, retryMs: 1000 };
+
+function liveSubscribe(topic, handler) {
+  live.handlers[topic] = handler;
+  if (live.connected) live.socket.send(JSON.stringify({ subscribe: [topic] }));
+}
+
+function applyLivePatch(value, patch) {
+  if ('replace' in patch) return patch.replace;
+  if (patch.keys) {
+    var out = Object.assign({}, value);
+    Object.keys(patch.keys).forEach(function(k) { out[k] = applyLivePatch(out[k], patch.keys[k]); });
+    (patch.unset || []).forEach(function(k) { delete out[k]; });
+    return out;
+  }
+  var byId = {};
+  var order = [];
+  (value || []).forEach(function(item) { byId[item.id] = item; order.push(item.id); });
+  (patch.upsert || []).forEach(function(item) {
+    if (!(item.id in byId)) order.push(item.id);
+    byId[item.id] = item;
+  });
+  (patch.remove || []).forEach(function(id) { delete byId[id]; });
+  return (patch.order || order).filter(function(id) { return id in byId; }).map(function(id) { return byId[id]; });
+}
+
+function connectLive() {
+  if (!window.WebSocket) return;
+  var base = API.indexOf('http') === 0
+    ? API.replace(/^http/, 'ws')
+    : (location.protocol === 'https:' ? 'wss://' : 'ws://') + location.host + API;
+  var socket;
+  try { socket = new WebSocket(base + '/live'); } catch (e) { return; }
+  live.socket = socket;
+
+  socket.onopen = function() {
+    live.connected = true;
+    live.retryMs = 1000;
+    var topics = Object.keys(live.handlers);
+    if (topics.length) socket.send(JSON.stringify({ subscribe: topics }));
+  };
+  socket.onmessage = function(ev) {
+    var msg;
+    try { msg = JSON.parse(ev.data); } catch (e) { return; }
+    if (msg.type === 'snapshot') live.data[msg.topic] = msg.data;
+    else if (msg.type === 'patch') live.data[msg.topic] = applyLivePatch(live.data[msg.topic], msg.patch);
+    else return;
+    var handler = live.handlers[msg.topic];
+    if (handler && live.data[msg.topic] != null) handler(live.data[msg.topic]);
+  };
+  socket.onclose = function() {
+    live.connected = false;
+    live.socket = null;
+    // Back off and retry; polling covers the gap
+    setTimeout(connectLive, live.retryMs);
+    live.retryMs = Math.min(live.retryMs * 2, 30000);
+  };
+}
+
+function isViewActive(name) {
+  var el = document.getElementById('view-' + name);
+  return !!(el && el.classList.contains('active'));
+}
+
+function withAgentAges(agents) {
+  // ageMs is stripped server-side so it doesn't trigger a push every tick
+  var now = Date.now();
+  return agents.map(function(a) {
+    return a.updatedAt ? Object.assign({}, a, { ageMs: now - a.updatedAt }) : a;
+  });
+}
+
+liveSubscribe('agents', function(agents) {
+  agents = withAgentAges(agents);
+  renderAgentStats(agents);
+  if (isViewActive('agents')) renderAgentList(agents);
+});
+liveSubscribe('health', renderHealthStats);
+liveSubscribe('sessions', function(sessions) {
+  if (isViewActive('subagents')) renderSubagentList(sessions);
+});
+liveSubscribe('kanban', function(board) {
+  kanbanTasks = board.tasks || [];
+  kanbanVersion = board.version || 0;
+  if (isViewActive('kanban') && !draggedTaskId) renderKanban();
+});
+
 // ── Init ───────────────────────────────────────────────────────────
 
 async function init() {
@@ -2005,8 +2805,11 @@ async function init() {
   await loadAgentRegistry();
   // loadDashboard(); // removed
   loadKanban();
+  connectLive();
   updateTopBarStats();
-  setInterval(updateTopBarStats, 15000); // refresh every 15s
+  setInterval(updateTopBarStats, 15000); // fallback poll every 15s when live socket is down
+  loadStorage();
+  setInterval(loadStorage, 60000);
 }
 
 init();
@@ -12,10 +12,16 @@ if [ ! -d "backend/.venv" ]; then
 fi
 
 # Serve frontend statically via FastAPI
-# Copy frontend to dist for static serving
+# Copy frontend to dist for static serving (only files that changed)
 mkdir -p frontend/dist
-cp frontend/index.html frontend/dist/
-cp -r frontend/src frontend/dist/
+cp -u frontend/index.html frontend/dist/
+cp -ru frontend/src frontend/dist/
+
+# --reload spawns a file-watching supervisor; only worth it while developing
+RELOAD=""
+if [ "${DASHBOARD_DEV:-0}" = "1" ]; then
+  RELOAD="--reload"
+fi
 
 echo "Starting OpenClaw Admin Dashboard on http://localhost:8787"
-backend/.venv/bin/uvicorn backend.main:app --host 0.0.0.0 --port 8787 --reload
+backend/.venv/bin/uvicorn backend.main:app --host 0.0.0.0 --port 8787 $RELOAD